@@ -0,0 +1,97 @@
+"""Deterministic Donetick datasets shaped like the /eapi/v1 responses."""
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+FREQUENCY_TYPES = ["once", "daily", "weekly", "monthly", "interval_days", "days_of_the_week"]
+LABELS = [None, None, "kitchen", "garden", "bathroom", "kids", "pets"]
+THING_TYPES = ["boolean", "number", "text", "action"]
+
+@dataclass(frozen=True)
+class Scale:
+    """Size of a generated dataset."""
+    name: str
+    tasks: int
+    members: int
+    things: int
+
+SCALES = {
+    "small": Scale("small", tasks=1_000, members=2, things=10),
+    "medium": Scale("medium", tasks=10_000, members=12, things=100),
+    "large": Scale("large", tasks=50_000, members=50, things=500),
+}
+
+def make_members(count: int) -> list[dict]:
+    """Return circle members."""
+    return [
+        {
+            "id": index,
+            "userId": index,
+            "circleId": 1,
+            "role": "admin" if index == 1 else "member",
+            "isActive": True,
+            "username": f"user{index}",
+            "displayName": f"Member {index}",
+            "image": None,
+            "points": index * 10,
+            "pointsRedeemed": 0,
+            "createdAt": "2024-06-30T23:19:39.316453-04:00",
+            "updatedAt": "2024-06-30T23:19:39.316453-04:00",
+        }
+        for index in range(1, count + 1)
+    ]
+
+def make_task(task_id: int, members: int, rng: random.Random, now: datetime) -> dict:
+    """Return one chore."""
+    due = now + timedelta(minutes=rng.randint(-7 * 24 * 60, 30 * 24 * 60))
+    return {
+        "id": task_id,
+        "name": f"Chore {task_id}",
+        "nextDueDate": due.strftime("%Y-%m-%dT%H:%M:%SZ") if rng.random() > 0.1 else None,
+        "status": 0,
+        "priority": rng.randint(0, 4),
+        "labels": rng.choice(LABELS),
+        "isActive": rng.random() > 0.3,
+        "frequencyType": rng.choice(FREQUENCY_TYPES),
+        "frequency": rng.randint(1, 4),
+        "frequencyMetadata": '{"days":[],"time":"18:00"}',
+        "assignedTo": rng.randint(1, members),
+        "description": f"Description of chore {task_id}" if rng.random() > 0.5 else None,
+    }
+
+def make_tasks(count: int, members: int, seed: int = 1) -> list[dict]:
+    """Return chores assigned across the members."""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [make_task(task_id, members, rng, now) for task_id in range(1, count + 1)]
+
+def make_things(count: int, seed: int = 1) -> list[dict]:
+    """Return things of every type."""
+    rng = random.Random(seed)
+    things = []
+    for thing_id in range(1, count + 1):
+        thing_type = THING_TYPES[thing_id % len(THING_TYPES)]
+        state = {"boolean": "false", "number": str(rng.randint(0, 100)), "text": "idle", "action": "0"}[thing_type]
+        things.append({
+            "id": thing_id,
+            "name": f"Thing {thing_id}",
+            "type": thing_type,
+            "state": state,
+            "userID": 1,
+            "circleId": 1,
+            "updatedAt": "2025-01-01T00:00:00Z",
+            "createdAt": "2025-01-01T00:00:00Z",
+            "thingChores": [],
+        })
+    return things
+
+def touch_tasks(tasks: list[dict], count: int, seed: int) -> list[int]:
+    """Change the name of count tasks in place, as edits made in the Donetick app would.
+
+    Returns the ids of the changed tasks.
+    """
+    rng = random.Random(seed)
+    touched = rng.sample(tasks, min(count, len(tasks)))
+    for task in touched:
+        task["name"] = f"{task['name']} (edited {seed})"
+    return [task["id"] for task in touched]
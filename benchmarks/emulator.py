@@ -0,0 +1,432 @@
+"""Local Donetick server emulator with latency and fault injection.
+
+Speaks the /eapi/v1 endpoints used by api.py: chore list/create/update/delete/
+complete, circle members, things and thing state get/set/change. With delta
+enabled it also answers the incremental sync query GET /eapi/v1/chore?updatedSince=
+with {"upserts": [...], "deletedIds": [...], "watermark": ...}. Every endpoint
+can be given a latency distribution, an error rate and a slow body, and every
+request is counted so load tests can measure request amplification.
+
+Run it standalone to point a real Home Assistant instance at it:
+
+    python -m benchmarks.emulator --tasks 10000 --members 12 --things 100 --port 8080 \\
+        --latency tasks=lognormal:80:0.6 --error-rate tasks=0.05 --slow-body tasks=16384:0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+
+from aiohttp import web
+
+from .dataset import make_members, make_tasks, make_things
+
+# Seconds of delay drawn from a random generator
+Latency = Callable[[random.Random], float]
+
+# Endpoint names used for profiles and request counts
+ENDPOINTS = (
+    "tasks",          # GET /eapi/v1/chore
+    "task_changes",   # GET /eapi/v1/chore?updatedSince= (delta query)
+    "task_create",    # POST /eapi/v1/chore
+    "task_update",    # PUT /eapi/v1/chore/{id}
+    "task_delete",    # DELETE /eapi/v1/chore/{id}
+    "task_complete",  # POST /eapi/v1/chore/{id}/complete
+    "members",        # GET /eapi/v1/circle/members
+    "things",         # GET /eapi/v1/things
+    "thing_state",    # GET /eapi/v1/things/{id}/state[?state=]
+    "thing_change",   # GET /eapi/v1/things/{id}/state/change
+)
+
+def fixed(ms: float) -> Latency:
+    """Return a constant latency."""
+    return lambda rng: ms / 1000
+
+def uniform(low_ms: float, high_ms: float) -> Latency:
+    """Return a latency drawn uniformly between two bounds."""
+    return lambda rng: rng.uniform(low_ms, high_ms) / 1000
+
+def lognormal(median_ms: float, sigma: float) -> Latency:
+    """Return a long-tailed latency around a median, as real servers tend to have."""
+    mu = math.log(median_ms)
+    return lambda rng: rng.lognormvariate(mu, sigma) / 1000
+
+def parse_latency(spec: str) -> Latency:
+    """Parse fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA."""
+    kind, *args = spec.split(":")
+    factories = {"fixed": fixed, "uniform": uniform, "lognormal": lognormal}
+    if kind not in factories:
+        raise ValueError(f"Unknown latency distribution: {kind}")
+    return factories[kind](*(float(arg) for arg in args))
+
+@dataclass
+class EndpointProfile:
+    """How one endpoint misbehaves."""
+    latency: Optional[Latency] = None
+    # Share of requests answered with error_status instead
+    error_rate: float = 0.0
+    error_status: int = 503
+    # Stream the body in chunks of this many bytes with a delay between them
+    slow_chunk_size: int = 0
+    slow_chunk_delay: float = 0.0
+
+@dataclass
+class EmulatorStats:
+    """What the emulator has served."""
+    requests: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    not_modified: Counter = field(default_factory=Counter)
+    bytes_sent: Counter = field(default_factory=Counter)
+    # Server-side handling time per request in seconds, injected latency included
+    durations: dict[str, list[float]] = field(default_factory=dict)
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of requests over all endpoints."""
+        return sum(self.requests.values())
+
+class DonetickEmulator:
+    """Serve a mutable Donetick dataset on 127.0.0.1."""
+
+    def __init__(
+        self,
+        tasks: list[dict],
+        members: list[dict],
+        things: list[dict],
+        token: Optional[str] = None,
+        validators: bool = True,
+        profiles: Optional[dict[str, EndpointProfile]] = None,
+        seed: int = 1,
+        delta: bool = True,
+    ) -> None:
+        """Initialize the emulator with its dataset; token None accepts any secretkey.
+
+        Without delta the updatedSince query is ignored, like servers that do
+        not support incremental sync.
+        """
+        self.tasks = tasks
+        self.members = members
+        self.things = things
+        self.token = token
+        self.validators = validators
+        self.delta = delta
+        self.profiles: dict[str, EndpointProfile] = profiles or {}
+        self.stats = EmulatorStats()
+        self.url = ""
+        self._rng = random.Random(seed)
+        self._bodies: dict[str, tuple[bytes, str]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._next_task_id = max((task["id"] for task in tasks), default=0) + 1
+        # When each chore last changed and when deleted chores were deleted, in server time
+        self._task_changed_at: dict[int, float] = {}
+        self._task_deleted_at: dict[int, float] = {}
+        self.dataset_changed()
+
+    @classmethod
+    def generate(cls, tasks: int, members: int, things: int, **kwargs) -> "DonetickEmulator":
+        """Create an emulator with a generated dataset of the given size."""
+        return cls(make_tasks(tasks, members), make_members(members), make_things(things), **kwargs)
+
+    @property
+    def requests(self) -> int:
+        """Return the number of requests served."""
+        return self.stats.total_requests
+
+    def reset_stats(self) -> None:
+        """Forget the requests served so far."""
+        self.stats = EmulatorStats()
+
+    def dataset_changed(self, changed_task_ids: Iterable[int] = ()) -> None:
+        """Re-serialize the list bodies after the dataset was modified directly.
+
+        Pass the ids of edited chores so delta queries report them. Done eagerly
+        so benchmarks do not time the emulator's own serialization.
+        """
+        self._tasks_changed(changed_task_ids)
+        self._bodies.clear()
+        for name in ("tasks", "members", "things"):
+            self._list_body(name)
+
+    def _tasks_changed(self, task_ids: Iterable[int] = (), deleted: bool = False) -> None:
+        """Record chore changes for delta queries and drop the serialized chore list."""
+        now = time.time()
+        for task_id in task_ids:
+            if deleted:
+                self._task_changed_at.pop(task_id, None)
+                self._task_deleted_at[task_id] = now
+            else:
+                self._task_changed_at[task_id] = now
+        self._bodies.pop("tasks", None)
+
+    def _list_body(self, name: str) -> tuple[bytes, str]:
+        """Return the serialized list and its ETag, serializing only after a change."""
+        if name not in self._bodies:
+            body = json.dumps(getattr(self, name)).encode()
+            self._bodies[name] = (body, '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest())
+        return self._bodies[name]
+
+    def _task(self, request: web.Request) -> dict:
+        """Return the chore addressed by the request."""
+        task_id = int(request.match_info["task_id"])
+        for task in self.tasks:
+            if task["id"] == task_id:
+                return task
+        raise web.HTTPNotFound()
+
+    def _thing(self, request: web.Request) -> dict:
+        """Return the thing addressed by the request."""
+        thing_id = int(request.match_info["thing_id"])
+        for thing in self.things:
+            if thing["id"] == thing_id:
+                return thing
+        raise web.HTTPNotFound()
+
+    async def _respond(self, request: web.Request, endpoint: str, body: bytes, headers: Optional[dict] = None) -> web.StreamResponse:
+        """Send a JSON body, streamed slowly when the endpoint is configured to."""
+        profile = self.profiles.get(endpoint)
+        self.stats.bytes_sent[endpoint] += len(body)
+        if not profile or not profile.slow_chunk_size:
+            return web.Response(body=body, content_type="application/json", headers=headers)
+        response = web.StreamResponse(headers=headers)
+        response.content_type = "application/json"
+        response.content_length = len(body)
+        await response.prepare(request)
+        for start in range(0, len(body), profile.slow_chunk_size):
+            await response.write(body[start:start + profile.slow_chunk_size])
+            await asyncio.sleep(profile.slow_chunk_delay)
+        await response.write_eof()
+        return response
+
+    def _handler(self, endpoint: str, handle: Callable) -> Callable:
+        """Wrap a handler with counting, auth, latency and error injection."""
+        async def wrapped(request: web.Request) -> web.StreamResponse:
+            start = time.perf_counter()
+            endpoint_name = self._endpoint_name(endpoint, request)
+            self.stats.requests[endpoint_name] += 1
+            try:
+                if self.token is not None and request.headers.get("secretkey") != self.token:
+                    self.stats.errors[endpoint_name] += 1
+                    raise web.HTTPUnauthorized()
+                profile = self.profiles.get(endpoint_name)
+                if profile and profile.latency:
+                    await asyncio.sleep(profile.latency(self._rng))
+                if profile and profile.error_rate and self._rng.random() < profile.error_rate:
+                    self.stats.errors[endpoint_name] += 1
+                    return web.json_response({"error": "injected"}, status=profile.error_status)
+                return await handle(request)
+            finally:
+                self.stats.durations.setdefault(endpoint_name, []).append(time.perf_counter() - start)
+        return wrapped
+
+    def _endpoint_name(self, endpoint: str, request: web.Request) -> str:
+        """Return the name a request is counted and profiled under."""
+        if endpoint == "tasks" and self.delta and "updatedSince" in request.query:
+            return "task_changes"
+        return endpoint
+
+    async def _get_list(self, request: web.Request, endpoint: str, name: str) -> web.StreamResponse:
+        """Return a list body, honouring If-None-Match when validators are enabled."""
+        body, etag = self._list_body(name)
+        if not self.validators:
+            return await self._respond(request, endpoint, body)
+        if request.headers.get("If-None-Match") == etag:
+            self.stats.not_modified[endpoint] += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return await self._respond(request, endpoint, body, {"ETag": etag})
+
+    async def _get_tasks(self, request: web.Request) -> web.StreamResponse:
+        if self._endpoint_name("tasks", request) == "task_changes":
+            return await self._get_task_changes(request)
+        return await self._get_list(request, "tasks", "tasks")
+
+    async def _get_task_changes(self, request: web.Request) -> web.StreamResponse:
+        """Return the chores changed and deleted since the updatedSince watermark."""
+        try:
+            since = datetime.fromisoformat(request.query["updatedSince"]).timestamp()
+        except ValueError as err:
+            raise web.HTTPBadRequest(text=str(err)) from err
+        now = time.time()
+        # >= so a change in the same instant as the watermark is reported twice, never missed
+        changed = {task_id for task_id, at in self._task_changed_at.items() if at >= since}
+        body = json.dumps({
+            "upserts": [task for task in self.tasks if task["id"] in changed],
+            "deletedIds": [task_id for task_id, at in self._task_deleted_at.items() if at >= since],
+            "watermark": datetime.fromtimestamp(now, timezone.utc).isoformat(),
+        }).encode()
+        return await self._respond(request, "task_changes", body)
+
+    async def _get_members(self, request: web.Request) -> web.StreamResponse:
+        return await self._get_list(request, "members", "members")
+
+    async def _get_things(self, request: web.Request) -> web.StreamResponse:
+        return await self._get_list(request, "things", "things")
+
+    async def _create_task(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        task = {
+            "id": self._next_task_id,
+            "name": payload["name"],
+            "nextDueDate": payload.get("dueDate"),
+            "status": 0,
+            "priority": 0,
+            "labels": None,
+            "isActive": True,
+            "frequencyType": "once",
+            "frequency": 1,
+            "frequencyMetadata": None,
+            "assignedTo": payload.get("createdBy"),
+            "description": payload.get("description"),
+        }
+        self._next_task_id += 1
+        self.tasks.append(task)
+        self._tasks_changed([task["id"]])
+        return await self._respond(request, "task_create", json.dumps(task).encode())
+
+    async def _update_task(self, request: web.Request) -> web.StreamResponse:
+        task = self._task(request)
+        payload = await request.json()
+        for key, source in (("name", "name"), ("description", "description"), ("nextDueDate", "dueDate")):
+            if source in payload:
+                task[key] = payload[source]
+        self._tasks_changed([task["id"]])
+        return await self._respond(request, "task_update", json.dumps(task).encode())
+
+    async def _delete_task(self, request: web.Request) -> web.StreamResponse:
+        task = self._task(request)
+        self.tasks.remove(task)
+        self._tasks_changed([task["id"]], deleted=True)
+        return await self._respond(request, "task_delete", b'{"message":"Chore deleted successfully"}')
+
+    async def _complete_task(self, request: web.Request) -> web.StreamResponse:
+        task = self._task(request)
+        if task["frequencyType"] == "once":
+            task["isActive"] = False
+        else:
+            # Recurring chores move on; the exact schedule does not matter here
+            task["nextDueDate"] = (datetime.now(timezone.utc) + timedelta(days=task["frequency"])).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._tasks_changed([task["id"]])
+        return await self._respond(request, "task_complete", json.dumps(task).encode())
+
+    async def _thing_state(self, request: web.Request) -> web.StreamResponse:
+        thing = self._thing(request)
+        if "state" in request.query:
+            thing["state"] = request.query["state"]
+            self._bodies.pop("things", None)
+        return await self._respond(request, "thing_state", json.dumps(thing).encode())
+
+    async def _thing_change(self, request: web.Request) -> web.StreamResponse:
+        thing = self._thing(request)
+        if "set" in request.query:
+            thing["state"] = request.query["set"]
+        elif "op" in request.query:
+            thing["state"] = str(float(thing["state"]) + float(request.query["op"])).removesuffix(".0")
+        self._bodies.pop("things", None)
+        return await self._respond(request, "thing_change", json.dumps(thing).encode())
+
+    def make_app(self) -> web.Application:
+        """Return the aiohttp application serving the endpoints."""
+        app = web.Application()
+        routes = (
+            ("GET", "/eapi/v1/chore", "tasks", self._get_tasks),
+            ("POST", "/eapi/v1/chore", "task_create", self._create_task),
+            ("PUT", "/eapi/v1/chore/{task_id}", "task_update", self._update_task),
+            ("DELETE", "/eapi/v1/chore/{task_id}", "task_delete", self._delete_task),
+            ("POST", "/eapi/v1/chore/{task_id}/complete", "task_complete", self._complete_task),
+            ("GET", "/eapi/v1/circle/members", "members", self._get_members),
+            ("GET", "/eapi/v1/things", "things", self._get_things),
+            ("GET", "/eapi/v1/things/{thing_id}/state", "thing_state", self._thing_state),
+            ("GET", "/eapi/v1/things/{thing_id}/state/change", "thing_change", self._thing_change),
+        )
+        for method, path, endpoint, handle in routes:
+            app.router.add_route(method, path, self._handler(endpoint, handle))
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start listening, on a free port unless one is given."""
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+        self.url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+def _endpoint_options(values: list[str], parse: Callable[[str], object]) -> dict[str, object]:
+    """Parse repeated ENDPOINT=VALUE options."""
+    options = {}
+    for value in values:
+        endpoint, _, spec = value.partition("=")
+        if endpoint not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint {endpoint}, expected one of {', '.join(ENDPOINTS)}")
+        options[endpoint] = parse(spec)
+    return options
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the fault injection options to a command line parser."""
+    parser.add_argument("--latency", action="append", default=[], metavar="ENDPOINT=DIST",
+                        help="fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="ENDPOINT=RATE")
+    parser.add_argument("--slow-body", action="append", default=[], metavar="ENDPOINT=CHUNK:DELAY",
+                        help="stream CHUNK bytes every DELAY seconds")
+
+def profiles_from_args(args: argparse.Namespace) -> dict[str, EndpointProfile]:
+    """Build endpoint profiles from the command line options."""
+    profiles: dict[str, EndpointProfile] = {}
+    for endpoint, latency in _endpoint_options(args.latency, parse_latency).items():
+        profiles.setdefault(endpoint, EndpointProfile()).latency = latency
+    for endpoint, rate in _endpoint_options(args.error_rate, float).items():
+        profiles.setdefault(endpoint, EndpointProfile()).error_rate = rate
+    for endpoint, spec in _endpoint_options(args.slow_body, str).items():
+        size, _, delay = spec.partition(":")
+        profile = profiles.setdefault(endpoint, EndpointProfile())
+        profile.slow_chunk_size, profile.slow_chunk_delay = int(size), float(delay or 0)
+    return profiles
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Run the emulator until interrupted, printing request counts periodically."""
+    emulator = DonetickEmulator.generate(
+        args.tasks, args.members, args.things,
+        token=args.token, validators=not args.no_validators, delta=not args.no_delta,
+        profiles=profiles_from_args(args),
+    )
+    await emulator.start(args.host, args.port)
+    print(f"Donetick emulator on {emulator.url} ({args.tasks} tasks, {args.members} members, {args.things} things)")
+    try:
+        while True:
+            await asyncio.sleep(args.report_interval)
+            print(f"requests={dict(emulator.stats.requests)} errors={dict(emulator.stats.errors)} 304={dict(emulator.stats.not_modified)}")
+    finally:
+        await emulator.stop()
+
+def main() -> None:
+    """Parse arguments and serve."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=2)
+    parser.add_argument("--things", type=int, default=10)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--token", help="require this secretkey (default: accept any)")
+    parser.add_argument("--no-validators", action="store_true", help="do not send ETags")
+    parser.add_argument("--no-delta", action="store_true", help="ignore incremental sync queries")
+    add_profile_arguments(parser)
+    parser.add_argument("--report-interval", type=float, default=30)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Load test the coordinators against the emulator with injected latency and faults.
+
+Runs refresh cycles of the todo, members and things coordinators the way a
+config entry does, optionally completing tasks in between, and reports tail
+latency per cycle and how many server requests each cycle caused.
+
+    python -m benchmarks.load --tasks 10000 --members 12 --things 100 --cycles 50 \\
+        --latency tasks=lognormal:80:0.6 --error-rate tasks=0.05 --writes-per-cycle 2
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import aiohttp
+
+from custom_components.donetick.api import DonetickApiClient
+from custom_components.donetick.coordinator import (
+    DonetickMembersCoordinator,
+    DonetickThingsCoordinator,
+    DonetickTodoCoordinator,
+)
+from custom_components.donetick.model import DonetickTask
+from custom_components.donetick.scheduler import RequestScheduler
+
+from .emulator import DonetickEmulator, add_profile_arguments, profiles_from_args
+from .run import _create_hass
+
+def percentile(samples: list[float], share: float) -> float:
+    """Return the nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))]
+
+async def async_load(args: argparse.Namespace) -> None:
+    """Run the cycles and print the report."""
+    emulator = DonetickEmulator.generate(
+        args.tasks, args.members, args.things, profiles=profiles_from_args(args)
+    )
+    await emulator.start()
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = _create_hass(config_dir)
+        async with aiohttp.ClientSession() as session:
+            scheduler = RequestScheduler(args.rate_limit, args.max_in_flight) if args.max_in_flight else None
+            client = DonetickApiClient(emulator.url, "load", session, scheduler=scheduler)
+            coordinators = (
+                DonetickTodoCoordinator(hass, client, 900, incremental=args.incremental),
+                DonetickMembersCoordinator(hass, client, 900),
+                DonetickThingsCoordinator(hass, client),
+            )
+            for coordinator in coordinators:
+                await coordinator.async_refresh()
+            emulator.reset_stats()
+
+            cycle_ms, failed_cycles, write_errors = [], 0, 0
+            for cycle in range(args.cycles):
+                start = time.perf_counter()
+                await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+                cycle_ms.append((time.perf_counter() - start) * 1000)
+                failed_cycles += not all(coordinator.last_update_success for coordinator in coordinators)
+
+                active = [task.id for task in coordinators[0].data.active[:args.writes_per_cycle]] if coordinators[0].data else []
+                results = await client.async_complete_tasks(active)
+                write_errors += sum(isinstance(result, Exception) for result in results.values())
+
+            # Incremental sync must end up with exactly what a full download would give
+            await coordinators[0].async_refresh()
+            in_sync = coordinators[0].data.fingerprints == {
+                task.id: task.fingerprint() for task in DonetickTask.from_json_list(emulator.tasks)
+            }
+
+    await emulator.stop()
+    stats = emulator.stats
+    print(f"{args.cycles} cycles against {args.tasks} tasks, {args.members} members, {args.things} things")
+    print(f"  cycle latency ms   p50 {statistics.median(cycle_ms):.1f}  p95 {percentile(cycle_ms, 0.95):.1f}"
+          f"  p99 {percentile(cycle_ms, 0.99):.1f}  max {max(cycle_ms):.1f}")
+    print(f"  failed cycles      {failed_cycles}")
+    print(f"  write errors       {write_errors}")
+    print(f"  tasks in sync      {'yes' if in_sync else 'NO'}")
+    print(f"  requests per cycle {stats.total_requests / args.cycles:.2f}")
+    for endpoint, requests in sorted(stats.requests.items()):
+        durations = stats.durations[endpoint]
+        print(f"    {endpoint:<14} {requests:>6} requests  {stats.errors[endpoint]:>4} errors"
+              f"  {stats.not_modified[endpoint]:>5} not modified  {stats.bytes_sent[endpoint] / 1024:>9.0f} KiB"
+              f"  server p95 {percentile(durations, 0.95) * 1000:.1f} ms")
+
+def main() -> None:
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=2)
+    parser.add_argument("--things", type=int, default=10)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--writes-per-cycle", type=int, default=0, help="tasks completed between refreshes")
+    parser.add_argument("--incremental", action="store_true", help="use incremental chore sync")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests per second, 0 for no limit")
+    parser.add_argument("--max-in-flight", type=int, default=0, help="concurrent requests, 0 for no scheduler")
+    add_profile_arguments(parser)
+    asyncio.run(async_load(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
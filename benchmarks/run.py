@@ -0,0 +1,292 @@
+"""Benchmark the refresh -> todo entity fan-out hot path against the local emulator.
+
+Drives the real DonetickApiClient, coordinators and todo list entities. State
+writes are counted instead of going through a running state machine, but each
+counted write still reads state and attributes the way Home Assistant does.
+
+Usage (from the repository root, with Home Assistant installed):
+
+    python -m benchmarks.run                      # all scales, compare with baseline.json
+    python -m benchmarks.run --scale small medium
+    python -m benchmarks.run --check              # exit 1 on regressions
+    python -m benchmarks.run --update-baseline    # store the results as the new baseline
+"""
+import argparse
+import asyncio
+import gc
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from custom_components.donetick.api import DonetickApiClient
+from custom_components.donetick.const import CONF_URL
+from custom_components.donetick.coordinator import (
+    DonetickMembersCoordinator,
+    DonetickThingsCoordinator,
+    DonetickTodoCoordinator,
+)
+from custom_components.donetick.model import DonetickTask, DonetickTaskStore, json_loads
+from custom_components.donetick.todo import DonetickAllTasksList, DonetickAssigneeTasksList
+
+from .dataset import SCALES, Scale, make_members, make_tasks, make_things, touch_tasks
+from .emulator import DonetickEmulator
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# A timing regresses when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and at least this many ms/KiB slower, so tiny numbers do not flap
+ABSOLUTE_SLACK = 2.0
+# Share of tasks edited on the server before each "changed" refresh
+CHANGED_SHARE = 0.01
+# Tasks decoded by the model measurements, reported under the "models" key
+MODEL_TASKS = 20_000
+
+def _create_hass(config_dir: str) -> HomeAssistant:
+    """Create a HomeAssistant instance without starting it."""
+    try:
+        return HomeAssistant(config_dir)
+    except TypeError:
+        # Before 2024.3 the config dir was set after construction
+        hass = HomeAssistant()  # pylint: disable=no-value-for-parameter
+        hass.config.config_dir = config_dir
+        return hass
+
+async def _timed(call: Callable[[], Awaitable[Any]]) -> float:
+    """Return how long the awaitable took in ms."""
+    start = time.perf_counter()
+    await call()
+    return (time.perf_counter() - start) * 1000
+
+async def _allocations(call: Callable[[], Awaitable[Any]]) -> tuple[float, float]:
+    """Return peak and retained KiB allocated while the awaitable ran."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    await call()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (peak - before) / 1024, (after - before) / 1024
+
+class TodoBench:
+    """One scale: emulated server, client, coordinators and todo list entities."""
+
+    def __init__(self, hass: HomeAssistant, scale: Scale) -> None:
+        """Initialize the bench."""
+        self.hass = hass
+        self.scale = scale
+        self.server = DonetickEmulator(
+            make_tasks(scale.tasks, scale.members),
+            make_members(scale.members),
+            make_things(scale.things),
+        )
+        self.writes = 0
+
+    async def setup(self) -> None:
+        """Start the server and wire the integration objects like entry setup does."""
+        await self.server.start()
+        self.session = aiohttp.ClientSession()
+        self.client = DonetickApiClient(self.server.url, "bench", self.session)
+        self.todo = DonetickTodoCoordinator(self.hass, self.client, 900)
+        self.members = DonetickMembersCoordinator(self.hass, self.client, 900)
+        self.things = DonetickThingsCoordinator(self.hass, self.client)
+        self.cold_refresh_ms = await _timed(self.todo.async_refresh)
+        await self.members.async_refresh()
+
+        entry = SimpleNamespace(entry_id="bench", data={CONF_URL: self.server.url}, options={}, title="Donetick")
+        self.entities = [DonetickAllTasksList(self.todo, entry, self.members)] + [
+            DonetickAssigneeTasksList(self.todo, entry, self.members, member)
+            for member in self.members.data
+        ]
+        for index, entity in enumerate(self.entities):
+            entity.hass = self.hass
+            entity.entity_id = f"todo.bench_{index}"
+            entity.async_write_ha_state = self._writer(entity)
+            await entity.async_added_to_hass()
+
+    def _writer(self, entity: Any) -> Callable[[], None]:
+        """Return a stand-in for async_write_ha_state that counts writes."""
+        def write() -> None:
+            self.writes += 1
+            # What the state machine reads on every write
+            entity.state  # pylint: disable=pointless-statement
+            entity.extra_state_attributes  # pylint: disable=pointless-statement
+        return write
+
+    async def teardown(self) -> None:
+        """Release listeners, the session and the server."""
+        for entity in self.entities:
+            # Drops the coordinator listeners registered in async_added_to_hass
+            entity._call_on_remove_callbacks()  # pylint: disable=protected-access
+        await self.session.close()
+        await self.server.stop()
+
+    async def refresh_counting_writes(self) -> tuple[float, int]:
+        """Refresh once and return the latency and number of state writes."""
+        self.writes = 0
+        elapsed = await _timed(self.todo.async_refresh)
+        return elapsed, self.writes
+
+    def change_server_data(self, seed: int) -> None:
+        """Edit a share of the tasks on the server."""
+        self.server.dataset_changed(
+            touch_tasks(self.server.tasks, max(1, int(self.scale.tasks * CHANGED_SHARE)), seed)
+        )
+
+    def todo_items_build_ms(self) -> float:
+        """Return the time to materialize todo_items on every list for a new store."""
+        self.todo.data = DonetickTaskStore(self.todo.data.tasks)
+        start = time.perf_counter()
+        for entity in self.entities:
+            entity.todo_items  # pylint: disable=pointless-statement
+        return (time.perf_counter() - start) * 1000
+
+async def run_scale(hass: HomeAssistant, scale: Scale, repeat: int) -> dict[str, float]:
+    """Run every measurement for one scale."""
+    bench = TodoBench(hass, scale)
+    await bench.setup()
+    try:
+        results: dict[str, float] = {"cold_refresh_ms": bench.cold_refresh_ms}
+
+        unchanged, unchanged_writes = [], []
+        for _ in range(repeat):
+            elapsed, writes = await bench.refresh_counting_writes()
+            unchanged.append(elapsed)
+            unchanged_writes.append(writes)
+        results["unchanged_refresh_ms"] = statistics.median(unchanged)
+        results["state_writes_unchanged"] = max(unchanged_writes)
+
+        bench.server.validators = False
+        results["unchanged_refresh_no_validators_ms"] = statistics.median(
+            [await _timed(bench.todo.async_refresh) for _ in range(repeat)]
+        )
+        bench.server.validators = True
+
+        changed, changed_writes = [], []
+        for seed in range(repeat):
+            bench.change_server_data(seed)
+            elapsed, writes = await bench.refresh_counting_writes()
+            changed.append(elapsed)
+            changed_writes.append(writes)
+        results["changed_refresh_ms"] = statistics.median(changed)
+        results["state_writes_changed"] = statistics.median(changed_writes)
+
+        bench.change_server_data(repeat)
+        results["changed_refresh_alloc_peak_kib"], results["changed_refresh_alloc_retained_kib"] = (
+            await _allocations(bench.todo.async_refresh)
+        )
+
+        results["todo_items_build_ms"] = statistics.median(
+            [bench.todo_items_build_ms() for _ in range(repeat)]
+        )
+
+        results["things_cold_refresh_ms"] = await _timed(bench.things.async_refresh)
+        results["things_unchanged_refresh_ms"] = statistics.median(
+            [await _timed(bench.things.async_refresh) for _ in range(repeat)]
+        )
+        return results
+    finally:
+        await bench.teardown()
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float) -> list[str]:
+    """Return a description of every metric that regressed against the baseline."""
+    regressions = []
+    for scale_name, metrics in results.items():
+        for metric, value in metrics.items():
+            base = baseline.get(scale_name, {}).get(metric)
+            if base is None:
+                continue
+            if metric.startswith("state_writes"):
+                regressed = value > base
+            else:
+                regressed = value > base * (1 + tolerance) and value - base > ABSOLUTE_SLACK
+            if regressed:
+                regressions.append(f"{scale_name}.{metric}: {value:.2f} (baseline {base:.2f})")
+    return regressions
+
+def print_table(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]) -> None:
+    """Print the results next to the baseline."""
+    for scale_name, metrics in results.items():
+        scale = SCALES.get(scale_name)
+        if scale is None:
+            print(f"\n{scale_name}: {MODEL_TASKS} tasks")
+        else:
+            print(f"\n{scale_name}: {scale.tasks} tasks, {scale.members} members, {scale.things} things")
+        for metric, value in metrics.items():
+            base = baseline.get(scale_name, {}).get(metric)
+            delta = f"  (baseline {base:.2f}, {((value - base) / base * 100) if base else 0:+.0f}%)" if base is not None else ""
+            print(f"  {metric:<40} {value:>10.2f}{delta}")
+
+def run_models(tasks: int, repeat: int) -> dict[str, float]:
+    """Measure decoding chore rows into task models, apart from the network and JSON parsing."""
+    # Round-tripped so the rows hold fresh strings like a decoded response body
+    rows = json_loads(json.dumps(make_tasks(tasks, 1)))
+    results: dict[str, float] = {}
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        DonetickTask.from_json_list(rows)
+        samples.append((time.perf_counter() - start) * 1000)
+    results["task_models_decode_ms"] = min(samples)
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    models = DonetickTask.from_json_list(rows)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results["task_models_retained_kib"] = (after - before) / 1024
+
+    start = time.perf_counter()
+    for task in models:
+        task.next_due_date  # pylint: disable=pointless-statement
+    results["task_due_dates_parse_ms"] = (time.perf_counter() - start) * 1000
+    return results
+
+async def async_main(args: argparse.Namespace) -> int:
+    """Run the selected scales and handle the baseline."""
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = _create_hass(config_dir)
+        for scale_name in args.scale:
+            results[scale_name] = await run_scale(hass, SCALES[scale_name], args.repeat)
+    results["models"] = run_models(MODEL_TASKS, args.repeat)
+
+    print_table(results, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.update_baseline:
+        BASELINE_PATH.write_text(json.dumps({**baseline, **results}, indent=2) + "\n")
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        return 1 if args.check else 0
+    print("\nNo regressions against the baseline")
+    return 0
+
+def main() -> None:
+    """Parse arguments and run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", nargs="+", choices=list(SCALES), default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="samples per measurement (median is reported)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown before a timing counts as a regression")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a metric regressed")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results in baseline.json")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    sys.exit(asyncio.run(async_main(parser.parse_args())))
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,62 @@
 """The Donetick integration."""
+import asyncio
 import logging
 import voluptuous as vol
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.components import webhook
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import CONF_WEBHOOK_ID, Platform
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from .const import DOMAIN, CONF_URL, CONF_TOKEN, CONF_SHOW_DUE_IN
+from homeassistant.setup import async_setup_component
+from .const import (
+    DOMAIN,
+    CONF_URL,
+    CONF_TOKEN,
+    CONF_SHOW_DUE_IN,
+    CONF_REFRESH_INTERVAL,
+    CONF_ADAPTIVE_REFRESH,
+    CONF_MUTATION_REFRESH_DELAY,
+    CONF_INCREMENTAL_SYNC,
+    CONF_PUSH_UPDATES,
+    CONF_DEDICATED_SESSION,
+    CONF_MAX_CONNECTIONS,
+    CONF_KEEPALIVE_TIMEOUT,
+    CONF_DNS_CACHE_TTL,
+    CONF_COMPRESSION,
+    CONF_RATE_LIMIT,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_REFRESH_INTERVAL,
+    DEFAULT_THINGS_REFRESH_INTERVAL,
+    DEFAULT_MUTATION_REFRESH_DELAY,
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_RATE_LIMIT,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_PROFILE_CYCLES,
+    MAX_BATCH_CONCURRENCY,
+    MAX_PROFILE_CYCLES,
+    PUSH_SAFETY_NET_INTERVAL,
+)
 from .api import DonetickApiClient
+from .coordinator import (
+    DonetickMembersCoordinator,
+    DonetickRuntimeData,
+    DonetickThingsCoordinator,
+    DonetickTodoCoordinator,
+)
+from .profiler import async_profile
+from .push import async_register_push
+from .scheduler import async_acquire_scheduler
+from .session import DonetickSessionConfig, async_acquire_session
+from .storage import DonetickSnapshot
 
 _LOGGER = logging.getLogger(__name__)
+# Set while a donetick.profile call runs; cProfile cannot profile twice at once
+PROFILING_KEY = f"{DOMAIN}_profiling"
 PLATFORMS = [Platform.TODO, Platform.SENSOR, Platform.SWITCH, Platform.NUMBER, Platform.TEXT]
 
 
@@ -17,10 +64,23 @@ SERVICE_COMPLETE_TASK = "complete_task"
 SERVICE_CREATE_TASK = "create_task"
 SERVICE_UPDATE_TASK = "update_task"
 SERVICE_DELETE_TASK = "delete_task"
+SERVICE_COMPLETE_TASKS = "complete_tasks"
+SERVICE_DELETE_TASKS = "delete_tasks"
+SERVICE_PROFILE = "profile"
+SERVICES = [
+    SERVICE_COMPLETE_TASK,
+    SERVICE_CREATE_TASK,
+    SERVICE_UPDATE_TASK,
+    SERVICE_DELETE_TASK,
+    SERVICE_COMPLETE_TASKS,
+    SERVICE_DELETE_TASKS,
+    SERVICE_PROFILE,
+]
 
 COMPLETE_TASK_SCHEMA = vol.Schema({
     vol.Required("task_id"): cv.positive_int,
     vol.Optional("completed_by"): cv.positive_int,
+    vol.Optional("wait_for_refresh", default=False): cv.boolean,
     vol.Optional("config_entry_id"): cv.string,
 })
 
@@ -29,6 +89,7 @@ CREATE_TASK_SCHEMA = vol.Schema({
     vol.Optional("description"): cv.string,
     vol.Optional("due_date"): cv.string,
     vol.Optional("created_by"): cv.positive_int,
+    vol.Optional("wait_for_refresh", default=False): cv.boolean,
     vol.Optional("config_entry_id"): cv.string,
 })
 
@@ -37,22 +98,112 @@ UPDATE_TASK_SCHEMA = vol.Schema({
     vol.Optional("name"): cv.string,
     vol.Optional("description"): cv.string,
     vol.Optional("due_date"): cv.string,
+    vol.Optional("wait_for_refresh", default=False): cv.boolean,
     vol.Optional("config_entry_id"): cv.string,
 })
 
 DELETE_TASK_SCHEMA = vol.Schema({
     vol.Required("task_id"): cv.positive_int,
+    vol.Optional("wait_for_refresh", default=False): cv.boolean,
+    vol.Optional("config_entry_id"): cv.string,
+})
+
+BATCH_CONCURRENCY_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_BATCH_CONCURRENCY))
+
+COMPLETE_TASKS_SCHEMA = vol.Schema({
+    vol.Required("task_ids"): vol.All(cv.ensure_list, [cv.positive_int]),
+    vol.Optional("completed_by"): cv.positive_int,
+    vol.Optional("max_concurrency", default=DEFAULT_BATCH_CONCURRENCY): BATCH_CONCURRENCY_SCHEMA,
+    vol.Optional("wait_for_refresh", default=False): cv.boolean,
+    vol.Optional("config_entry_id"): cv.string,
+})
+
+DELETE_TASKS_SCHEMA = vol.Schema({
+    vol.Required("task_ids"): vol.All(cv.ensure_list, [cv.positive_int]),
+    vol.Optional("max_concurrency", default=DEFAULT_BATCH_CONCURRENCY): BATCH_CONCURRENCY_SCHEMA,
+    vol.Optional("wait_for_refresh", default=False): cv.boolean,
+    vol.Optional("config_entry_id"): cv.string,
+})
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("cycles", default=DEFAULT_PROFILE_CYCLES): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_CYCLES)),
+    vol.Optional("full", default=True): cv.boolean,
     vol.Optional("config_entry_id"): cv.string,
 })
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Donetick from a config entry."""
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = {
-        CONF_URL: entry.data[CONF_URL],
-        CONF_TOKEN: entry.data[CONF_TOKEN],
-        CONF_SHOW_DUE_IN: entry.data.get(CONF_SHOW_DUE_IN,7),
-    }
+
+    # A single client and set of coordinators shared by every platform and service call
+    if entry.data.get(CONF_DEDICATED_SESSION, False):
+        session, release_session = async_acquire_session(hass, entry.data[CONF_URL], DonetickSessionConfig(
+            max_connections=entry.data.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+            keepalive_timeout=entry.data.get(CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT),
+            dns_cache_ttl=entry.data.get(CONF_DNS_CACHE_TTL, DEFAULT_DNS_CACHE_TTL),
+            compression=entry.data.get(CONF_COMPRESSION, True),
+        ))
+        # Registered first so the session is released after everything using it
+        entry.async_on_unload(release_session)
+    else:
+        session = async_get_clientsession(hass)
+    # Requests of every entry using this server share its rate limit
+    scheduler, release_scheduler = async_acquire_scheduler(
+        hass,
+        entry.data[CONF_URL],
+        entry.data.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+        entry.data.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
+    )
+    entry.async_on_unload(release_scheduler)
+    client = DonetickApiClient(entry.data[CONF_URL], entry.data[CONF_TOKEN], session, scheduler=scheduler)
+    refresh_interval = entry.data.get(CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL)
+    things_refresh_interval = DEFAULT_THINGS_REFRESH_INTERVAL
+    push = entry.data.get(CONF_PUSH_UPDATES, False) and CONF_WEBHOOK_ID in entry.data
+    # Webhooks are only loaded for entries using push updates
+    if push and not await async_setup_component(hass, webhook.DOMAIN, {}):
+        _LOGGER.error("Webhooks could not be set up, Donetick push updates are disabled")
+        push = False
+    if push:
+        # Changes arrive through the webhook; polling only catches missed pushes
+        refresh_interval = max(refresh_interval, PUSH_SAFETY_NET_INTERVAL)
+        things_refresh_interval = PUSH_SAFETY_NET_INTERVAL
+    runtime = DonetickRuntimeData(
+        client=client,
+        todo_coordinator=DonetickTodoCoordinator(
+            hass,
+            client,
+            refresh_interval,
+            # Pushes deliver changes and due dates need no early poll: keep the safety net interval
+            not push and entry.data.get(CONF_ADAPTIVE_REFRESH, True),
+            entry.data.get(CONF_MUTATION_REFRESH_DELAY, DEFAULT_MUTATION_REFRESH_DELAY),
+            entry.data.get(CONF_INCREMENTAL_SYNC, False),
+        ),
+        members_coordinator=DonetickMembersCoordinator(hass, client, refresh_interval),
+        things_coordinator=DonetickThingsCoordinator(hass, client, things_refresh_interval),
+        show_due_in=entry.data.get(CONF_SHOW_DUE_IN, 7),
+    )
+
+    # Render from the last good snapshot right away and refresh in the background,
+    # so a slow or unreachable server does not hold up startup
+    snapshot = DonetickSnapshot(hass, entry.entry_id)
+    if await snapshot.async_load(runtime):
+        for coordinator in (runtime.todo_coordinator, runtime.members_coordinator, runtime.things_coordinator):
+            entry.async_create_background_task(
+                hass, coordinator.async_refresh(), f"{DOMAIN} {coordinator.name} initial refresh"
+            )
+    else:
+        await runtime.todo_coordinator.async_config_entry_first_refresh()
+        # Members and things are optional; their platforms cope with missing data
+        await runtime.members_coordinator.async_refresh()
+        await runtime.things_coordinator.async_refresh()
+    entry.async_on_unload(snapshot.async_track(runtime))
+    # Drops a pending post-mutation refresh; older cores do not shut coordinators down on unload
+    entry.async_on_unload(runtime.todo_coordinator.async_shutdown)
+
+    if push:
+        entry.async_on_unload(async_register_push(hass, entry, runtime))
+
+    hass.data[DOMAIN][entry.entry_id] = runtime
     
     # Register services before setting up platforms
     async def complete_task_handler(call: ServiceCall) -> None:
@@ -67,6 +218,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     async def delete_task_handler(call: ServiceCall) -> None:
         await async_delete_task_service(hass, call)
     
+    async def complete_tasks_handler(call: ServiceCall) -> ServiceResponse:
+        return await async_complete_tasks_service(hass, call)
+    
+    async def delete_tasks_handler(call: ServiceCall) -> ServiceResponse:
+        return await async_delete_tasks_service(hass, call)
+    
+    async def profile_handler(call: ServiceCall) -> ServiceResponse:
+        return await async_profile_service(hass, call)
+    
     hass.services.async_register(
         DOMAIN,
         SERVICE_COMPLETE_TASK,
@@ -91,9 +251,28 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         delete_task_handler,
         schema=DELETE_TASK_SCHEMA,
     )
-    _LOGGER.debug("Registered services: %s.%s, %s.%s, %s.%s, %s.%s", 
-                  DOMAIN, SERVICE_COMPLETE_TASK, DOMAIN, SERVICE_CREATE_TASK, 
-                  DOMAIN, SERVICE_UPDATE_TASK, DOMAIN, SERVICE_DELETE_TASK)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_COMPLETE_TASKS,
+        complete_tasks_handler,
+        schema=COMPLETE_TASKS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DELETE_TASKS,
+        delete_tasks_handler,
+        schema=DELETE_TASKS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        profile_handler,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    _LOGGER.debug("Registered services: %s", ", ".join(f"{DOMAIN}.{name}" for name in SERVICES))
     
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -108,49 +287,16 @@ async def async_complete_task_service(hass: HomeAssistant, call: ServiceCall) ->
     config_entry_id = call.data.get("config_entry_id")
     
     # Find the config entry to use
-    entry = None
-    if config_entry_id:
-        # Check if it's a config entry ID
-        entry = hass.config_entries.async_get_entry(config_entry_id)
-        
-        # If not found, check if it's an entity ID and extract config entry from it
-        if not entry and config_entry_id.startswith("todo."):
-            entity_registry = hass.helpers.entity_registry.async_get()
-            entity_entry = entity_registry.async_get(config_entry_id)
-            if entity_entry:
-                entry = hass.config_entries.async_get_entry(entity_entry.config_entry_id)
-        
-        if not entry:
-            _LOGGER.error("Config entry not found for: %s", config_entry_id)
-            return
-    else:
-        # Use the first Donetick integration if no specific entry provided
-        entries = [entry for entry in hass.config_entries.async_entries(DOMAIN)]
-        if not entries:
-            _LOGGER.error("No Donetick integration found")
-            return
-        entry = entries[0]
-    
-    # Get API client
-    session = async_get_clientsession(hass)
-    client = DonetickApiClient(
-        hass.data[DOMAIN][entry.entry_id][CONF_URL],
-        hass.data[DOMAIN][entry.entry_id][CONF_TOKEN],
-        session,
-    )
+    runtime = _get_runtime_data(hass, config_entry_id)
+    if not runtime:
+        return
     
     try:
-        result = await client.async_complete_task(task_id, completed_by)
+        result = await runtime.client.async_complete_task(task_id, completed_by)
         _LOGGER.info("Task %d completed successfully by user %s", task_id, completed_by or "default")
         
-        # Trigger coordinator refresh for all todo entities
-        entity_registry = hass.helpers.entity_registry.async_get()
-        for entity_id in hass.states.async_entity_ids("todo"):
-            if entity_id.startswith("todo.dt_"):
-                entity_entry = entity_registry.async_get(entity_id)
-                if entity_entry and entity_entry.config_entry_id == entry.entry_id:
-                    # Trigger update - this will refresh the coordinator
-                    await hass.helpers.entity_component.async_update_entity(entity_id)
+        # Patch the returned task into the entry's todo coordinator, which updates all of its todo entities
+        await _async_wait_for_refresh(call, runtime.todo_coordinator.async_apply_tasks(upserts=[result]))
                     
     except Exception as e:
         _LOGGER.error("Failed to complete task %d: %s", task_id, e)
@@ -164,24 +310,16 @@ async def async_create_task_service(hass: HomeAssistant, call: ServiceCall) -> N
     config_entry_id = call.data.get("config_entry_id")
     
     # Find the config entry to use
-    entry = await _get_config_entry(hass, config_entry_id)
-    if not entry:
+    runtime = _get_runtime_data(hass, config_entry_id)
+    if not runtime:
         return
     
-    # Get API client
-    session = async_get_clientsession(hass)
-    client = DonetickApiClient(
-        hass.data[DOMAIN][entry.entry_id][CONF_URL],
-        hass.data[DOMAIN][entry.entry_id][CONF_TOKEN],
-        session,
-    )
-    
     try:
-        result = await client.async_create_task(name, description, due_date, created_by)
+        result = await runtime.client.async_create_task(name, description, due_date, created_by)
         _LOGGER.info("Task '%s' created successfully with ID %d", name, result.id)
         
-        # Trigger coordinator refresh for all todo entities
-        await _refresh_todo_entities(hass, entry.entry_id)
+        # Patch the returned task into the entry's todo coordinator, which updates all of its todo entities
+        await _async_wait_for_refresh(call, runtime.todo_coordinator.async_apply_tasks(upserts=[result]))
                     
     except Exception as e:
         _LOGGER.error("Failed to create task '%s': %s", name, e)
@@ -195,24 +333,16 @@ async def async_update_task_service(hass: HomeAssistant, call: ServiceCall) -> N
     config_entry_id = call.data.get("config_entry_id")
     
     # Find the config entry to use
-    entry = await _get_config_entry(hass, config_entry_id)
-    if not entry:
+    runtime = _get_runtime_data(hass, config_entry_id)
+    if not runtime:
         return
     
-    # Get API client
-    session = async_get_clientsession(hass)
-    client = DonetickApiClient(
-        hass.data[DOMAIN][entry.entry_id][CONF_URL],
-        hass.data[DOMAIN][entry.entry_id][CONF_TOKEN],
-        session,
-    )
-    
     try:
-        result = await client.async_update_task(task_id, name, description, due_date)
+        result = await runtime.client.async_update_task(task_id, name, description, due_date)
         _LOGGER.info("Task %d updated successfully", task_id)
         
-        # Trigger coordinator refresh for all todo entities
-        await _refresh_todo_entities(hass, entry.entry_id)
+        # Patch the returned task into the entry's todo coordinator, which updates all of its todo entities
+        await _async_wait_for_refresh(call, runtime.todo_coordinator.async_apply_tasks(upserts=[result]))
                     
     except Exception as e:
         _LOGGER.error("Failed to update task %d: %s", task_id, e)
@@ -223,67 +353,117 @@ async def async_delete_task_service(hass: HomeAssistant, call: ServiceCall) -> N
     config_entry_id = call.data.get("config_entry_id")
     
     # Find the config entry to use
-    entry = await _get_config_entry(hass, config_entry_id)
-    if not entry:
+    runtime = _get_runtime_data(hass, config_entry_id)
+    if not runtime:
         return
     
-    # Get API client
-    session = async_get_clientsession(hass)
-    client = DonetickApiClient(
-        hass.data[DOMAIN][entry.entry_id][CONF_URL],
-        hass.data[DOMAIN][entry.entry_id][CONF_TOKEN],
-        session,
-    )
-    
     try:
-        success = await client.async_delete_task(task_id)
+        success = await runtime.client.async_delete_task(task_id)
         if success:
             _LOGGER.info("Task %d deleted successfully", task_id)
             
-            # Trigger coordinator refresh for all todo entities
-            await _refresh_todo_entities(hass, entry.entry_id)
+            # Drop the task from the entry's todo coordinator, which updates all of its todo entities
+            await _async_wait_for_refresh(call, runtime.todo_coordinator.async_apply_tasks(removed_ids=[task_id]))
         else:
             _LOGGER.error("Failed to delete task %d", task_id)
                     
     except Exception as e:
         _LOGGER.error("Failed to delete task %d: %s", task_id, e)
 
-async def _get_config_entry(hass: HomeAssistant, config_entry_id: str = None) -> ConfigEntry:
-    """Get the config entry to use for the service call."""
-    entry = None
+async def async_complete_tasks_service(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Handle the complete_tasks service call."""
+    task_ids = call.data["task_ids"]
+    completed_by = call.data.get("completed_by")
+    
+    runtime = _get_runtime_data(hass, call.data.get("config_entry_id"))
+    if not runtime:
+        return {"results": []}
+    
+    results = await runtime.client.async_complete_tasks(task_ids, completed_by, call.data["max_concurrency"])
+    completed = [r for r in results.values() if not isinstance(r, Exception)]
+    _LOGGER.info("Completed %d of %d tasks", len(completed), len(results))
+    
+    # One coordinator update for the whole batch
+    await _async_wait_for_refresh(call, runtime.todo_coordinator.async_apply_tasks(upserts=completed))
+    return _batch_response(results, "complete")
+
+async def async_delete_tasks_service(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Handle the delete_tasks service call."""
+    task_ids = call.data["task_ids"]
+    
+    runtime = _get_runtime_data(hass, call.data.get("config_entry_id"))
+    if not runtime:
+        return {"results": []}
+    
+    results = await runtime.client.async_delete_tasks(task_ids, call.data["max_concurrency"])
+    deleted = [task_id for task_id, r in results.items() if r is True]
+    _LOGGER.info("Deleted %d of %d tasks", len(deleted), len(results))
+    
+    # One coordinator update for the whole batch
+    await _async_wait_for_refresh(call, runtime.todo_coordinator.async_apply_tasks(removed_ids=deleted))
+    return _batch_response(results, "delete")
+
+async def async_profile_service(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Handle the profile service call."""
+    runtime = _get_runtime_data(hass, call.data.get("config_entry_id"))
+    if not runtime:
+        return {"report": None}
+    if hass.data.get(PROFILING_KEY):
+        _LOGGER.error("A Donetick profile is already running")
+        return {"report": None}
+    
+    entry_id = next(entry_id for entry_id, loaded in hass.data[DOMAIN].items() if loaded is runtime)
+    hass.data[PROFILING_KEY] = True
+    try:
+        profile, path = await async_profile(hass, entry_id, runtime, call.data["cycles"], call.data["full"])
+    finally:
+        hass.data.pop(PROFILING_KEY)
+    return {"report": path, **profile.as_dict()}
+
+async def _async_wait_for_refresh(call: ServiceCall, refreshed: asyncio.Future) -> None:
+    """Wait for the refresh following a mutation when the call asked for it."""
+    if not call.data["wait_for_refresh"]:
+        return
+    # Shielded: the refresh is shared with other mutations in the same quiet window
+    if not await asyncio.shield(refreshed):
+        _LOGGER.warning("Refreshing Donetick tasks after %s failed", call.service)
+
+def _batch_response(results: dict, action: str) -> ServiceResponse:
+    """Build the per-task service response of a batch call, logging failures."""
+    response = []
+    for task_id, result in results.items():
+        if isinstance(result, Exception):
+            _LOGGER.error("Failed to %s task %d: %s", action, task_id, result)
+            response.append({"task_id": task_id, "success": False, "error": str(result)})
+        elif result is False:
+            _LOGGER.error("Failed to %s task %d", action, task_id)
+            response.append({"task_id": task_id, "success": False, "error": None})
+        else:
+            response.append({"task_id": task_id, "success": True, "error": None})
+    return {"results": response}
+
+def _get_runtime_data(hass: HomeAssistant, config_entry_id: str = None) -> DonetickRuntimeData | None:
+    """Get the runtime data of the config entry to use for the service call."""
+    loaded = hass.data.get(DOMAIN, {})
     if config_entry_id:
         # Check if it's a config entry ID
-        entry = hass.config_entries.async_get_entry(config_entry_id)
+        runtime = loaded.get(config_entry_id)
         
         # If not found, check if it's an entity ID and extract config entry from it
-        if not entry and config_entry_id.startswith("todo."):
-            entity_registry = hass.helpers.entity_registry.async_get()
-            entity_entry = entity_registry.async_get(config_entry_id)
-            if entity_entry:
-                entry = hass.config_entries.async_get_entry(entity_entry.config_entry_id)
+        if runtime is None and config_entry_id.startswith("todo."):
+            entity_entry = er.async_get(hass).async_get(config_entry_id)
+            if entity_entry and entity_entry.config_entry_id:
+                runtime = loaded.get(entity_entry.config_entry_id)
         
-        if not entry:
+        if runtime is None:
             _LOGGER.error("Config entry not found for: %s", config_entry_id)
-            return None
-    else:
-        # Use the first Donetick integration if no specific entry provided
-        entries = [entry for entry in hass.config_entries.async_entries(DOMAIN)]
-        if not entries:
-            _LOGGER.error("No Donetick integration found")
-            return None
-        entry = entries[0]
-    
-    return entry
+        return runtime
 
-async def _refresh_todo_entities(hass: HomeAssistant, config_entry_id: str) -> None:
-    """Refresh all todo entities for the given config entry."""
-    entity_registry = hass.helpers.entity_registry.async_get()
-    for entity_id in hass.states.async_entity_ids("todo"):
-        if entity_id.startswith("todo.dt_"):
-            entity_entry = entity_registry.async_get(entity_id)
-            if entity_entry and entity_entry.config_entry_id == config_entry_id:
-                # Trigger update - this will refresh the coordinator
-                await hass.helpers.entity_component.async_update_entity(entity_id)
+    # Use the first loaded Donetick integration if no specific entry provided
+    if not loaded:
+        _LOGGER.error("No Donetick integration found")
+        return None
+    return next(iter(loaded.values()))
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
@@ -293,15 +473,17 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         
         # Remove services if this is the last config entry
         if not hass.data[DOMAIN]:
-            for service_name in [SERVICE_COMPLETE_TASK, SERVICE_CREATE_TASK, SERVICE_UPDATE_TASK, SERVICE_DELETE_TASK]:
+            for service_name in SERVICES:
                 if hass.services.has_service(DOMAIN, service_name):
                     hass.services.async_remove(DOMAIN, service_name)
-            _LOGGER.debug("Removed services: %s.%s, %s.%s, %s.%s, %s.%s", 
-                          DOMAIN, SERVICE_COMPLETE_TASK, DOMAIN, SERVICE_CREATE_TASK, 
-                          DOMAIN, SERVICE_UPDATE_TASK, DOMAIN, SERVICE_DELETE_TASK)
+            _LOGGER.debug("Removed services: %s", ", ".join(f"{DOMAIN}.{name}" for name in SERVICES))
     
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the snapshot of a deleted config entry."""
+    await DonetickSnapshot(hass, entry.entry_id).async_remove()
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
     await hass.config_entries.async_reload(entry.entry_id)
\ No newline at end of file
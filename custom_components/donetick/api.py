@@ -1,128 +1,296 @@
 """API client for Donetick."""
+import asyncio
+import hashlib
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import json
-from typing import List, Optional
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 import aiohttp
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import API_TIMEOUT
-from .model import DonetickTask, DonetickThing, DonetickMember
+from .const import API_TIMEOUT, DEFAULT_BATCH_CONCURRENCY, DELTA_SYNC_OVERLAP, SINGLE_FLIGHT_ENDPOINTS
+from .metrics import DonetickMetrics
+from .model import DonetickTask, DonetickTaskChanges, DonetickThing, DonetickMember, json_loads
+from .resilience import CircuitBreaker, RetryPolicy, async_call_with_resilience
+from .scheduler import PRIORITY_BACKGROUND, PRIORITY_USER, RequestScheduler
 _LOGGER = logging.getLogger(__name__)
 
 class DonetickApiClient:
     """API client for Donetick."""
 
-    def __init__(self, base_url: str, token: str, session: aiohttp.ClientSession) -> None:
-        """Initialize the API client."""
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        session: aiohttp.ClientSession,
+        retry_policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        single_flight: Iterable[str] = SINGLE_FLIGHT_ENDPOINTS,
+        metrics: Optional[DonetickMetrics] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ) -> None:
+        """Initialize the API client.
+
+        single_flight names the read endpoints (see SINGLE_FLIGHT_ENDPOINTS) whose
+        concurrent identical requests share one request to the server. Without a
+        scheduler requests are sent as soon as they are made.
+        """
         self._base_url = base_url.rstrip('/')
         self._token = token
         self._session = session
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or DonetickMetrics()
+        self.scheduler = scheduler
+        # Per list endpoint: conditional request headers, body digest and parsed result
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._digests: Dict[str, bytes] = {}
+        self._cached_lists: Dict[str, list] = {}
+        # Per list: malformed rows skipped in its last decoded response
+        self.skipped_rows: Dict[str, int] = {}
+        # Per path: server Date of the last response, the base of sync watermarks
+        self._server_dates: Dict[str, Optional[str]] = {}
+        # Single-flight reads: the request in flight per key, and callers that joined one
+        self._single_flight = frozenset(single_flight)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._waiters: Dict[asyncio.Future, int] = {}
+        self.coalesced_requests: Counter = Counter()
 
     async def async_get_tasks(self) -> List[DonetickTask]:
         """Get tasks from Donetick."""
+        return await self._async_coalesce("tasks", "tasks", lambda: self._async_get_list(
+            "/eapi/v1/chore", DonetickTask.from_json_list, "tasks"
+        ))
+
+    async def async_get_task_changes(self, since: str) -> DonetickTaskChanges:
+        """Get the chores changed or deleted since a watermark.
+
+        Servers without delta support ignore the updatedSince query and return
+        the full list, reported as a DonetickTaskChanges with full set.
+        """
+        return await self._async_coalesce("tasks", f"tasks?since={since}", lambda: self._async_fetch_task_changes(since))
+
+    def task_sync_watermark(self) -> str:
+        """Return the watermark to request chore changes after the last full chore list.
+
+        Based on the server's Date header to avoid clock skew, reaching back
+        DELTA_SYNC_OVERLAP seconds since the header only has second precision
+        and re-applied upserts are harmless.
+        """
+        return self._watermark_from_date(self._server_dates.get("/eapi/v1/chore"))
+
+    @staticmethod
+    def _watermark_from_date(date: Optional[str]) -> str:
+        """Return a watermark DELTA_SYNC_OVERLAP before a Date header, or before now without one."""
+        when = None
+        if date:
+            try:
+                when = parsedate_to_datetime(date)
+            except (TypeError, ValueError):
+                _LOGGER.debug("Invalid Date header from Donetick: %s", date)
+        if when is None or when.tzinfo is None:
+            when = datetime.now(timezone.utc)
+        return (when - timedelta(seconds=DELTA_SYNC_OVERLAP)).isoformat()
+
+    async def _async_fetch_task_changes(self, since: str) -> DonetickTaskChanges:
+        """Fetch the chores changed since a watermark."""
         headers = {
             "secretkey": f"{self._token}",
             "Content-Type": "application/json",
         }
-        
-        try:
+
+        async def _request():
             async with self._session.get(
                 f"{self._base_url}/eapi/v1/chore",
                 headers=headers,
+                params={"updatedSince": since},
                 timeout=API_TIMEOUT
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
-                
-                if not isinstance(data, list) :
-                    _LOGGER.error("Unexpected response format from Donetick API")
-                    return []
-                
-                return [DonetickTask.from_json(task) for task in data]
-                
+                return await response.read(), response.headers.get("Date")
+
+        try:
+            body, date = await self._async_call(_request, True, "task changes", mutates=False)
         except aiohttp.ClientError as err:
-            _LOGGER.error("Error fetching tasks from Donetick: %s", err)
+            _LOGGER.error("Error fetching task changes from Donetick: %s", err)
             raise
-        except (KeyError, ValueError, json.JSONDecodeError) as err:
-            _LOGGER.error("Error parsing Donetick response: %s", err)
-            return []
+
+        self.metrics.record_bytes("task changes", len(body))
+        try:
+            start = time.perf_counter()
+            data = json_loads(body)
+            decoded = time.perf_counter()
+            if isinstance(data, list):
+                changes = DonetickTaskChanges(DonetickTask.from_json_list(data), [], self._watermark_from_date(date), full=True)
+            else:
+                changes = DonetickTaskChanges(
+                    DonetickTask.from_json_list(data.get("upserts") or []),
+                    [int(task_id) for task_id in data.get("deletedIds") or []],
+                    data.get("watermark") or self._watermark_from_date(date),
+                )
+            self.metrics.record_parse("task changes", decoded - start, time.perf_counter() - decoded)
+            return changes
+        except (AttributeError, TypeError, ValueError) as err:
+            # Unlike a full list, an unusable delta must not be mistaken for "no chores"
+            _LOGGER.error("Error parsing Donetick task changes response: %s", err)
+            raise ValueError(f"Invalid task changes response: {err}") from err
 
     async def async_get_circle_members(self) -> List[DonetickMember]:
         """Get circle members from Donetick."""
-        headers = {
-            "secretkey": f"{self._token}",
-            "Content-Type": "application/json",
-        }
-        
-        try:
-            async with self._session.get(
-                f"{self._base_url}/eapi/v1/circle/members",
-                headers=headers,
-                timeout=API_TIMEOUT
-            ) as response:
-                response.raise_for_status()
-                data = await response.json()
-                
-                if not isinstance(data, list):
-                    _LOGGER.error("Unexpected response format from Donetick circle members API")
-                    return []
-                
-                return [DonetickMember.from_json(member) for member in data]
-                
-        except aiohttp.ClientError as err:
-            _LOGGER.error("Error fetching circle members from Donetick: %s", err)
-            raise
-        except (KeyError, ValueError, json.JSONDecodeError) as err:
-            _LOGGER.error("Error parsing Donetick circle members response: %s", err)
-            return []
+        return await self._async_coalesce("circle_members", "circle_members", lambda: self._async_get_list(
+            "/eapi/v1/circle/members", DonetickMember.from_json_list, "circle members"
+        ))
 
     async def async_get_things(self) -> List[DonetickThing]:
         """Get things from Donetick."""
+        return await self._async_coalesce("things", "things", lambda: self._async_get_list(
+            "/eapi/v1/things", DonetickThing.from_json_list, "things"
+        ))
+
+    async def _async_coalesce(self, endpoint: str, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fetch, or share the result of the identical request already in flight.
+
+        Only requests in flight are shared; a read starting after one finished
+        sends its own request. Every write forgets the requests in flight, so a
+        read started after a write never gets a response older than the write.
+        """
+        if endpoint not in self._single_flight:
+            return await fetch()
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced_requests[endpoint] += 1
+            _LOGGER.debug("Joining Donetick %s request already in flight", key)
+        else:
+            future = asyncio.ensure_future(fetch())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._request_done(key, done))
+        # A cancelled caller must not cancel the request the others are waiting for,
+        # but the request is cancelled once nobody waits for it anymore
+        self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._waiters[future] -= 1
+            if not self._waiters[future]:
+                del self._waiters[future]
+                future.cancel()
+
+    def _request_done(self, key: str, future: asyncio.Future) -> None:
+        """Forget a finished request so the next read sends a new one."""
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        if not future.cancelled():
+            # Retrieved here so an error is not reported as unhandled when every caller was cancelled
+            future.exception()
+
+    def clear_cache(self) -> None:
+        """Forget cached lists and their validators, so the next reads download and decode everything."""
+        self._validators.clear()
+        self._digests.clear()
+        self._cached_lists.clear()
+
+    async def _async_get_list(self, path: str, parse: Callable[[list], list], what: str) -> list:
+        """GET a list endpoint, reusing the last parsed result when it did not change.
+
+        Sends the ETag/Last-Modified validators of the previous response when the
+        server provided them. On a 304, or a body identical to the previous one,
+        the previously parsed models are returned without decoding anything.
+        Callers must treat the returned list and its models as read-only.
+        Raises ValueError when the body is not a JSON list.
+        """
         headers = {
             "secretkey": f"{self._token}",
             "Content-Type": "application/json",
         }
+        cached = self._cached_lists.get(path)
+        if cached is not None:
+            headers.update(self._validators.get(path, {}))
         
-        try:
+        async def _request() -> Optional[Tuple[bytes, Dict[str, str]]]:
             async with self._session.get(
-                f"{self._base_url}/eapi/v1/things",
+                f"{self._base_url}{path}",
                 headers=headers,
                 timeout=API_TIMEOUT
             ) as response:
+                self._server_dates[path] = response.headers.get("Date")
+                if response.status == 304 and cached is not None:
+                    return None
                 response.raise_for_status()
-                data = await response.json()
-                
-                if not isinstance(data, list):
-                    _LOGGER.error("Unexpected response format from Donetick things API")
-                    return []
-                
-                return [DonetickThing.from_json(thing) for thing in data]
-                
+                body = await response.read()
+                validators = {}
+                if etag := response.headers.get("ETag"):
+                    validators["If-None-Match"] = etag
+                if last_modified := response.headers.get("Last-Modified"):
+                    validators["If-Modified-Since"] = last_modified
+                return body, validators
+
+        try:
+            response = await self._async_call(_request, True, what, mutates=False)
         except aiohttp.ClientError as err:
-            _LOGGER.error("Error fetching things from Donetick: %s", err)
+            _LOGGER.error("Error fetching %s from Donetick: %s", what, err)
             raise
-        except (KeyError, ValueError, json.JSONDecodeError) as err:
-            _LOGGER.error("Error parsing Donetick things response: %s", err)
-            return []
+        if response is None:
+            _LOGGER.debug("Donetick %s not modified", what)
+            return cached
+        body, validators = response
+        self.metrics.record_bytes(what, len(body))
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if cached is not None and digest == self._digests.get(path):
+            _LOGGER.debug("Donetick %s unchanged", what)
+            self._validators[path] = validators
+            return cached
+
+        start = time.perf_counter()
+        # An unusable body, such as a proxy's HTML page, must not be mistaken for an empty list
+        try:
+            data = json_loads(body)
+        except ValueError as err:
+            _LOGGER.error("Error parsing Donetick %s response: %s", what, err)
+            raise ValueError(f"Invalid {what} response: {err}") from err
+        if not isinstance(data, list):
+            _LOGGER.error("Unexpected response format from Donetick %s API", what)
+            raise ValueError(f"Invalid {what} response: expected a list")
+        decoded = time.perf_counter()
+        # Malformed rows are logged and skipped by the model decoders
+        result = parse(data)
+        self.metrics.record_parse(what, decoded - start, time.perf_counter() - decoded)
+
+        # Validators are only kept for a body that was parsed, so a 304 never revives an older list
+        self.skipped_rows[what] = len(data) - len(result)
+        self._validators[path] = validators
+        self._digests[path] = digest
+        self._cached_lists[path] = result
+        return result
 
     async def async_get_thing_state(self, thing_id: int) -> Optional[str]:
         """Get the current state of a thing."""
+        return await self._async_coalesce(
+            "thing_state", f"thing_state/{thing_id}", lambda: self._async_fetch_thing_state(thing_id)
+        )
+
+    async def _async_fetch_thing_state(self, thing_id: int) -> Optional[str]:
+        """Fetch the current state of a thing."""
         headers = {
             "secretkey": f"{self._token}",
             "Content-Type": "application/json",
         }
         
-        try:
+        async def _request():
             async with self._session.get(
                 f"{self._base_url}/eapi/v1/things/{thing_id}/state",
                 headers=headers,
                 timeout=API_TIMEOUT
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
+                data = await self._async_read_json(response, "thing state")
                 return data.get("state")
-                
+
+        try:
+            return await self._async_call(_request, True, "thing state", mutates=False)
         except aiohttp.ClientError as err:
             _LOGGER.error("Error fetching thing state from Donetick: %s", err)
             raise
@@ -139,7 +307,7 @@ class DonetickApiClient:
         
         params = {"state": state}
         
-        try:
+        async def _request():
             async with self._session.get(
                 f"{self._base_url}/eapi/v1/things/{thing_id}/state",
                 headers=headers,
@@ -148,7 +316,9 @@ class DonetickApiClient:
             ) as response:
                 response.raise_for_status()
                 return True
-                
+
+        try:
+            return await self._async_call(_request, True, "thing state update")
         except aiohttp.ClientError as err:
             _LOGGER.error("Error setting thing state in Donetick: %s", err)
             raise
@@ -169,7 +339,7 @@ class DonetickApiClient:
         if increment is not None:
             params["op"] = increment
         
-        try:
+        async def _request():
             async with self._session.get(
                 f"{self._base_url}/eapi/v1/things/{thing_id}/state/change",
                 headers=headers,
@@ -177,9 +347,11 @@ class DonetickApiClient:
                 timeout=API_TIMEOUT
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
+                data = await self._async_read_json(response, "thing state change")
                 return data.get("state")
-                
+
+        try:
+            return await self._async_call(_request, increment is None, "thing state change")
         except aiohttp.ClientError as err:
             _LOGGER.error("Error changing thing state in Donetick: %s", err)
             raise
@@ -202,7 +374,7 @@ class DonetickApiClient:
         else:
             _LOGGER.debug("No completedBy parameter - using default")
 
-        try:
+        async def _request():
             async with self._session.post(
                 f"{self._base_url}/eapi/v1/chore/{choreId}/complete",
                 headers=headers,
@@ -210,9 +382,11 @@ class DonetickApiClient:
                 timeout=API_TIMEOUT
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
+                data = await self._async_read_json(response, "task completion")
                 return DonetickTask.from_json(data)
 
+        try:
+            return await self._async_call(_request, False, "task completion")
         except aiohttp.ClientError as err:
             _LOGGER.error("Error completing task in Donetick: %s", err)
             raise
@@ -235,7 +409,7 @@ class DonetickApiClient:
         if created_by:
             payload["createdBy"] = created_by
 
-        try:
+        async def _request():
             async with self._session.post(
                 f"{self._base_url}/eapi/v1/chore",
                 headers=headers,
@@ -243,9 +417,11 @@ class DonetickApiClient:
                 timeout=API_TIMEOUT
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
+                data = await self._async_read_json(response, "task creation")
                 return DonetickTask.from_json(data)
 
+        try:
+            return await self._async_call(_request, False, "task creation")
         except aiohttp.ClientError as err:
             _LOGGER.error("Error creating task in Donetick: %s", err)
             raise
@@ -271,7 +447,7 @@ class DonetickApiClient:
         if not payload:
             raise ValueError("At least one field must be provided for update")
 
-        try:
+        async def _request():
             async with self._session.put(
                 f"{self._base_url}/eapi/v1/chore/{task_id}",
                 headers=headers,
@@ -279,9 +455,11 @@ class DonetickApiClient:
                 timeout=API_TIMEOUT
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
+                data = await self._async_read_json(response, "task update")
                 return DonetickTask.from_json(data)
 
+        try:
+            return await self._async_call(_request, True, "task update")
         except aiohttp.ClientError as err:
             _LOGGER.error("Error updating task in Donetick: %s", err)
             raise
@@ -296,18 +474,100 @@ class DonetickApiClient:
             "Content-Type": "application/json",
         }
 
-        try:
+        attempts = 0
+
+        async def _request():
+            nonlocal attempts
+            attempts += 1
             async with self._session.delete(
                 f"{self._base_url}/eapi/v1/chore/{task_id}",
                 headers=headers,
                 timeout=API_TIMEOUT
             ) as response:
+                if response.status == 404 and attempts > 1:
+                    # An earlier attempt deleted the task before its answer was lost
+                    _LOGGER.debug("Task %d was already deleted by an earlier attempt", task_id)
+                    return True
                 response.raise_for_status()
                 return True
 
+        try:
+            return await self._async_call(_request, True, "task deletion")
         except aiohttp.ClientError as err:
             _LOGGER.error("Error deleting task in Donetick: %s", err)
             raise
         except Exception as err:
             _LOGGER.error("Error deleting task: %s", err)
-            return False
\ No newline at end of file
+            return False
+
+    async def _async_read_json(self, response: aiohttp.ClientResponse, what: str) -> Any:
+        """Read and decode a JSON response body, recording its size and decode time."""
+        body = await response.read()
+        self.metrics.record_bytes(what, len(body))
+        start = time.perf_counter()
+        data = json_loads(body)
+        self.metrics.record_parse(what, time.perf_counter() - start)
+        return data
+
+    async def _async_call(self, request: Callable[[], Awaitable[Any]], idempotent: bool, what: str, mutates: bool = True) -> Any:
+        """Send a request through the circuit breaker, retrying it when that is safe.
+
+        Only idempotent requests are retried after the server saw them; any
+        request is retried when the connection could not be established.
+        Every attempt waits for the scheduler, if any, with mutations ahead of reads.
+        """
+        async def _scheduled_request() -> Any:
+            if self.scheduler is None:
+                return await _timed_request()
+            async with self.scheduler.slot(PRIORITY_USER if mutates else PRIORITY_BACKGROUND):
+                return await _timed_request()
+
+        async def _timed_request() -> Any:
+            start = time.perf_counter()
+            try:
+                result = await request()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.metrics.record_request(what, time.perf_counter() - start, error=True)
+                raise
+            self.metrics.record_request(what, time.perf_counter() - start)
+            return result
+
+        try:
+            return await async_call_with_resilience(_scheduled_request, self.breaker, self.retry_policy, idempotent, what)
+        finally:
+            if mutates:
+                # Reads in flight may have been answered before this write landed,
+                # even if it failed on our side
+                self._in_flight.clear()
+
+    async def async_complete_tasks(self, task_ids: Iterable[int], completed_by: int = None, max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> Dict[int, Any]:
+        """Complete several tasks concurrently.
+
+        Returns the completed DonetickTask or the raised exception for each task id.
+        """
+        return await self._async_batch(
+            task_ids,
+            lambda task_id: self.async_complete_task(task_id, completed_by),
+            max_concurrency,
+        )
+
+    async def async_delete_tasks(self, task_ids: Iterable[int], max_concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> Dict[int, Any]:
+        """Delete several tasks concurrently.
+
+        Returns the delete result or the raised exception for each task id.
+        """
+        return await self._async_batch(task_ids, self.async_delete_task, max_concurrency)
+
+    async def _async_batch(self, task_ids: Iterable[int], call: Callable[[int], Awaitable[Any]], max_concurrency: int) -> Dict[int, Any]:
+        """Run call for every unique task id with at most max_concurrency requests in flight."""
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(task_id: int) -> Any:
+            async with semaphore:
+                return await call(task_id)
+
+        unique_ids = list(dict.fromkeys(task_ids))
+        results = await asyncio.gather(*(run(task_id) for task_id in unique_ids), return_exceptions=True)
+        return dict(zip(unique_ids, results))
\ No newline at end of file
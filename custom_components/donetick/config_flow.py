@@ -6,6 +6,8 @@ import aiohttp
 from datetime import timedelta
 
 from homeassistant import config_entries
+from homeassistant.components import webhook
+from homeassistant.const import CONF_WEBHOOK_ID
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -16,11 +18,18 @@ from homeassistant.helpers.selector import (
     DurationSelectorConfig,
 )
 
-from .const import DOMAIN, CONF_URL, CONF_TOKEN, CONF_SHOW_DUE_IN, CONF_CREATE_UNIFIED_LIST, CONF_CREATE_ASSIGNEE_LISTS, CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL
+from .const import DOMAIN, CONF_URL, CONF_TOKEN, CONF_SHOW_DUE_IN, CONF_CREATE_UNIFIED_LIST, CONF_CREATE_ASSIGNEE_LISTS, CONF_REFRESH_INTERVAL, CONF_ADAPTIVE_REFRESH, CONF_MUTATION_REFRESH_DELAY, CONF_INCREMENTAL_SYNC, CONF_PUSH_UPDATES, CONF_DEDICATED_SESSION, CONF_MAX_CONNECTIONS, CONF_KEEPALIVE_TIMEOUT, CONF_DNS_CACHE_TTL, CONF_COMPRESSION, CONF_RATE_LIMIT, CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_REFRESH_INTERVAL, DEFAULT_MUTATION_REFRESH_DELAY, MAX_MUTATION_REFRESH_DELAY, DEFAULT_MAX_CONNECTIONS, MAX_CONNECTION_LIMIT, DEFAULT_KEEPALIVE_TIMEOUT, MAX_KEEPALIVE_TIMEOUT, DEFAULT_DNS_CACHE_TTL, MAX_DNS_CACHE_TTL, DEFAULT_RATE_LIMIT, MAX_RATE_LIMIT, DEFAULT_MAX_CONCURRENT_REQUESTS, MAX_CONCURRENT_REQUESTS
 from .api import DonetickApiClient
 
 _LOGGER = logging.getLogger(__name__)
 
+MUTATION_REFRESH_DELAY_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_MUTATION_REFRESH_DELAY))
+MAX_CONNECTIONS_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_CONNECTION_LIMIT))
+KEEPALIVE_TIMEOUT_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_KEEPALIVE_TIMEOUT))
+DNS_CACHE_TTL_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=0, max=MAX_DNS_CACHE_TTL))
+RATE_LIMIT_SCHEMA = vol.All(vol.Coerce(float), vol.Range(min=0, max=MAX_RATE_LIMIT))
+MAX_CONCURRENT_REQUESTS_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_CONCURRENT_REQUESTS))
+
 def _seconds_to_time_config(total_seconds: int):
     hours, remainder = divmod(total_seconds, 3600)
     minutes, seconds = divmod(remainder, 60)
@@ -66,7 +75,8 @@ class DonetickConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 # Store server data and proceed to options step  
                 self._server_data = user_input
                 return await self.async_step_options()
-            except aiohttp.ClientError:
+            except (aiohttp.ClientError, ValueError):
+                # ValueError: something answered that is not a Donetick server
                 errors["base"] = "cannot_connect"
             except Exception:  # pylint: disable=broad-except
                 errors["base"] = "unknown"
@@ -93,8 +103,21 @@ class DonetickConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_SHOW_DUE_IN: user_input.get(CONF_SHOW_DUE_IN, 7),
                 CONF_CREATE_UNIFIED_LIST: user_input.get(CONF_CREATE_UNIFIED_LIST, True),
                 CONF_CREATE_ASSIGNEE_LISTS: user_input.get(CONF_CREATE_ASSIGNEE_LISTS, False),
-                CONF_REFRESH_INTERVAL: refresh_interval
+                CONF_REFRESH_INTERVAL: refresh_interval,
+                CONF_ADAPTIVE_REFRESH: user_input.get(CONF_ADAPTIVE_REFRESH, True),
+                CONF_MUTATION_REFRESH_DELAY: user_input.get(CONF_MUTATION_REFRESH_DELAY, DEFAULT_MUTATION_REFRESH_DELAY),
+                CONF_INCREMENTAL_SYNC: user_input.get(CONF_INCREMENTAL_SYNC, False),
+                CONF_PUSH_UPDATES: user_input.get(CONF_PUSH_UPDATES, False),
+                CONF_DEDICATED_SESSION: user_input.get(CONF_DEDICATED_SESSION, False),
+                CONF_MAX_CONNECTIONS: user_input.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+                CONF_KEEPALIVE_TIMEOUT: user_input.get(CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT),
+                CONF_DNS_CACHE_TTL: user_input.get(CONF_DNS_CACHE_TTL, DEFAULT_DNS_CACHE_TTL),
+                CONF_COMPRESSION: user_input.get(CONF_COMPRESSION, True),
+                CONF_RATE_LIMIT: user_input.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+                CONF_MAX_CONCURRENT_REQUESTS: user_input.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
             }
+            if final_data[CONF_PUSH_UPDATES]:
+                final_data[CONF_WEBHOOK_ID] = webhook.async_generate_id()
             
             return self.async_create_entry(
                 title="Donetick",
@@ -110,6 +133,17 @@ class DonetickConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Optional(CONF_REFRESH_INTERVAL, default=_seconds_to_time_config(DEFAULT_REFRESH_INTERVAL)): DurationSelector(
                     DurationSelectorConfig(enable_day=False, allow_negative=False)
                 ),
+                vol.Optional(CONF_ADAPTIVE_REFRESH, default=True): bool,
+                vol.Optional(CONF_MUTATION_REFRESH_DELAY, default=DEFAULT_MUTATION_REFRESH_DELAY): MUTATION_REFRESH_DELAY_SCHEMA,
+                vol.Optional(CONF_INCREMENTAL_SYNC, default=False): bool,
+                vol.Optional(CONF_PUSH_UPDATES, default=False): bool,
+                vol.Optional(CONF_DEDICATED_SESSION, default=False): bool,
+                vol.Optional(CONF_MAX_CONNECTIONS, default=DEFAULT_MAX_CONNECTIONS): MAX_CONNECTIONS_SCHEMA,
+                vol.Optional(CONF_KEEPALIVE_TIMEOUT, default=DEFAULT_KEEPALIVE_TIMEOUT): KEEPALIVE_TIMEOUT_SCHEMA,
+                vol.Optional(CONF_DNS_CACHE_TTL, default=DEFAULT_DNS_CACHE_TTL): DNS_CACHE_TTL_SCHEMA,
+                vol.Optional(CONF_COMPRESSION, default=True): bool,
+                vol.Optional(CONF_RATE_LIMIT, default=DEFAULT_RATE_LIMIT): RATE_LIMIT_SCHEMA,
+                vol.Optional(CONF_MAX_CONCURRENT_REQUESTS, default=DEFAULT_MAX_CONCURRENT_REQUESTS): MAX_CONCURRENT_REQUESTS_SCHEMA,
             }),
         )
 
@@ -140,8 +174,24 @@ class DonetickOptionsFlowHandler(config_entries.OptionsFlow):
                 CONF_SHOW_DUE_IN: user_input.get(CONF_SHOW_DUE_IN, 7),
                 CONF_CREATE_UNIFIED_LIST: user_input.get(CONF_CREATE_UNIFIED_LIST, True),
                 CONF_CREATE_ASSIGNEE_LISTS: user_input.get(CONF_CREATE_ASSIGNEE_LISTS, False),
-                CONF_REFRESH_INTERVAL: refresh_interval
+                CONF_REFRESH_INTERVAL: refresh_interval,
+                CONF_ADAPTIVE_REFRESH: user_input.get(CONF_ADAPTIVE_REFRESH, True),
+                CONF_MUTATION_REFRESH_DELAY: user_input.get(CONF_MUTATION_REFRESH_DELAY, DEFAULT_MUTATION_REFRESH_DELAY),
+                CONF_INCREMENTAL_SYNC: user_input.get(CONF_INCREMENTAL_SYNC, False),
+                CONF_PUSH_UPDATES: user_input.get(CONF_PUSH_UPDATES, False),
+                CONF_DEDICATED_SESSION: user_input.get(CONF_DEDICATED_SESSION, False),
+                CONF_MAX_CONNECTIONS: user_input.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS),
+                CONF_KEEPALIVE_TIMEOUT: user_input.get(CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT),
+                CONF_DNS_CACHE_TTL: user_input.get(CONF_DNS_CACHE_TTL, DEFAULT_DNS_CACHE_TTL),
+                CONF_COMPRESSION: user_input.get(CONF_COMPRESSION, True),
+                CONF_RATE_LIMIT: user_input.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT),
+                CONF_MAX_CONCURRENT_REQUESTS: user_input.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS),
             }
+            # Keep the webhook URL stable across option changes
+            if webhook_id := self.entry.data.get(CONF_WEBHOOK_ID):
+                data[CONF_WEBHOOK_ID] = webhook_id
+            elif data[CONF_PUSH_UPDATES]:
+                data[CONF_WEBHOOK_ID] = webhook.async_generate_id()
 
             # Workaround to being able to use the same parameters in both config and options flow. 
             # https://community.home-assistant.io/t/configflowhandler-and-optionsflowhandler-managing-the-same-parameter/365582
@@ -174,6 +224,50 @@ class DonetickOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(
                     CONF_REFRESH_INTERVAL, 
                     default=_seconds_to_time_config(self.entry.data.get(CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL))
-                ): DurationSelector(DurationSelectorConfig(enable_day=False, allow_negative=False))
+                ): DurationSelector(DurationSelectorConfig(enable_day=False, allow_negative=False)),
+                vol.Optional(
+                    CONF_ADAPTIVE_REFRESH,
+                    default=self.entry.data.get(CONF_ADAPTIVE_REFRESH, True)
+                ): bool,
+                vol.Optional(
+                    CONF_MUTATION_REFRESH_DELAY,
+                    default=self.entry.data.get(CONF_MUTATION_REFRESH_DELAY, DEFAULT_MUTATION_REFRESH_DELAY)
+                ): MUTATION_REFRESH_DELAY_SCHEMA,
+                vol.Optional(
+                    CONF_INCREMENTAL_SYNC,
+                    default=self.entry.data.get(CONF_INCREMENTAL_SYNC, False)
+                ): bool,
+                vol.Optional(
+                    CONF_PUSH_UPDATES,
+                    default=self.entry.data.get(CONF_PUSH_UPDATES, False)
+                ): bool,
+                vol.Optional(
+                    CONF_DEDICATED_SESSION,
+                    default=self.entry.data.get(CONF_DEDICATED_SESSION, False)
+                ): bool,
+                vol.Optional(
+                    CONF_MAX_CONNECTIONS,
+                    default=self.entry.data.get(CONF_MAX_CONNECTIONS, DEFAULT_MAX_CONNECTIONS)
+                ): MAX_CONNECTIONS_SCHEMA,
+                vol.Optional(
+                    CONF_KEEPALIVE_TIMEOUT,
+                    default=self.entry.data.get(CONF_KEEPALIVE_TIMEOUT, DEFAULT_KEEPALIVE_TIMEOUT)
+                ): KEEPALIVE_TIMEOUT_SCHEMA,
+                vol.Optional(
+                    CONF_DNS_CACHE_TTL,
+                    default=self.entry.data.get(CONF_DNS_CACHE_TTL, DEFAULT_DNS_CACHE_TTL)
+                ): DNS_CACHE_TTL_SCHEMA,
+                vol.Optional(
+                    CONF_COMPRESSION,
+                    default=self.entry.data.get(CONF_COMPRESSION, True)
+                ): bool,
+                vol.Optional(
+                    CONF_RATE_LIMIT,
+                    default=self.entry.data.get(CONF_RATE_LIMIT, DEFAULT_RATE_LIMIT)
+                ): RATE_LIMIT_SCHEMA,
+                vol.Optional(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=self.entry.data.get(CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS)
+                ): MAX_CONCURRENT_REQUESTS_SCHEMA,
             }),
         )
\ No newline at end of file
@@ -8,7 +8,74 @@ CONF_SHOW_DUE_IN = "show_due_in"
 CONF_CREATE_UNIFIED_LIST = "create_unified_list"
 CONF_CREATE_ASSIGNEE_LISTS = "create_assignee_lists"
 CONF_REFRESH_INTERVAL = "refresh_interval"
+CONF_ADAPTIVE_REFRESH = "adaptive_refresh"
+CONF_MUTATION_REFRESH_DELAY = "mutation_refresh_delay"
+CONF_INCREMENTAL_SYNC = "incremental_sync"
+CONF_PUSH_UPDATES = "push_updates"
+CONF_DEDICATED_SESSION = "dedicated_session"
+CONF_MAX_CONNECTIONS = "max_connections"
+CONF_KEEPALIVE_TIMEOUT = "keepalive_timeout"
+CONF_DNS_CACHE_TTL = "dns_cache_ttl"
+CONF_COMPRESSION = "compression"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
 
 DEFAULT_REFRESH_INTERVAL = 900 # seconds - 15 minutes
+DEFAULT_THINGS_REFRESH_INTERVAL = 30 # seconds - same cadence things were polled at per entity
+THING_WRITE_SETTLE_DELAY = 0.5 # seconds - number and text thing writes wait this long for the next one
+THING_REMOVAL_REFRESHES = 3 # things refreshes in a row a thing must be missing from before its entity is deleted
 
-API_TIMEOUT = 10  # seconds
\ No newline at end of file
+# Adaptive refresh: the configured refresh interval is the ceiling
+ADAPTIVE_MIN_REFRESH_INTERVAL = 60 # seconds - floor used right after changes
+ADAPTIVE_ACTIVITY_WINDOW = 300 # seconds - keep polling at the floor this long after a mutation
+ADAPTIVE_DUE_MARGIN = 5 # seconds - refresh this long after the earliest upcoming due date
+
+DEFAULT_MUTATION_REFRESH_DELAY = 5 # seconds - quiet window after the last mutation before refreshing
+MAX_MUTATION_REFRESH_DELAY = 300
+MUTATION_REFRESH_MAX_DELAY_FACTOR = 4 # a burst of mutations postpones the refresh at most this many windows
+
+# Incremental sync: ask only for chores changed since a watermark
+DELTA_SYNC_FULL_RESYNC_INTERVAL = 6 * 3600 # seconds - full chore download for consistency this often
+DELTA_SYNC_OVERLAP = 60 # seconds - watermarks derived from the Date header reach back this far
+
+# Push updates: changes arrive through a webhook, polling is only a safety net
+PUSH_SAFETY_NET_INTERVAL = 3600 # seconds - tasks, members and things are polled at most this often while push is on
+
+# Dedicated session: a connection pool owned by the integration per Donetick server
+DEFAULT_MAX_CONNECTIONS = 10
+MAX_CONNECTION_LIMIT = 100
+DEFAULT_KEEPALIVE_TIMEOUT = 60 # seconds - idle connections are reused this long, 0 closes them after every request
+MAX_KEEPALIVE_TIMEOUT = 3600
+DEFAULT_DNS_CACHE_TTL = 300 # seconds - 0 resolves the host for every new connection
+MAX_DNS_CACHE_TTL = 86400
+
+# Request scheduling per Donetick server
+DEFAULT_RATE_LIMIT = 10 # requests per second, 0 disables the rate limit
+MAX_RATE_LIMIT = 100
+RATE_LIMIT_BURST = 2 # seconds worth of requests that may be sent at once after a quiet period
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+MAX_CONCURRENT_REQUESTS = 50
+
+API_TIMEOUT = 10  # seconds
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30 # seconds - coalesces snapshot writes after data changes
+DEFAULT_BATCH_CONCURRENCY = 4 # requests in flight per batch service call
+MAX_BATCH_CONCURRENCY = 20
+
+RETRY_ATTEMPTS = 3 # tries per call, the first one included
+RETRY_BASE_DELAY = 0.5 # seconds - backoff doubles from here, with full jitter
+RETRY_MAX_DELAY = 8 # seconds
+BREAKER_FAILURE_THRESHOLD = 5 # consecutive failures that open the circuit breaker
+BREAKER_RECOVERY_TIMEOUT = 30 # seconds - open breaker rejects calls this long before probing
+
+# Upper bounds of the API latency histogram buckets, the last bucket is unbounded
+METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # seconds
+
+# donetick.profile service
+DEFAULT_PROFILE_CYCLES = 5
+MAX_PROFILE_CYCLES = 100
+PROFILE_TOP_ALLOCATIONS = 25 # allocation sites listed in the report
+PROFILE_TOP_FUNCTIONS = 50 # functions listed in the report, by cumulative time
+
+# Reads whose concurrent identical requests share one request by default
+SINGLE_FLIGHT_ENDPOINTS = ("tasks", "circle_members", "things", "thing_state")
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""Data update coordinators for the Donetick integration."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Iterable, TypeVar
+
+import aiohttp
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import DonetickApiClient
+from .const import (
+    ADAPTIVE_ACTIVITY_WINDOW,
+    ADAPTIVE_DUE_MARGIN,
+    ADAPTIVE_MIN_REFRESH_INTERVAL,
+    DEFAULT_MUTATION_REFRESH_DELAY,
+    DELTA_SYNC_FULL_RESYNC_INTERVAL,
+    DEFAULT_THINGS_REFRESH_INTERVAL,
+    MUTATION_REFRESH_MAX_DELAY_FACTOR,
+)
+from .model import DonetickMember, DonetickTask, DonetickTaskStore, DonetickThing
+
+if TYPE_CHECKING:
+    from .thing import DonetickThingEntities
+
+_LOGGER = logging.getLogger(__name__)
+
+_DataT = TypeVar("_DataT")
+
+class DonetickCoordinator(DataUpdateCoordinator[_DataT]):
+    """Coordinator of a config entry's API client that records its metrics."""
+
+    def __init__(self, hass: HomeAssistant, client: DonetickApiClient, name: str, refresh_interval: int) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=name,
+            update_interval=timedelta(seconds=refresh_interval),
+        )
+        self.client = client
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners and record how many entity states they wrote."""
+        metrics = self.client.metrics
+        state_writes = metrics.state_writes
+        super().async_update_listeners()
+        metrics.record_update(self.name, metrics.state_writes - state_writes)
+
+class DonetickTodoCoordinator(DonetickCoordinator[DonetickTaskStore]):
+    """Fetch the chore list shared by every todo entity of a config entry.
+
+    With adaptive refresh the configured interval is the ceiling: polling drops
+    to ADAPTIVE_MIN_REFRESH_INTERVAL after changes and mutations, polls just
+    after the earliest upcoming due date, and backs off while nothing changes.
+
+    Mutations mark the data dirty; one refresh follows once no mutation
+    happened for mutation_refresh_delay seconds (0 disables it).
+
+    With incremental sync, refreshes after the first ask only for chores changed
+    since the last watermark and merge them, with a full download every
+    DELTA_SYNC_FULL_RESYNC_INTERVAL seconds to catch anything a delta missed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: DonetickApiClient,
+        refresh_interval: int,
+        adaptive: bool = True,
+        mutation_refresh_delay: float = DEFAULT_MUTATION_REFRESH_DELAY,
+        incremental: bool = False,
+    ) -> None:
+        """Initialize the todo coordinator."""
+        super().__init__(hass, client, "donetick_todo", refresh_interval)
+        self.adaptive = adaptive
+        self._max_interval = timedelta(seconds=refresh_interval)
+        self._min_interval = min(timedelta(seconds=ADAPTIVE_MIN_REFRESH_INTERVAL), self._max_interval)
+        self._last_activity: datetime | None = None
+        self._unchanged_refreshes = 0
+        self.mutation_refresh_delay = mutation_refresh_delay
+        # Pending post-mutation refresh: first mark, timer and what waiters await
+        self._dirty_since: datetime | None = None
+        self._dirty_unsub: CALLBACK_TYPE | None = None
+        self._dirty_refreshed: asyncio.Future | None = None
+        self.incremental = incremental
+        self._watermark: str | None = None
+        self._next_full_sync: datetime | None = None
+
+    async def _async_update_data(self) -> DonetickTaskStore:
+        """Fetch all tasks, or the changes since the last sync, and index them."""
+        if (
+            self.incremental
+            and self.data is not None
+            and self._watermark is not None
+            and dt_util.utcnow() < self._next_full_sync
+        ):
+            store = await self._async_sync_changes()
+        else:
+            store = await self._async_sync_all()
+
+        if self.data is not None and store.fingerprints == self.data.fingerprints:
+            self._unchanged_refreshes += 1
+        else:
+            self._unchanged_refreshes = 0
+        self._async_adapt_interval(store)
+        self.client.metrics.record_sync(self.name)
+        return store
+
+    async def _async_sync_all(self) -> DonetickTaskStore:
+        """Download the full chore list."""
+        try:
+            tasks = await self.client.async_get_tasks()
+        except (aiohttp.ClientError, ValueError) as err:
+            raise UpdateFailed(f"Error fetching tasks: {err}") from err
+
+        if self.incremental:
+            self._watermark = self.client.task_sync_watermark()
+            self._next_full_sync = dt_util.utcnow() + timedelta(seconds=DELTA_SYNC_FULL_RESYNC_INTERVAL)
+
+        if self.data is not None and self.data.tasks is tasks:
+            # The client returned its cached list: nothing changed since the last fetch
+            return self.data
+        return DonetickTaskStore(tasks)
+
+    async def _async_sync_changes(self) -> DonetickTaskStore:
+        """Merge the chores changed since the watermark into the current data."""
+        try:
+            changes = await self.client.async_get_task_changes(self._watermark)
+        except (aiohttp.ClientError, ValueError) as err:
+            raise UpdateFailed(f"Error fetching task changes: {err}") from err
+        self._watermark = changes.watermark
+
+        if changes.full:
+            _LOGGER.warning("Donetick server does not support incremental sync, downloading full task lists")
+            self.incremental = False
+            return DonetickTaskStore(changes.upserts)
+
+        fingerprints = self.data.fingerprints
+        if all(fingerprints.get(task.id) == task.fingerprint() for task in changes.upserts) and not any(
+            task_id in fingerprints for task_id in changes.deleted_ids
+        ):
+            # Nothing new, or only changes this coordinator already merged
+            return self.data
+        _LOGGER.debug(
+            "Merging %d changed and %d deleted Donetick tasks", len(changes.upserts), len(changes.deleted_ids)
+        )
+        return self.data.merged(changes.upserts, changes.deleted_ids)
+
+    @callback
+    def async_apply_tasks(self, upserts: Iterable[DonetickTask] = (), removed_ids: Iterable[int] = ()) -> asyncio.Future:
+        """Merge tasks returned by mutations into the current data and notify listeners.
+
+        Avoids downloading the whole chore list after every change; the debounced
+        refresh from async_mark_dirty reconciles anything the responses did not
+        cover. Returns the future of that refresh.
+        """
+        if self.data is not None:
+            self._last_activity = dt_util.utcnow()
+            self._unchanged_refreshes = 0
+            store = self.data.merged(upserts, removed_ids)
+            self._async_adapt_interval(store)
+            self.async_set_updated_data(store)
+        return self.async_mark_dirty()
+
+    @callback
+    def async_apply_pushed_tasks(self, upserts: Iterable[DonetickTask] = (), removed_ids: Iterable[int] = ()) -> None:
+        """Merge tasks pushed by the server into the current data and notify listeners.
+
+        Pushed tasks already are the server's state, so unlike async_apply_tasks
+        this neither marks the data dirty nor counts as activity.
+        """
+        if self.data is None:
+            return
+        store = self.data.merged(upserts, removed_ids)
+        if store.fingerprints == self.data.fingerprints:
+            return
+        self._async_adapt_interval(store)
+        self.async_set_updated_data(store)
+
+    @callback
+    def async_mark_dirty(self) -> asyncio.Future:
+        """Refresh once mutations have been quiet for mutation_refresh_delay seconds.
+
+        Every mark restarts the quiet window, up to MUTATION_REFRESH_MAX_DELAY_FACTOR
+        windows after the first one, so a steady stream of edits still refreshes.
+        Returns a future resolved with the refresh's success, shared by every
+        mark in the same window; the task services await it for wait_for_refresh.
+        """
+        if self._dirty_refreshed is None or self._dirty_refreshed.done():
+            self._dirty_refreshed = self.hass.loop.create_future()
+            self._dirty_since = dt_util.utcnow()
+        if self.mutation_refresh_delay <= 0:
+            # Merging mutation responses is all there is; nothing to wait for
+            self._dirty_refreshed.set_result(True)
+            return self._dirty_refreshed
+
+        deadline = self._dirty_since + timedelta(seconds=self.mutation_refresh_delay * MUTATION_REFRESH_MAX_DELAY_FACTOR)
+        delay = min(self.mutation_refresh_delay, max(0, (deadline - dt_util.utcnow()).total_seconds()))
+        if self._dirty_unsub is not None:
+            self._dirty_unsub()
+        self._dirty_unsub = async_call_later(self.hass, delay, self._async_refresh_dirty)
+        return self._dirty_refreshed
+
+    async def _async_refresh_dirty(self, _now: datetime) -> None:
+        """Run the debounced post-mutation refresh and release its waiters."""
+        self._dirty_unsub = None
+        refreshed = self._dirty_refreshed
+        _LOGGER.debug("Refreshing Donetick tasks after mutations")
+        await self.async_refresh()
+        if refreshed is not None and not refreshed.done():
+            refreshed.set_result(self.last_update_success)
+
+    async def async_shutdown(self) -> None:
+        """Cancel a pending post-mutation refresh and shut down."""
+        if self._dirty_unsub is not None:
+            self._dirty_unsub()
+            self._dirty_unsub = None
+        if self._dirty_refreshed is not None and not self._dirty_refreshed.done():
+            self._dirty_refreshed.set_result(False)
+        await super().async_shutdown()
+
+    @callback
+    def _async_adapt_interval(self, store: DonetickTaskStore) -> None:
+        """Choose the interval until the next refresh."""
+        if not self.adaptive:
+            return
+
+        now = dt_util.utcnow()
+        # Double from the floor for every refresh that changed nothing
+        interval = min(self._max_interval, self._min_interval * 2 ** min(self._unchanged_refreshes, 16))
+
+        if self._last_activity is not None and now - self._last_activity < timedelta(seconds=ADAPTIVE_ACTIVITY_WINDOW):
+            interval = self._min_interval
+
+        if (next_due := store.next_due_after(now)) is not None:
+            until_due = next_due - now + timedelta(seconds=ADAPTIVE_DUE_MARGIN)
+            interval = max(self._min_interval, min(interval, until_due))
+
+        if interval != self.update_interval:
+            _LOGGER.debug("Next Donetick task refresh in %s", interval)
+        self.update_interval = interval
+
+class DonetickMembersCoordinator(DonetickCoordinator[list[DonetickMember]]):
+    """Fetch the circle members used for assignee lists and completion attribution.
+
+    Polled while todo lists listen to it; new active members get an assignee
+    list when assignee lists are enabled.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: DonetickApiClient, refresh_interval: int) -> None:
+        """Initialize the members coordinator."""
+        super().__init__(hass, client, "donetick_members", refresh_interval)
+
+    async def _async_update_data(self) -> list[DonetickMember]:
+        """Fetch all circle members."""
+        try:
+            members = await self.client.async_get_circle_members()
+        except (aiohttp.ClientError, ValueError) as err:
+            raise UpdateFailed(f"Error fetching circle members: {err}") from err
+        self.client.metrics.record_sync(self.name)
+        return members
+
+class DonetickThingsCoordinator(DonetickCoordinator[dict[int, DonetickThing]]):
+    """Fetch every Donetick thing once per cycle and share it with all thing entities."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: DonetickApiClient,
+        refresh_interval: int = DEFAULT_THINGS_REFRESH_INTERVAL,
+    ) -> None:
+        """Initialize the things coordinator."""
+        super().__init__(hass, client, "donetick_things", refresh_interval)
+        self._fetched_things: list[DonetickThing] | None = None
+        # Successful fetches so far, and whether the last one decoded every row
+        self.refreshes = 0
+        self.complete = False
+        # Things the server pushed as deleted, until the thing entities take them
+        self._deleted_ids: set[int] = set()
+        # Monotonic time the request behind the current data was sent, to spot states older than a write
+        self.fetch_started: float | None = None
+
+    async def _async_update_data(self) -> dict[int, DonetickThing]:
+        """Fetch all things and index them by id."""
+        started = time.monotonic()
+        try:
+            things = await self.client.async_get_things()
+        except (aiohttp.ClientError, ValueError) as err:
+            raise UpdateFailed(f"Error fetching things: {err}") from err
+        self.client.metrics.record_sync(self.name)
+        self.fetch_started = started
+        self.refreshes += 1
+        self.complete = not self.client.skipped_rows.get("things")
+        if things is self._fetched_things and self.data is not None:
+            # The client returned its cached list: nothing changed since the last fetch
+            return self.data
+        self._fetched_things = things
+        return {thing.id: thing for thing in things}
+
+    @callback
+    def async_apply_things(self, upserts: Iterable[DonetickThing] = (), removed_ids: Iterable[int] = ()) -> None:
+        """Merge things pushed by the server into the current data and notify listeners."""
+        if self.data is None:
+            return
+        things = dict(self.data)
+        things.update((thing.id, thing) for thing in upserts)
+        for thing_id in removed_ids:
+            things.pop(thing_id, None)
+            self._deleted_ids.add(thing_id)
+        # Pushed states are the server's current ones
+        self.fetch_started = time.monotonic()
+        self.async_set_updated_data(things)
+
+    @callback
+    def async_pop_deleted_ids(self) -> set[int]:
+        """Return and forget the ids of things the server pushed as deleted."""
+        deleted, self._deleted_ids = self._deleted_ids, set()
+        return deleted
+
+@dataclass
+class DonetickRuntimeData:
+    """Objects owned by a loaded config entry, stored in hass.data[DOMAIN][entry_id]."""
+    client: DonetickApiClient
+    todo_coordinator: DonetickTodoCoordinator
+    members_coordinator: DonetickMembersCoordinator
+    things_coordinator: DonetickThingsCoordinator
+    show_due_in: int = 7
+    # Created by the first thing platform set up
+    thing_entities: "DonetickThingEntities | None" = None
@@ -0,0 +1,41 @@
+"""Diagnostics support for Donetick."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_TOKEN, CONF_URL, DOMAIN
+from .coordinator import DonetickRuntimeData
+
+TO_REDACT = {CONF_TOKEN, CONF_URL, CONF_WEBHOOK_ID}
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return the configuration, coordinator state and performance metrics of a config entry."""
+    runtime: DonetickRuntimeData = hass.data[DOMAIN][entry.entry_id]
+    client = runtime.client
+    coordinators = {}
+    for coordinator in (runtime.todo_coordinator, runtime.members_coordinator, runtime.things_coordinator):
+        coordinators[coordinator.name] = {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+            "items": len(coordinator.data) if coordinator.data is not None else None,
+        }
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "coordinators": coordinators,
+        "circuit_breaker": {
+            "state": client.breaker.state,
+            "consecutive_failures": client.breaker.consecutive_failures,
+            "trips": client.breaker.trips,
+        },
+        "coalesced_requests": dict(client.coalesced_requests),
+        "scheduler": {
+            "rate": client.scheduler.rate,
+            "max_in_flight": client.scheduler.max_in_flight,
+            "in_flight": client.scheduler.in_flight,
+            "queued": client.scheduler.queued,
+        } if client.scheduler is not None else None,
+        "metrics": client.metrics.as_dict(),
+    }
@@ -0,0 +1,140 @@
+"""Performance metrics of a Donetick config entry."""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from homeassistant.util import dt as dt_util
+
+from .const import METRICS_LATENCY_BUCKETS
+
+@dataclass(slots=True)
+class EndpointMetrics:
+    """Requests, latency and parsing cost of one API endpoint."""
+    requests: int = 0
+    errors: int = 0
+    response_bytes: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    # Requests per METRICS_LATENCY_BUCKETS bucket, plus one for slower requests
+    latency_buckets: List[int] = field(default_factory=lambda: [0] * (len(METRICS_LATENCY_BUCKETS) + 1))
+    parses: int = 0
+    json_seconds: float = 0.0
+    model_seconds: float = 0.0
+
+    def latency_percentile(self, share: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the given latency percentile, in seconds."""
+        if not self.requests:
+            return None
+        rank = share * self.requests
+        seen = 0
+        for bound, count in zip(METRICS_LATENCY_BUCKETS, self.latency_buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.latency_max)
+        return self.latency_max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as plain data."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "response_bytes": self.response_bytes,
+            "latency_mean": self.latency_total / self.requests if self.requests else None,
+            "latency_p50": self.latency_percentile(0.5),
+            "latency_p95": self.latency_percentile(0.95),
+            "latency_max": self.latency_max,
+            "latency_histogram": {
+                **{f"le_{bound}": count for bound, count in zip(METRICS_LATENCY_BUCKETS, self.latency_buckets)},
+                "le_inf": self.latency_buckets[-1],
+            },
+            "parses": self.parses,
+            "json_seconds": self.json_seconds,
+            "model_seconds": self.model_seconds,
+        }
+
+class DonetickMetrics:
+    """What the API client and coordinators of a config entry cost.
+
+    Endpoints are keyed by the name the client uses in its log messages.
+    Listeners are called after every coordinator update.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self.state_writes = 0
+        # Per coordinator: entity states written by its last update, and its last successful refresh
+        self.update_state_writes: Dict[str, int] = {}
+        self.last_sync: Dict[str, datetime] = {}
+        self._listeners: List[Callable[[], None]] = []
+
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener after every coordinator update; returns a function removing it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def endpoint(self, name: str) -> EndpointMetrics:
+        """Return the metrics of an endpoint, creating them on first use."""
+        if (metrics := self.endpoints.get(name)) is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def record_request(self, name: str, latency: float, error: bool = False) -> None:
+        """Record one request sent to the server, retries counting separately."""
+        metrics = self.endpoint(name)
+        metrics.requests += 1
+        metrics.errors += error
+        metrics.latency_total += latency
+        metrics.latency_max = max(metrics.latency_max, latency)
+        metrics.latency_buckets[bisect_left(METRICS_LATENCY_BUCKETS, latency)] += 1
+
+    def record_bytes(self, name: str, size: int) -> None:
+        """Record a response body read."""
+        self.endpoint(name).response_bytes += size
+
+    def record_parse(self, name: str, json_seconds: float, model_seconds: float = 0.0) -> None:
+        """Record the time spent decoding a response body and building models from it."""
+        metrics = self.endpoint(name)
+        metrics.parses += 1
+        metrics.json_seconds += json_seconds
+        metrics.model_seconds += model_seconds
+
+    def record_state_write(self) -> None:
+        """Record an entity state written because of coordinator data."""
+        self.state_writes += 1
+
+    def record_sync(self, coordinator: str) -> None:
+        """Record a successful refresh from the server."""
+        self.last_sync[coordinator] = dt_util.utcnow()
+
+    def record_update(self, coordinator: str, state_writes: int) -> None:
+        """Record how many entity states a coordinator update wrote and notify listeners."""
+        self.update_state_writes[coordinator] = state_writes
+        for listener in list(self._listeners):
+            listener()
+
+    def total(self) -> EndpointMetrics:
+        """Return the metrics of every endpoint added up."""
+        total = EndpointMetrics()
+        for metrics in self.endpoints.values():
+            total.requests += metrics.requests
+            total.errors += metrics.errors
+            total.response_bytes += metrics.response_bytes
+            total.latency_total += metrics.latency_total
+            total.latency_max = max(total.latency_max, metrics.latency_max)
+            total.latency_buckets = [a + b for a, b in zip(total.latency_buckets, metrics.latency_buckets)]
+            total.parses += metrics.parses
+            total.json_seconds += metrics.json_seconds
+            total.model_seconds += metrics.model_seconds
+        return total
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as plain data."""
+        return {
+            "total": self.total().as_dict(),
+            "endpoints": {name: metrics.as_dict() for name, metrics in self.endpoints.items()},
+            "state_writes": self.state_writes,
+            "update_state_writes": dict(self.update_state_writes),
+            "last_sync": {name: when.isoformat() for name, when in self.last_sync.items()},
+        }
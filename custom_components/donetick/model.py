@@ -1,18 +1,94 @@
 """Donetick models."""
+import json
 import logging
-from dataclasses import dataclass
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import count
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Callable, Iterable, NamedTuple, Optional, List, Tuple, TypeVar
 from homeassistant.components.todo import (
     TodoItem,
     TodoItemStatus,
   
 )
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    json_loads = json.loads
 
 _LOGGER = logging.getLogger(__name__)
 
-@dataclass
+_ModelT = TypeVar("_ModelT")
+
+# Malformed rows logged individually per decoded list; the rest are only counted
+MAX_LOGGED_ROW_ERRORS = 10
+
+# What a malformed row raises while being decoded
+DECODE_ERRORS = (KeyError, TypeError, ValueError, AttributeError)
+
+# Source of DonetickTaskStore.version, unique per built store
+_STORE_VERSIONS = count(1)
+
+# Marks a lazily parsed field that has not been parsed yet
+_UNPARSED: Any = object()
+
+def _assignee_id(value: Any) -> Optional[int]:
+    """Return assignedTo when it is a user id; other formats are ignored."""
+    return value if value and isinstance(value, int) else None
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO 8601 timestamp from the API."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        _LOGGER.warning("Invalid date from Donetick: %s", value)
+        return None
+
+class RowError(NamedTuple):
+    """A row that could not be decoded."""
+    index: int
+    row_id: Any
+    error: Exception
+
+def _decode_rows(from_json: Callable[[dict], _ModelT], rows: List[dict]) -> Tuple[List[_ModelT], List[RowError]]:
+    """Decode every row in one pass, collecting malformed rows instead of failing."""
+    try:
+        return [from_json(row) for row in rows], []
+    except DECODE_ERRORS:
+        pass
+
+    # Some row is malformed: decode again row by row to report each one
+    items: List[_ModelT] = []
+    errors: List[RowError] = []
+    append = items.append
+    for index, row in enumerate(rows):
+        try:
+            append(from_json(row))
+        except DECODE_ERRORS as err:
+            errors.append(RowError(index, row.get("id") if isinstance(row, dict) else None, err))
+    return items, errors
+
+def _decode_valid_rows(from_json: Callable[[dict], _ModelT], rows: List[dict], what: str) -> List[_ModelT]:
+    """Decode rows, logging and skipping malformed ones."""
+    items, errors = _decode_rows(from_json, rows)
+    for row_error in errors[:MAX_LOGGED_ROW_ERRORS]:
+        _LOGGER.warning(
+            "Skipping malformed %s at index %d (id %s): %r",
+            what, row_error.index, row_error.row_id, row_error.error,
+        )
+    if len(errors) > MAX_LOGGED_ROW_ERRORS:
+        _LOGGER.warning("Skipped %d more malformed %s rows", len(errors) - MAX_LOGGED_ROW_ERRORS, what)
+    return items
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a string repeated across many models (types, labels, roles)."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+@dataclass(slots=True)
 class DonetickMember:
     """Donetick circle member model."""
     id: int
@@ -32,36 +108,57 @@ class DonetickMember:
     def from_json(cls, data: dict) -> "DonetickMember":
         """Create a DonetickMember from JSON data."""
         return cls(
-            id=data["id"],
-            user_id=data["userId"],
-            circle_id=data["circleId"],
-            role=data["role"],
-            is_active=data["isActive"],
-            username=data["username"],
-            display_name=data["displayName"],
-            image=data.get("image"),
-            points=data.get("points", 0),
-            points_redeemed=data.get("pointsRedeemed", 0),
-            created_at=data.get("createdAt"),
-            updated_at=data.get("updatedAt")
+            data["id"],
+            data["userId"],
+            data["circleId"],
+            _intern(data["role"]),
+            data["isActive"],
+            data["username"],
+            data["displayName"],
+            data.get("image"),
+            data.get("points", 0),
+            data.get("pointsRedeemed", 0),
+            data.get("createdAt"),
+            data.get("updatedAt"),
         )
+
+    def to_json(self) -> dict:
+        """Return the member in the API's JSON shape."""
+        return {
+            "id": self.id,
+            "userId": self.user_id,
+            "circleId": self.circle_id,
+            "role": self.role,
+            "isActive": self.is_active,
+            "username": self.username,
+            "displayName": self.display_name,
+            "image": self.image,
+            "points": self.points,
+            "pointsRedeemed": self.points_redeemed,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
     
     @classmethod
     def from_json_list(cls, data: List[dict]) -> List["DonetickMember"]:
-        """Create a list of DonetickMembers from JSON data."""
-        return [cls.from_json(member) for member in data]
+        """Create a list of DonetickMembers from JSON data, skipping malformed rows."""
+        return _decode_valid_rows(cls.from_json, data, "DonetickMember")
 
-@dataclass
+@dataclass(slots=True)
 class DonetickAssignee:
     """Donetick assignee model."""
     user_id: int
 
-@dataclass
+@dataclass(slots=True)
 class DonetickTask:
-    """Donetick task model."""
+    """Donetick task model.
+
+    The due date is kept as the API string and parsed on first access, so
+    tasks no entity reads never pay for datetime parsing.
+    """
     id: int
     name: str
-    next_due_date: Optional[datetime]
+    next_due_date_raw: Optional[str]
     status: int
     priority: int
     labels: Optional[str]
@@ -71,37 +168,147 @@ class DonetickTask:
     frequency_metadata: str
     assigned_to: Optional[int] = None
     description: Optional[str] = None
+    _next_due_date: Optional[datetime] = field(default=_UNPARSED, init=False, repr=False, compare=False)
+
+    @property
+    def next_due_date(self) -> Optional[datetime]:
+        """Return the parsed due date, memoized."""
+        due = self._next_due_date
+        if due is _UNPARSED:
+            due = self._next_due_date = _parse_datetime(self.next_due_date_raw)
+        return due
     
     @classmethod
     def from_json(cls, data: dict) -> "DonetickTask":
         """Create a DonetickTask from JSON data."""
-        # Handle assignedTo field - could be in different formats
-        assigned_to = None
-        if data.get("assignedTo"):
-            if isinstance(data["assignedTo"], int):
-                assigned_to = data["assignedTo"]
-          
+        # Positional in field order: this runs once per task on every refresh
         return cls(
-            id=data["id"],
-            name=data["name"],
-            next_due_date=datetime.fromisoformat(data["nextDueDate"].replace('Z', '+00:00')) if data.get("nextDueDate") else None,
-            status=data["status"],
-            priority=data["priority"],
-            labels=data["labels"],
-            is_active=data["isActive"],
-            frequency_type=data["frequencyType"],
-            frequency=data["frequency"],
-            frequency_metadata=data["frequencyMetadata"],
-            assigned_to=assigned_to,
-            description=data.get("description")
+            data["id"],
+            data["name"],
+            data.get("nextDueDate") or None,
+            data["status"],
+            data["priority"],
+            _intern(data["labels"]),
+            data["isActive"],
+            _intern(data["frequencyType"]),
+            data["frequency"],
+            _intern(data["frequencyMetadata"]),
+            # assignedTo could be in different formats; only plain user ids are used
+            _assignee_id(data.get("assignedTo")),
+            data.get("description"),
         )
+
+    def to_json(self) -> dict:
+        """Return the task in the API's JSON shape."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "nextDueDate": self.next_due_date_raw,
+            "status": self.status,
+            "priority": self.priority,
+            "labels": self.labels,
+            "isActive": self.is_active,
+            "frequencyType": self.frequency_type,
+            "frequency": self.frequency,
+            "frequencyMetadata": self.frequency_metadata,
+            "assignedTo": self.assigned_to,
+            "description": self.description,
+        }
+
+    def fingerprint(self) -> int:
+        """Return a hash of the task's content, used to detect changes between refreshes."""
+        return hash((
+            self.id,
+            self.name,
+            self.next_due_date_raw,
+            self.status,
+            self.priority,
+            self.labels,
+            self.is_active,
+            self.frequency_type,
+            self.frequency,
+            self.frequency_metadata,
+            self.assigned_to,
+            self.description,
+        ))
     
     @classmethod
     def from_json_list(cls, data: List[dict]) -> List["DonetickTask"]:
-        """Create a list of DonetickTasks from JSON data."""
-        return [cls.from_json(task) for task in data]
+        """Create a list of DonetickTasks from JSON data, skipping malformed rows."""
+        return _decode_valid_rows(cls.from_json, data, "DonetickTask")
+
+class DonetickTaskStore:
+    """Tasks from one refresh, indexed once for the todo entities."""
+
+    def __init__(self, tasks: List[DonetickTask]) -> None:
+        """Build the indexes over the given tasks."""
+        self.tasks = tasks
+        # Changes whenever the coordinator publishes different task data
+        self.version = next(_STORE_VERSIONS)
+        self.by_id: dict[int, DonetickTask] = {}
+        self.active: List[DonetickTask] = []
+        self.active_by_assignee: dict[int, List[DonetickTask]] = {}
+        # Content fingerprint of every task, keyed by task id
+        self.fingerprints: dict[int, int] = {}
+        # Sorted due dates of active tasks, built on first use
+        self._due_dates: Optional[List[datetime]] = None
+
+        for task in tasks:
+            self.by_id[task.id] = task
+            self.fingerprints[task.id] = task.fingerprint()
+            if task.is_active:
+                self.active.append(task)
+                if task.assigned_to is not None:
+                    self.active_by_assignee.setdefault(task.assigned_to, []).append(task)
+
+    def __len__(self) -> int:
+        """Return the number of tasks."""
+        return len(self.tasks)
+
+    def __iter__(self):
+        """Iterate over all tasks in server order."""
+        return iter(self.tasks)
 
-@dataclass 
+    def get(self, task_id: int) -> Optional[DonetickTask]:
+        """Return a task by id."""
+        return self.by_id.get(task_id)
+
+    def next_due_after(self, when: datetime) -> Optional[datetime]:
+        """Return the earliest due date of an active task after the given time."""
+        if self._due_dates is None:
+            self._due_dates = sorted(
+                task.next_due_date for task in self.active
+                if task.next_due_date is not None and task.next_due_date.tzinfo is not None
+            )
+        index = bisect_right(self._due_dates, when)
+        return self._due_dates[index] if index < len(self._due_dates) else None
+
+    def merged(self, upserts: Iterable[DonetickTask] = (), removed_ids: Iterable[int] = ()) -> "DonetickTaskStore":
+        """Return a new store with tasks replaced or added and the given ids removed.
+
+        Replaced tasks keep their position, new tasks are appended.
+        """
+        changed = {task.id: task for task in upserts}
+        removed = set(removed_ids)
+        tasks = [
+            changed.pop(task.id, task)
+            for task in self.tasks
+            if task.id not in removed
+        ]
+        tasks.extend(task for task in changed.values() if task.id not in removed)
+        return DonetickTaskStore(tasks)
+
+@dataclass(slots=True)
+class DonetickTaskChanges:
+    """Chores changed on the server since a sync watermark."""
+    upserts: List[DonetickTask]
+    deleted_ids: List[int]
+    # Pass as the since value of the next delta request
+    watermark: str
+    # The server ignored the delta query: upserts is the complete chore list
+    full: bool = False
+
+@dataclass(slots=True)
 class DonetickThing:
     """Donetick thing model."""
     id: int
@@ -118,19 +325,32 @@ class DonetickThing:
     def from_json(cls, data: dict) -> "DonetickThing":
         """Create a DonetickThing from JSON data."""
         return cls(
-            id=data["id"],
-            name=data["name"],
-            type=data["type"],
-            state=str(data["state"]),
-            user_id=data["userID"],
-            circle_id=data["circleId"],
-            updated_at=data.get("updatedAt"),
-            created_at=data.get("createdAt"),
-            thing_chores=data.get("thingChores")
+            data["id"],
+            data["name"],
+            _intern(data["type"]),
+            str(data["state"]),
+            data["userID"],
+            data["circleId"],
+            data.get("updatedAt"),
+            data.get("createdAt"),
+            data.get("thingChores"),
         )
+
+    def to_json(self) -> dict:
+        """Return the thing in the API's JSON shape."""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "state": self.state,
+            "userID": self.user_id,
+            "circleId": self.circle_id,
+            "updatedAt": self.updated_at,
+            "createdAt": self.created_at,
+            "thingChores": self.thing_chores,
+        }
     
     @classmethod
     def from_json_list(cls, data: List[dict]) -> List["DonetickThing"]:
-        """Create a list of DonetickThings from JSON data."""
-        return [cls.from_json(thing) for thing in data]
-    
+        """Create a list of DonetickThings from JSON data, skipping malformed rows."""
+        return _decode_valid_rows(cls.from_json, data, "DonetickThing")
@@ -1,16 +1,24 @@
 """Donetick number platform."""
 from __future__ import annotations
 
+import voluptuous as vol
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback, async_get_current_platform
 
 from .thing import async_setup_entry as thing_async_setup_entry
 
+SERVICE_INCREMENT_THING = "increment_thing"
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Donetick number entities."""
+    async_get_current_platform().async_register_entity_service(
+        SERVICE_INCREMENT_THING,
+        {vol.Required("amount"): vol.Coerce(int)},
+        "async_increment",
+    )
     await thing_async_setup_entry(hass, config_entry, async_add_entities, "number")
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""Objects shared by the config entries using the same Donetick server."""
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+
+_T = TypeVar("_T")
+
+@dataclass
+class _PooledObject(Generic[_T]):
+    """A shared object and how many config entries use it."""
+    obj: _T
+    users: int = 0
+
+@callback
+def async_acquire_pooled(
+    hass: HomeAssistant, pool_key: str, key: Hashable, create: Callable[[], _T]
+) -> tuple[_T, Callable[[], bool]]:
+    """Return the object pooled under key, creating it if needed, and a callback releasing it.
+
+    Pools are stored in hass.data[pool_key], outside hass.data[DOMAIN] so they
+    outlive the config entries that come and go while sharing them. The release
+    callback returns True when the last user released the object, which the
+    caller then disposes of.
+    """
+    pool: dict[Hashable, _PooledObject[_T]] = hass.data.setdefault(pool_key, {})
+    if (pooled := pool.get(key)) is None:
+        pooled = pool[key] = _PooledObject(create())
+    pooled.users += 1
+
+    @callback
+    def _async_release() -> bool:
+        pooled.users -= 1
+        if pooled.users or pool.get(key) is not pooled:
+            return False
+        del pool[key]
+        return True
+
+    return pooled.obj, _async_release
+
+@callback
+def async_pop_pool(hass: HomeAssistant, pool_key: str) -> list:
+    """Remove a pool and return its objects; releasing them afterwards does nothing."""
+    return [pooled.obj for pooled in hass.data.pop(pool_key, {}).values()]
@@ -0,0 +1,153 @@
+"""On-demand profiling of refresh cycles for the donetick.profile service."""
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, PROFILE_TOP_ALLOCATIONS, PROFILE_TOP_FUNCTIONS
+from .coordinator import DonetickRuntimeData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Functions whose cumulative time makes up a phase: module file name and function name
+_PROFILED_PHASES = {
+    "filter_tasks": ("todo.py", "_filter_tasks"),
+    "todo_items": ("todo.py", "todo_items"),
+}
+
+@dataclass
+class DonetickProfile:
+    """Timings of profiled refresh cycles, in seconds."""
+    cycles: list[float] = field(default_factory=list)
+    phases: dict[str, float] = field(default_factory=dict)
+    requests: int = 0
+    response_bytes: int = 0
+    state_writes: int = 0
+    peak_memory: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the profile as plain data."""
+        return {
+            "cycles": self.cycles,
+            "phases": self.phases,
+            "requests": self.requests,
+            "response_bytes": self.response_bytes,
+            "state_writes": self.state_writes,
+            "peak_memory": self.peak_memory,
+        }
+
+async def async_profile(hass: HomeAssistant, entry_id: str, runtime: DonetickRuntimeData, cycles: int, full: bool) -> tuple[DonetickProfile, str]:
+    """Run refresh and entity update cycles under cProfile and tracemalloc.
+
+    Every cycle refreshes the todo, members and things coordinators one after
+    another, downloading and decoding everything again when full is set, and
+    then writes the state of every entity of the entry. Returns the profile
+    and the path of the report written to the config directory.
+    """
+    metrics = runtime.client.metrics
+    before = metrics.total()
+    state_writes = metrics.state_writes
+    entities = [
+        entity
+        for platform in async_get_platforms(hass, DOMAIN)
+        if platform.config_entry is not None and platform.config_entry.entry_id == entry_id
+        for entity in platform.entities.values()
+    ]
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    # Snapshots take seconds in a large process, so they are taken outside the event loop
+    start_snapshot = await hass.async_add_executor_job(tracemalloc.take_snapshot)
+    tracemalloc.reset_peak()
+    profile = DonetickProfile()
+    write_seconds = 0.0
+    forced_writes = 0
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        for _ in range(cycles):
+            cycle_start = time.perf_counter()
+            if full:
+                runtime.client.clear_cache()
+            for coordinator in (runtime.todo_coordinator, runtime.members_coordinator, runtime.things_coordinator):
+                await coordinator.async_refresh()
+            write_start = time.perf_counter()
+            for entity in entities:
+                if entity.hass is not None:
+                    entity.async_write_ha_state()
+                    forced_writes += 1
+            write_seconds += time.perf_counter() - write_start
+            profile.cycles.append(time.perf_counter() - cycle_start)
+    finally:
+        profiler.disable()
+        profile.peak_memory = tracemalloc.get_traced_memory()[1]
+        try:
+            allocations = await hass.async_add_executor_job(_allocation_growth, start_snapshot)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+
+    after = metrics.total()
+    stats = pstats.Stats(profiler)
+    profile.phases = {
+        "http": after.latency_total - before.latency_total,
+        "json_decode": after.json_seconds - before.json_seconds,
+        "from_json": after.model_seconds - before.model_seconds,
+        **{phase: _cumulative_time(stats, *function) for phase, function in _PROFILED_PHASES.items()},
+        "state_write": write_seconds,
+    }
+    profile.requests = after.requests - before.requests
+    profile.response_bytes = after.response_bytes - before.response_bytes
+    profile.state_writes = metrics.state_writes - state_writes + forced_writes
+
+    path = hass.config.path(f"donetick_profile_{entry_id}_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}.txt")
+    await hass.async_add_executor_job(_write_report, path, profile, stats, allocations)
+    _LOGGER.info("Wrote Donetick profile of %d refresh cycles to %s", cycles, path)
+    return profile, path
+
+def _allocation_growth(start_snapshot: tracemalloc.Snapshot) -> list[tracemalloc.StatisticDiff]:
+    """Return the allocation sites that grew most since the start snapshot."""
+    return tracemalloc.take_snapshot().compare_to(start_snapshot, "lineno")[:PROFILE_TOP_ALLOCATIONS]
+
+def _cumulative_time(stats: pstats.Stats, file_name: str, function_name: str) -> float:
+    """Return the cumulative time of every function with this name in this module."""
+    return sum(
+        cumulative
+        for (path, _, name), (_, _, _, cumulative, _) in stats.stats.items()
+        if name == function_name and path.endswith(file_name)
+    )
+
+def _write_report(path: str, profile: DonetickProfile, stats: pstats.Stats, allocations: list) -> None:
+    """Write the profile report and the raw cProfile stats next to it."""
+    cycles = profile.cycles
+    lines = [
+        f"Donetick profile of {len(cycles)} refresh cycles",
+        f"cycle seconds: min {min(cycles):.4f}  mean {sum(cycles) / len(cycles):.4f}  max {max(cycles):.4f}",
+        f"requests {profile.requests}, response bytes {profile.response_bytes}, state writes {profile.state_writes}",
+        f"peak traced memory {profile.peak_memory / 1024:.0f} KiB",
+        "",
+        "Phases (seconds in total; state_write includes todo_items, which includes filter_tasks):",
+        *(f"  {phase:<12} {seconds:10.4f}" for phase, seconds in profile.phases.items()),
+        "",
+        f"Top {len(allocations)} allocation sites (growth during the cycles):",
+        *(f"  {allocation}" for allocation in allocations),
+        "",
+        f"Top {PROFILE_TOP_FUNCTIONS} functions by cumulative time:",
+    ]
+    output = io.StringIO()
+    stats.stream = output
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_FUNCTIONS)
+    with open(path, "w", encoding="utf-8") as report:
+        report.write("\n".join(lines))
+        report.write("\n")
+        report.write(output.getvalue())
+    stats.dump_stats(path.removesuffix(".txt") + ".prof")
@@ -0,0 +1,136 @@
+"""Push updates from Donetick, or a relay in front of it, through a Home Assistant webhook.
+
+The webhook accepts a JSON object in either of two shapes:
+
+    {"chores": [...], "deletedChoreIds": [...], "things": [...], "deletedThingIds": [...]}
+
+    {"type": "chore.updated", "data": {...}}
+
+Chores and things are rows as the API returns them; a thing may also be sent
+as just {"id": ..., "state": ...}. Event types start with "chore." (or
+"task.") or "thing."; ".deleted" events only need data.id. Whatever cannot be
+applied directly makes the affected coordinator refresh instead.
+"""
+import logging
+from dataclasses import replace
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import web
+from homeassistant.components import webhook
+from homeassistant.const import CONF_WEBHOOK_ID
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.network import NoURLAvailableError
+
+from .const import DOMAIN
+from .coordinator import DonetickRuntimeData
+from .model import DECODE_ERRORS, DonetickTask, DonetickThing, json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+# Event type prefix: batch keys of its rows and of its deleted ids
+_EVENT_KINDS = {
+    "chore": ("chores", "deletedChoreIds"),
+    "task": ("chores", "deletedChoreIds"),
+    "thing": ("things", "deletedThingIds"),
+}
+
+@callback
+def async_register_push(hass: HomeAssistant, entry: ConfigEntry, runtime: DonetickRuntimeData) -> CALLBACK_TYPE:
+    """Register the entry's webhook and return a callback unregistering it."""
+    webhook_id = entry.data[CONF_WEBHOOK_ID]
+
+    async def handle_webhook(hass: HomeAssistant, webhook_id: str, request: web.Request) -> web.Response:
+        """Apply one pushed payload."""
+        try:
+            payload = json_loads(await request.read())
+        except ValueError as err:
+            _LOGGER.warning("Ignoring Donetick push with invalid JSON: %s", err)
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+        if not isinstance(payload, dict):
+            _LOGGER.warning("Ignoring Donetick push that is not a JSON object")
+            return web.Response(status=HTTPStatus.BAD_REQUEST)
+        async_apply_push(runtime, payload)
+        return web.Response(status=HTTPStatus.OK)
+
+    webhook.async_register(
+        hass, DOMAIN, entry.title, webhook_id, handle_webhook, allowed_methods=["POST"]
+    )
+    try:
+        _LOGGER.info("Donetick push updates for %s are received at %s", entry.title, webhook.async_generate_url(hass, webhook_id))
+    except NoURLAvailableError:
+        _LOGGER.info(
+            "Donetick push updates for %s are received at %s on this Home Assistant's URL",
+            entry.title, webhook.async_generate_path(webhook_id),
+        )
+
+    @callback
+    def async_unregister() -> None:
+        webhook.async_unregister(hass, webhook_id)
+
+    return async_unregister
+
+@callback
+def async_apply_push(runtime: DonetickRuntimeData, payload: dict[str, Any]) -> None:
+    """Apply a pushed payload to the entry's coordinators."""
+    if (event := payload.get("type")) is not None:
+        payload = _event_to_batch(str(event), payload.get("data"))
+        if payload is None:
+            _LOGGER.debug("Ignoring Donetick push event %s", event)
+            return
+
+    chores = payload.get("chores") or []
+    deleted_chore_ids = payload.get("deletedChoreIds") or []
+    things = payload.get("things") or []
+    deleted_thing_ids = payload.get("deletedThingIds") or []
+
+    if chores or deleted_chore_ids:
+        _async_apply_chores(runtime, chores, deleted_chore_ids)
+    if things or deleted_thing_ids:
+        _async_apply_things(runtime, things, deleted_thing_ids)
+
+def _event_to_batch(event: str, data: Any) -> dict[str, list] | None:
+    """Return the batch payload equivalent to a single event, or None for unknown events."""
+    kind, _, action = event.partition(".")
+    if kind not in _EVENT_KINDS or not isinstance(data, dict):
+        return None
+    rows_key, deleted_key = _EVENT_KINDS[kind]
+    if action == "deleted":
+        return {deleted_key: [data.get("id")]}
+    return {rows_key: [data]}
+
+@callback
+def _async_apply_chores(runtime: DonetickRuntimeData, rows: list, deleted_ids: list) -> None:
+    """Merge pushed chores, refreshing instead when any of them cannot be decoded."""
+    coordinator = runtime.todo_coordinator
+    try:
+        tasks = [DonetickTask.from_json(row) for row in rows]
+        removed_ids = [int(task_id) for task_id in deleted_ids]
+    except DECODE_ERRORS as err:
+        _LOGGER.debug("Refreshing Donetick tasks after a push that could not be applied: %r", err)
+        coordinator.hass.async_create_task(coordinator.async_request_refresh())
+        return
+    _LOGGER.debug("Applying %d pushed and %d deleted Donetick tasks", len(tasks), len(removed_ids))
+    coordinator.async_apply_pushed_tasks(tasks, removed_ids)
+
+@callback
+def _async_apply_things(runtime: DonetickRuntimeData, rows: list, deleted_ids: list) -> None:
+    """Merge pushed things, refreshing instead when any of them cannot be applied."""
+    coordinator = runtime.things_coordinator
+    known = coordinator.data or {}
+    things = []
+    try:
+        for row in rows:
+            if (thing := known.get(row["id"])) is not None and row.keys() <= {"id", "state"}:
+                # State-only push of a known thing
+                things.append(replace(thing, state=str(row["state"])))
+            else:
+                things.append(DonetickThing.from_json(row))
+        removed_ids = [int(thing_id) for thing_id in deleted_ids]
+    except DECODE_ERRORS as err:
+        _LOGGER.debug("Refreshing Donetick things after a push that could not be applied: %r", err)
+        coordinator.hass.async_create_task(coordinator.async_request_refresh())
+        return
+    _LOGGER.debug("Applying %d pushed and %d deleted Donetick things", len(things), len(removed_ids))
+    coordinator.async_apply_things(things, removed_ids)
@@ -0,0 +1,184 @@
+"""Retry and circuit breaker policies for the Donetick API client."""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+import aiohttp
+
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RECOVERY_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Statuses that mean the server is unhealthy or overloaded rather than the request wrong
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+class DonetickCircuitOpenError(aiohttp.ClientError):
+    """Raised instead of calling Donetick while the circuit breaker is open."""
+
+def is_server_failure(err: BaseException) -> bool:
+    """Return whether an error says the server is unreachable or unhealthy."""
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status in RETRYABLE_STATUSES
+    return isinstance(err, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+def is_retryable(err: BaseException, idempotent: bool) -> bool:
+    """Return whether a failed call may be sent again.
+
+    Calls that are not idempotent are only retried when the connection could
+    not be established, so the server never saw the first attempt.
+    """
+    if isinstance(err, DonetickCircuitOpenError):
+        return False
+    if isinstance(err, aiohttp.ClientConnectorError):
+        return True
+    return idempotent and is_server_failure(err)
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how patiently failed calls are retried."""
+    attempts: int = RETRY_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+
+    def delay(self, retry: int, err: BaseException) -> float:
+        """Return the seconds to wait before the given retry (0-based).
+
+        Uses full jitter so clients that failed together do not retry together,
+        and honours a numeric Retry-After header up to max_delay.
+        """
+        if isinstance(err, aiohttp.ClientResponseError) and err.headers:
+            retry_after = err.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+class CircuitBreaker:
+    """Fail fast while Donetick keeps failing, probing once in a while for recovery.
+
+    Closed: calls go through. After failure_threshold consecutive server
+    failures it opens and rejects calls for recovery_timeout seconds. Then it
+    is half open and lets a single probe through; a success closes it again,
+    a failure reopens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = BREAKER_RECOVERY_TIMEOUT,
+    ) -> None:
+        """Initialize the breaker closed."""
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._listeners: List[Callable[[], None]] = []
+
+    def async_add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call listener on every state change; returns a function removing it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    @property
+    def retry_at(self) -> Optional[float]:
+        """Return the monotonic time an open breaker lets the next probe through."""
+        if self.state != BREAKER_OPEN or self.opened_at is None:
+            return None
+        return self.opened_at + self.recovery_timeout
+
+    def before_call(self) -> None:
+        """Raise DonetickCircuitOpenError unless a call may be made now."""
+        if self.state == BREAKER_OPEN:
+            if time.monotonic() < self.retry_at:
+                raise DonetickCircuitOpenError("Donetick circuit breaker is open")
+            self._set_state(BREAKER_HALF_OPEN)
+        if self.state == BREAKER_HALF_OPEN:
+            if self._probing:
+                raise DonetickCircuitOpenError("Donetick circuit breaker is waiting for a probe")
+            self._probing = True
+
+    def release(self) -> None:
+        """Free the probe slot of a call that ended without saying anything about the server."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Note a call that reached a healthy server."""
+        self._probing = False
+        self.consecutive_failures = 0
+        if self.state != BREAKER_CLOSED:
+            _LOGGER.info("Donetick is reachable again, closing the circuit breaker")
+            self.opened_at = None
+            self._set_state(BREAKER_CLOSED)
+
+    def record_failure(self) -> None:
+        """Note a call that failed because of the server or the connection."""
+        self._probing = False
+        self.consecutive_failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                _LOGGER.warning(
+                    "Donetick failed %d times in a row, pausing requests for %s seconds",
+                    self.consecutive_failures, self.recovery_timeout,
+                )
+                self.trips += 1
+            self.opened_at = time.monotonic()
+            self._set_state(BREAKER_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        """Change state and notify listeners."""
+        if state == self.state:
+            return
+        self.state = state
+        for listener in list(self._listeners):
+            listener()
+
+async def async_call_with_resilience(
+    call: Callable[[], Awaitable[_T]],
+    breaker: CircuitBreaker,
+    retry_policy: RetryPolicy,
+    idempotent: bool,
+    what: str,
+) -> _T:
+    """Run call through the breaker, retrying retryable failures with backoff."""
+    retry = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = await call()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            if is_server_failure(err):
+                breaker.record_failure()
+            else:
+                # The server answered, the request itself was wrong
+                breaker.record_success()
+            if retry + 1 >= retry_policy.attempts or not is_retryable(err, idempotent):
+                raise
+            delay = retry_policy.delay(retry, err)
+            _LOGGER.debug("Retrying Donetick %s in %.1f seconds after: %s", what, delay, err)
+            await asyncio.sleep(delay)
+            retry += 1
+        except BaseException:
+            # Parsing errors and cancellation say nothing about server health,
+            # but must not leave a half-open probe slot taken
+            breaker.release()
+            raise
+        else:
+            breaker.record_success()
+            return result
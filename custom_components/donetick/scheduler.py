@@ -0,0 +1,131 @@
+"""Rate limiting and priority scheduling of requests to a Donetick server."""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, RATE_LIMIT_BURST
+from .pool import async_acquire_pooled
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEDULER_POOL_KEY = f"{DOMAIN}_schedulers"
+
+# Lower values are sent first
+PRIORITY_USER = 0 # mutations, usually a person waiting for them
+PRIORITY_BACKGROUND = 1 # reads of coordinator refreshes
+
+class RequestScheduler:
+    """Token bucket rate limit and in-flight cap shared by the clients of one server.
+
+    Requests that cannot start right away queue by priority, then in arrival
+    order. A rate of 0 disables the rate limit.
+    """
+
+    def __init__(self, rate: float, max_in_flight: int) -> None:
+        """Initialize the scheduler."""
+        self.rate = rate
+        self.burst = max(1.0, rate * RATE_LIMIT_BURST)
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._tokens = self.burst
+        self._refilled = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def queued(self) -> int:
+        """Return how many requests wait for a slot."""
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Wait for a token and an in-flight slot, and hold the slot for the request."""
+        await self._async_acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _async_acquire(self, priority: int) -> None:
+        """Take a slot now, or queue for one."""
+        if not self._waiters and self._try_take():
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the cancellation arrived
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Free an in-flight slot and start queued requests."""
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _try_take(self) -> bool:
+        """Take an in-flight slot and a token if both are available."""
+        if self.in_flight >= self.max_in_flight:
+            return False
+        if self.rate:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+        self.in_flight += 1
+        return True
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued requests in priority order, waiting for tokens if needed."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            if self._waiters[0][2].done():
+                # Cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            if not self._try_take():
+                break
+            heapq.heappop(self._waiters)[2].set_result(None)
+        if self._waiters and self.in_flight < self.max_in_flight and self.rate:
+            # Out of tokens: try again once the next one is due
+            self._timer = asyncio.get_running_loop().call_later((1 - self._tokens) / self.rate, self._dispatch)
+
+@callback
+def async_acquire_scheduler(
+    hass: HomeAssistant, base_url: str, rate: float, max_in_flight: int
+) -> tuple[RequestScheduler, Callable[[], None]]:
+    """Return the scheduler of a server and a callback releasing it.
+
+    Config entries with the same base URL share one scheduler, created with the
+    settings of the first of them.
+    """
+    key = base_url.rstrip("/")
+    scheduler, release = async_acquire_pooled(
+        hass, SCHEDULER_POOL_KEY, key, lambda: RequestScheduler(rate, max_in_flight)
+    )
+    if (scheduler.rate, scheduler.max_in_flight) != (rate, max_in_flight):
+        _LOGGER.warning(
+            "Donetick entries for %s use different request limits, using %s requests/s with %d in flight",
+            key, scheduler.rate, scheduler.max_in_flight,
+        )
+
+    @callback
+    def _async_release() -> None:
+        # Nothing to dispose of: a scheduler without users is simply dropped
+        release()
+
+    return scheduler, _async_release
@@ -1,10 +1,23 @@
 """Donetick sensor platform."""
 from __future__ import annotations
 
-from homeassistant.core import HomeAssistant
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
+from .const import DOMAIN
+from .coordinator import DonetickRuntimeData, DonetickTodoCoordinator
+from .metrics import DonetickMetrics
+from .resilience import BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN
 from .thing import async_setup_entry as thing_async_setup_entry
 
 async def async_setup_entry(
@@ -13,4 +26,274 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Donetick sensor entities."""
-    await thing_async_setup_entry(hass, config_entry, async_add_entities, "sensor")
\ No newline at end of file
+    runtime: DonetickRuntimeData = hass.data[DOMAIN][config_entry.entry_id]
+    async_add_entities([
+        DonetickRefreshIntervalSensor(runtime.todo_coordinator, config_entry),
+        DonetickCircuitBreakerSensor(runtime.todo_coordinator, config_entry),
+        DonetickLastSyncSensor(runtime.todo_coordinator, config_entry),
+        DonetickApiRequestsSensor(runtime.todo_coordinator, config_entry),
+        DonetickApiErrorsSensor(runtime.todo_coordinator, config_entry),
+        DonetickApiLatencySensor(runtime.todo_coordinator, config_entry),
+        DonetickResponseSizeSensor(runtime.todo_coordinator, config_entry),
+        DonetickParseTimeSensor(runtime.todo_coordinator, config_entry),
+        DonetickStateWritesSensor(runtime.todo_coordinator, config_entry),
+    ])
+    await thing_async_setup_entry(hass, config_entry, async_add_entities, "sensor")
+
+class DonetickDiagnosticSensor(CoordinatorEntity[DonetickTodoCoordinator], SensorEntity):
+    """Base class for sensors describing the integration itself."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry, key: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._attr_unique_id = f"dt_{config_entry.entry_id}_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id)},
+            name=config_entry.title,
+            manufacturer="Donetick",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+class DonetickRefreshIntervalSensor(DonetickDiagnosticSensor):
+    """Interval the todo coordinator chose until its next refresh."""
+
+    _attr_name = "Refresh interval"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "refresh_interval")
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the current refresh interval in seconds."""
+        if self.coordinator.update_interval is None:
+            return None
+        return self.coordinator.update_interval.total_seconds()
+
+class DonetickCircuitBreakerSensor(DonetickDiagnosticSensor):
+    """State of the API client's circuit breaker."""
+
+    _attr_name = "API circuit breaker"
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = [BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN]
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "circuit_breaker")
+        self._breaker = coordinator.client.breaker
+
+    async def async_added_to_hass(self) -> None:
+        """Follow breaker state changes, which happen between coordinator updates."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._breaker.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def available(self) -> bool:
+        """Return True; the breaker matters most while refreshes fail."""
+        return True
+
+    @property
+    def native_value(self) -> str:
+        """Return the breaker state."""
+        return self._breaker.state
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return failure counts and when an open breaker probes again."""
+        retry_at = self._breaker.retry_at
+        probe_at = None
+        if retry_at is not None:
+            probe_at = (dt_util.utcnow() + timedelta(seconds=max(0, retry_at - time.monotonic()))).isoformat()
+        return {
+            "consecutive_failures": self._breaker.consecutive_failures,
+            "trips": self._breaker.trips,
+            "probe_at": probe_at,
+        }
+
+def _milliseconds(seconds: float | None) -> float | None:
+    """Return seconds as rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+class DonetickMetricSensor(DonetickDiagnosticSensor):
+    """Performance metric of the config entry, disabled by default."""
+
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry, key: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, key)
+        self._metrics: DonetickMetrics = coordinator.client.metrics
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the metrics, which change after every coordinator update."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._metrics.async_add_listener(self.async_write_ha_state))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Leave writing to the metrics listener, which runs once the update's state writes are counted."""
+
+    @property
+    def available(self) -> bool:
+        """Return True; metrics matter most while refreshes fail."""
+        return True
+
+class DonetickLastSyncSensor(DonetickMetricSensor):
+    """When the tasks were last refreshed from the server."""
+
+    _attr_name = "Last sync"
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_entity_registry_enabled_default = True
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "last_sync")
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return the last successful task refresh."""
+        return self._metrics.last_sync.get(self.coordinator.name)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the last successful refresh of every coordinator."""
+        return {name: when.isoformat() for name, when in self._metrics.last_sync.items()}
+
+class DonetickApiRequestsSensor(DonetickMetricSensor):
+    """Requests sent to Donetick since the integration started, retries included."""
+
+    _attr_name = "API requests"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "api_requests")
+
+    @property
+    def native_value(self) -> int:
+        """Return the requests sent."""
+        return self._metrics.total().requests
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the requests per endpoint."""
+        return {name: metrics.requests for name, metrics in self._metrics.endpoints.items()}
+
+class DonetickApiErrorsSensor(DonetickMetricSensor):
+    """Requests to Donetick that failed since the integration started."""
+
+    _attr_name = "API errors"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "api_errors")
+
+    @property
+    def native_value(self) -> int:
+        """Return the failed requests."""
+        return self._metrics.total().errors
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the failed requests per endpoint."""
+        return {name: metrics.errors for name, metrics in self._metrics.endpoints.items()}
+
+class DonetickApiLatencySensor(DonetickMetricSensor):
+    """95th percentile latency of requests to Donetick, from the latency histogram."""
+
+    _attr_name = "API latency"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "api_latency")
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the 95th percentile latency of every request."""
+        return _milliseconds(self._metrics.total().latency_percentile(0.95))
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the median and 95th percentile latency per endpoint."""
+        return {
+            name: {"p50": _milliseconds(metrics.latency_percentile(0.5)), "p95": _milliseconds(metrics.latency_percentile(0.95))}
+            for name, metrics in self._metrics.endpoints.items()
+        }
+
+class DonetickResponseSizeSensor(DonetickMetricSensor):
+    """Response bytes read from Donetick since the integration started."""
+
+    _attr_name = "API response data"
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "api_response_data")
+
+    @property
+    def native_value(self) -> int:
+        """Return the response bytes read."""
+        return self._metrics.total().response_bytes
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the response bytes per endpoint."""
+        return {name: metrics.response_bytes for name, metrics in self._metrics.endpoints.items()}
+
+class DonetickParseTimeSensor(DonetickMetricSensor):
+    """Time spent decoding responses into models since the integration started."""
+
+    _attr_name = "Parse time"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "parse_time")
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the JSON and model decoding time."""
+        total = self._metrics.total()
+        return _milliseconds(total.json_seconds + total.model_seconds)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the JSON and model decoding time per endpoint."""
+        return {
+            name: {"json": _milliseconds(metrics.json_seconds), "models": _milliseconds(metrics.model_seconds)}
+            for name, metrics in self._metrics.endpoints.items()
+            if metrics.parses
+        }
+
+class DonetickStateWritesSensor(DonetickMetricSensor):
+    """Entity states written by the last task update."""
+
+    _attr_name = "State writes per refresh"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, config_entry, "state_writes")
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the states written by the last task update."""
+        return self._metrics.update_state_writes.get(self.coordinator.name)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the states written by the last update of every coordinator, and in total."""
+        return {**self._metrics.update_state_writes, "total": self._metrics.state_writes}
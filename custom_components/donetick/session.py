@@ -0,0 +1,81 @@
+"""Dedicated aiohttp sessions per Donetick server, shared by the config entries using it."""
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import aiohttp
+from aiohttp.hdrs import ACCEPT_ENCODING, USER_AGENT
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util.ssl import get_default_context
+
+from .const import DOMAIN
+from .pool import async_acquire_pooled, async_pop_pool
+
+_LOGGER = logging.getLogger(__name__)
+
+SESSION_POOL_KEY = f"{DOMAIN}_session_pool"
+
+@dataclass(frozen=True)
+class DonetickSessionConfig:
+    """Connection settings of a dedicated session."""
+    max_connections: int
+    keepalive_timeout: int # seconds an idle connection stays open
+    dns_cache_ttl: int # seconds, 0 disables the DNS cache
+    compression: bool # negotiate compressed responses
+
+@callback
+def async_acquire_session(
+    hass: HomeAssistant, base_url: str, config: DonetickSessionConfig
+) -> tuple[aiohttp.ClientSession, Callable[[], Awaitable[None]]]:
+    """Return the dedicated session for a server and a coroutine function releasing it.
+
+    Config entries with the same base URL and settings share one session, which
+    is closed when the last of them releases it or Home Assistant stops.
+    """
+    if SESSION_POOL_KEY not in hass.data:
+
+        async def _async_close_all(_event: Event) -> None:
+            for session in async_pop_pool(hass, SESSION_POOL_KEY):
+                await session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_all)
+
+    url = base_url.rstrip("/")
+
+    def _create() -> aiohttp.ClientSession:
+        session = _create_session(config)
+        _LOGGER.debug("Created dedicated session for %s: %s", url, config)
+        return session
+
+    session, release = async_acquire_pooled(hass, SESSION_POOL_KEY, (url, config), _create)
+
+    async def _async_release() -> None:
+        if release():
+            await session.close()
+            _LOGGER.debug("Closed dedicated session for %s", url)
+
+    return session, _async_release
+
+def _create_session(config: DonetickSessionConfig) -> aiohttp.ClientSession:
+    """Create a session with its own connection pool."""
+    connector = aiohttp.TCPConnector(
+        limit=config.max_connections,
+        keepalive_timeout=config.keepalive_timeout or None,
+        force_close=not config.keepalive_timeout,
+        use_dns_cache=config.dns_cache_ttl > 0,
+        ttl_dns_cache=config.dns_cache_ttl or None,
+        ssl=get_default_context(),
+        enable_cleanup_closed=True,
+    )
+    headers = {USER_AGENT: SERVER_SOFTWARE}
+    if not config.compression:
+        headers[ACCEPT_ENCODING] = "identity"
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers=headers,
+        auto_decompress=config.compression,
+        json_serialize=json_dumps,
+    )
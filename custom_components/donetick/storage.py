@@ -0,0 +1,104 @@
+"""Persistent snapshot of the last good Donetick data."""
+import logging
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import SNAPSHOT_SAVE_DELAY, SNAPSHOT_STORAGE_VERSION, TODO_STORAGE_KEY
+from .coordinator import DonetickRuntimeData
+from .model import DonetickMember, DonetickTask, DonetickTaskStore, DonetickThing
+
+_LOGGER = logging.getLogger(__name__)
+
+class DonetickSnapshot:
+    """Tasks, members and things of a config entry saved through HA's Store.
+
+    Loaded at setup so entities render immediately while the first network
+    refresh runs in the background.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, f"{TODO_STORAGE_KEY}.{entry_id}"
+        )
+        self._runtime: DonetickRuntimeData | None = None
+        # Content of the snapshot as loaded or last scheduled to save, to skip saving unchanged data
+        self._saved: tuple = (None, None, None)
+
+    async def async_load(self, runtime: DonetickRuntimeData) -> bool:
+        """Seed the runtime's coordinators from the snapshot. Return True if one was found."""
+        data = await self._store.async_load()
+        if not data:
+            return False
+        try:
+            tasks = DonetickTask.from_json_list(data["tasks"])
+            members = DonetickMember.from_json_list(data["members"])
+            things = DonetickThing.from_json_list(data["things"])
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.warning("Ignoring unreadable Donetick snapshot: %s", err)
+            return False
+
+        runtime.todo_coordinator.async_set_updated_data(DonetickTaskStore(tasks))
+        runtime.members_coordinator.async_set_updated_data(members)
+        runtime.things_coordinator.async_set_updated_data({thing.id: thing for thing in things})
+        self._saved = self._content(runtime)
+        _LOGGER.debug("Loaded Donetick snapshot with %d tasks, %d members and %d things", len(tasks), len(members), len(things))
+        return True
+
+    @callback
+    def async_track(self, runtime: DonetickRuntimeData) -> CALLBACK_TYPE:
+        """Save a snapshot whenever the coordinators publish different data.
+
+        Returns a callback that stops tracking.
+        """
+        self._runtime = runtime
+        unsubs = [
+            runtime.todo_coordinator.async_add_listener(self._async_schedule_save),
+            runtime.members_coordinator.async_add_listener(self._async_schedule_save),
+            runtime.things_coordinator.async_add_listener(self._async_schedule_save),
+        ]
+        # Saves the first download when there was no snapshot; a loaded one is not rewritten
+        self._async_schedule_save()
+
+        @callback
+        def _async_untrack() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return _async_untrack
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule a delayed save if the data changed since the last one."""
+        current = self._content(self._runtime)
+        # Unchanged objects compare by identity; a refetch of the same content compares equal by value
+        if current[0] is None or current == self._saved:
+            return
+        self._saved = current
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    @staticmethod
+    def _content(runtime: DonetickRuntimeData) -> tuple:
+        """Return what the snapshot is compared by: task fingerprints, members and things."""
+        store = runtime.todo_coordinator.data
+        return (
+            store.fingerprints if store is not None else None,
+            runtime.members_coordinator.data,
+            runtime.things_coordinator.data,
+        )
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the snapshot content."""
+        runtime = self._runtime
+        return {
+            "tasks": [task.to_json() for task in runtime.todo_coordinator.data or []],
+            "members": [member.to_json() for member in runtime.members_coordinator.data or []],
+            "things": [thing.to_json() for thing in (runtime.things_coordinator.data or {}).values()],
+        }
+
+    async def async_remove(self) -> None:
+        """Delete the snapshot file."""
+        await self._store.async_remove()
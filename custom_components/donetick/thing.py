@@ -1,23 +1,41 @@
 """Donetick thing entities."""
+import asyncio
 import logging
-from typing import Any, Optional
-from homeassistant.core import HomeAssistant, callback
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Callable
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.entity import Entity
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.components.number import NumberEntity
 from homeassistant.components.text import TextEntity
-from homeassistant.const import STATE_ON, STATE_OFF
 
 from .api import DonetickApiClient
-from .const import DOMAIN, CONF_URL, CONF_TOKEN
+from .const import DOMAIN, THING_REMOVAL_REFRESHES, THING_WRITE_SETTLE_DELAY
+from .coordinator import DonetickRuntimeData, DonetickThingsCoordinator
 from .model import DonetickThing
 
 _LOGGER = logging.getLogger(__name__)
 
+THING_UNIQUE_ID_PREFIX = "donetick_thing_"
+
+# Thing type: platform its entity belongs to; every other type is a sensor
+_THING_PLATFORMS = {
+    "boolean": "switch",
+    "number": "number",
+    "text": "text",
+}
+
+def _platform_for(thing: DonetickThing) -> str:
+    """Return the platform of a thing's entity."""
+    return _THING_PLATFORMS.get(thing.type, "sensor")
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -25,45 +43,287 @@ async def async_setup_entry(
     platform: str = None,
 ) -> None:
     """Set up Donetick thing entities for specific platform."""
-    config = hass.data[DOMAIN][config_entry.entry_id]
-    session = async_get_clientsession(hass)
-    client = DonetickApiClient(
-        config[CONF_URL],
-        config[CONF_TOKEN], 
-        session
-    )
-    
+    runtime: DonetickRuntimeData = hass.data[DOMAIN][config_entry.entry_id]
+    if runtime.thing_entities is None:
+        runtime.thing_entities = DonetickThingEntities(hass, config_entry, runtime.things_coordinator)
+    if runtime.things_coordinator.data is None:
+        _LOGGER.warning("No Donetick things data available yet, thing entities are added once it is")
+    config_entry.async_on_unload(runtime.thing_entities.async_add_platform(platform, async_add_entities))
+
+class DonetickThingEntities:
+    """Keep the thing entities of a config entry in line with the things Donetick reports.
+
+    Every things coordinator update is diffed by id. New things get an entity
+    on their platform, and a thing whose type moved it to another platform is
+    removed there and added again. A thing pushed as deleted loses its entity
+    and registry entry right away. A thing that is merely missing only loses
+    them once THING_REMOVAL_REFRESHES complete refreshes in a row lacked it;
+    until then its entity is unavailable. Failed refreshes and responses with
+    malformed rows never count, so one bad response cannot wipe the entities
+    and their customisations.
+    """
+
+    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, coordinator: DonetickThingsCoordinator) -> None:
+        """Initialize the thing entities."""
+        self._hass = hass
+        self._config_entry = config_entry
+        self._coordinator = coordinator
+        self._add_entities: dict[str, AddEntitiesCallback] = {}
+        # Per thing id: platform and entity created for it
+        self._entities: dict[int, tuple[str, "DonetickThingBase"]] = {}
+        # Registry entries no entity was created for, per entity id: platform and thing id
+        self._orphans: dict[str, tuple[str, int]] = {}
+        # Per thing id: complete refreshes in a row the thing was missing from
+        self._missing: dict[int, int] = {}
+        self._counted_refreshes = 0
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_platform(self, platform: str, async_add_entities: AddEntitiesCallback) -> CALLBACK_TYPE:
+        """Create the entities of a platform and follow the things from now on.
+
+        Returns a callback to call when the platform unloads.
+        """
+        self._add_entities[platform] = async_add_entities
+        if self._unsub is None:
+            self._unsub = self._coordinator.async_add_listener(self._async_sync)
+        self._async_sync()
+        self._async_find_orphans(platform)
+
+        @callback
+        def _async_remove_platform() -> None:
+            del self._add_entities[platform]
+            for thing_id, (entity_platform, _) in list(self._entities.items()):
+                if entity_platform == platform:
+                    del self._entities[thing_id]
+            for entity_id, (entity_platform, _) in list(self._orphans.items()):
+                if entity_platform == platform:
+                    del self._orphans[entity_id]
+            if not self._add_entities and self._unsub is not None:
+                self._unsub()
+                self._unsub = None
+
+        return _async_remove_platform
+
+    @callback
+    def _async_find_orphans(self, platform: str) -> None:
+        """Remember the platform's registry entries of things no entity was created for.
+
+        They belong to things deleted or moved to another platform while the
+        entry was not loaded, or to things missing from the data at hand.
+        """
+        current = {
+            entity.unique_id for entity_platform, entity in self._entities.values() if entity_platform == platform
+        }
+        registry = er.async_get(self._hass)
+        for entry in er.async_entries_for_config_entry(registry, self._config_entry.entry_id):
+            if entry.domain != platform or entry.unique_id in current or not entry.unique_id.startswith(THING_UNIQUE_ID_PREFIX):
+                continue
+            try:
+                thing_id = int(entry.unique_id[len(THING_UNIQUE_ID_PREFIX):])
+            except ValueError:
+                continue
+            self._orphans[entry.entity_id] = (platform, thing_id)
+
+    @callback
+    def _async_sync(self) -> None:
+        """Add, remove and migrate entities after a things update."""
+        things = self._coordinator.data
+        if things is None or not self._coordinator.last_update_success:
+            return
+
+        for thing_id in self._coordinator.async_pop_deleted_ids():
+            if thing_id not in things:
+                _LOGGER.debug("Donetick thing %d was deleted", thing_id)
+                self._async_forget_thing(thing_id)
+
+        for thing_id, (platform, entity) in list(self._entities.items()):
+            thing = things.get(thing_id)
+            if thing is not None and _platform_for(thing) != platform:
+                _LOGGER.debug("Donetick thing %d changed to type %s", thing_id, thing.type)
+                del self._entities[thing_id]
+                self._async_remove_entity(platform, entity)
+
+        added: dict[str, list[DonetickThingBase]] = {}
+        for thing in things.values():
+            platform = _platform_for(thing)
+            if thing.id in self._entities or platform not in self._add_entities:
+                continue
+            entity = _THING_ENTITIES[platform](self._coordinator, thing)
+            self._entities[thing.id] = (platform, entity)
+            added.setdefault(platform, []).append(entity)
+        for platform, entities in added.items():
+            _LOGGER.debug("Adding %d Donetick thing %s entities", len(entities), platform)
+            self._add_entities[platform](entities)
+
+        if self._coordinator.refreshes != self._counted_refreshes and self._coordinator.complete:
+            self._counted_refreshes = self._coordinator.refreshes
+            self._async_count_missing(things)
+
+    @callback
+    def _async_count_missing(self, things: dict[int, DonetickThing]) -> None:
+        """Count a complete refresh against the things it lacked and remove those missing for long enough."""
+        registry = er.async_get(self._hass)
+        for entity_id, (platform, thing_id) in list(self._orphans.items()):
+            thing = things.get(thing_id)
+            if thing is None:
+                continue
+            del self._orphans[entity_id]
+            # On the same platform the thing's entity reuses the entry
+            if _platform_for(thing) != platform and registry.async_get(entity_id) is not None:
+                _LOGGER.debug("Removing Donetick thing entity %s of a thing that changed type", entity_id)
+                registry.async_remove(entity_id)
+
+        missing = {thing_id for thing_id in self._entities if thing_id not in things}
+        missing.update(thing_id for _, thing_id in self._orphans.values())
+        self._missing = {thing_id: self._missing.get(thing_id, 0) + 1 for thing_id in missing}
+        for thing_id, refreshes in list(self._missing.items()):
+            if refreshes >= THING_REMOVAL_REFRESHES:
+                _LOGGER.info("Donetick thing %d was missing from %d refreshes in a row, removing it", thing_id, refreshes)
+                self._async_forget_thing(thing_id)
+
+    @callback
+    def _async_forget_thing(self, thing_id: int) -> None:
+        """Remove a deleted thing's entity and registry entries."""
+        self._missing.pop(thing_id, None)
+        if (tracked := self._entities.pop(thing_id, None)) is not None:
+            self._async_remove_entity(*tracked)
+        registry = er.async_get(self._hass)
+        for entity_id, (_, orphan_thing_id) in list(self._orphans.items()):
+            if orphan_thing_id == thing_id:
+                del self._orphans[entity_id]
+                if registry.async_get(entity_id) is not None:
+                    registry.async_remove(entity_id)
+
+    @callback
+    def _async_remove_entity(self, platform: str, entity: "DonetickThingBase") -> None:
+        """Remove an entity and its registry entry."""
+        _LOGGER.debug("Removing Donetick thing %s entity %s", platform, entity.unique_id)
+        registry = er.async_get(self._hass)
+        if entity_id := registry.async_get_entity_id(platform, DOMAIN, entity.unique_id):
+            # Removing the registry entry removes the entity too
+            registry.async_remove(entity_id)
+        elif entity.hass is not None:
+            self._hass.async_create_task(entity.async_remove(force_remove=True))
+
+class DonetickThingWriter:
+    """Coalesce the state writes of one thing into as few requests as possible.
+
+    Writes wait THING_WRITE_SETTLE_DELAY seconds for the next one: the last
+    state set wins, increments add up, and increments after a numeric state
+    are folded into it. Requests of a thing are sent one at a time, so their
+    responses cannot arrive out of order. Things fetched before the last request
+    finished may predate it; wrote_after tells the entity to keep its own state.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: DonetickApiClient,
+        thing_id: int,
+        on_state: Callable[[str], None],
+    ) -> None:
+        """Initialize the writer; on_state receives the state the server reports after an increment."""
+        self._hass = hass
+        self._client = client
+        self._thing_id = thing_id
+        self._on_state = on_state
+        self._state: str | None = None
+        self._increment = 0
+        self._written: asyncio.Future | None = None
+        self._unsub: CALLBACK_TYPE | None = None
+        self._lock = asyncio.Lock()
+        # Monotonic time the last request finished
+        self._finished: float | None = None
+
+    @property
+    def busy(self) -> bool:
+        """Return whether writes are pending or being sent."""
+        return self._written is not None or self._lock.locked()
+
+    def wrote_after(self, fetch_started: float | None) -> bool:
+        """Return whether a request finished after a fetch was sent, which may then predate it."""
+        return self._finished is not None and (fetch_started is None or fetch_started < self._finished)
+
+    @callback
+    def async_set(self, state: str) -> asyncio.Future:
+        """Set the state, replacing pending writes. Returns a future of the request's success."""
+        self._state = state
+        self._increment = 0
+        return self._async_schedule()
+
+    @callback
+    def async_increment(self, amount: int) -> asyncio.Future:
+        """Change a numeric state by amount. Returns a future of the request's success."""
+        if self._state is not None and (state := _add_to_number(self._state, amount + self._increment)) is not None:
+            self._state = state
+            self._increment = 0
+        else:
+            self._increment += amount
+        return self._async_schedule()
+
+    @callback
+    def _async_schedule(self) -> asyncio.Future:
+        """Restart the settle window."""
+        if self._written is None:
+            self._written = self._hass.loop.create_future()
+        if self._unsub is not None:
+            self._unsub()
+        self._unsub = async_call_later(self._hass, THING_WRITE_SETTLE_DELAY, self._async_settled)
+        return self._written
+
+    async def _async_settled(self, _now: datetime) -> None:
+        """Send the writes once the settle window passed."""
+        self._unsub = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Send the pending writes now."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        async with self._lock:
+            state, increment, written = self._state, self._increment, self._written
+            self._state, self._increment, self._written = None, 0, None
+            if written is None:
+                return
+            success = False
+            try:
+                if state is not None:
+                    success = await self._client.async_set_thing_state(self._thing_id, state)
+                if increment and (state is None or success):
+                    new_state = await self._client.async_change_thing_state(self._thing_id, increment=increment)
+                    success = new_state is not None
+                    if success and self._written is None:
+                        # Only when no newer write is already shown
+                        self._on_state(str(new_state))
+            except Exception as err:
+                _LOGGER.error("Error writing state of thing %s: %s", self._thing_id, err)
+            self._finished = time.monotonic()
+            if not written.done():
+                written.set_result(success)
+
+def _add_to_number(state: str, amount: int) -> str | None:
+    """Return a numeric state changed by amount, or None if the state is not a number."""
     try:
-        things = await client.async_get_things()
-        entities = []
-        
-        for thing in things:
-            # Only create entities for the current platform
-            if platform == "switch" and thing.type == "boolean":
-                entities.append(DonetickThingSwitch(client, thing))
-            elif platform == "number" and thing.type == "number":
-                entities.append(DonetickThingNumber(client, thing))
-            elif platform == "text" and thing.type == "text":
-                entities.append(DonetickThingText(client, thing))
-            elif platform == "sensor" and thing.type not in ["boolean", "number", "text"]:
-                entities.append(DonetickThingSensor(client, thing))
-        
-        if entities:
-            async_add_entities(entities, True)
-        
-    except Exception as err:
-        _LOGGER.error("Error setting up Donetick things: %s", err)
+        value = float(state) + amount
+    except (TypeError, ValueError):
+        return None
+    return str(int(value)) if value.is_integer() else str(value)
 
-class DonetickThingBase(Entity):
+class DonetickThingBase(CoordinatorEntity[DonetickThingsCoordinator]):
     """Base class for Donetick thing entities."""
     
-    def __init__(self, client: DonetickApiClient, thing: DonetickThing) -> None:
+    def __init__(self, coordinator: DonetickThingsCoordinator, thing: DonetickThing) -> None:
         """Initialize the entity."""
-        self._client = client
+        super().__init__(coordinator)
+        self._client = coordinator.client
         self._thing = thing
-        self._attr_unique_id = f"donetick_thing_{thing.id}"
+        self._attr_unique_id = f"{THING_UNIQUE_ID_PREFIX}{thing.id}"
         self._attr_name = thing.name
         self._attr_has_entity_name = True
+        # Availability of the last written state, to skip identical writes
+        self._written_available: bool | None = None
         
     @property
     def device_info(self) -> dict[str, Any]:
@@ -75,14 +335,41 @@ class DonetickThingBase(Entity):
             "model": "Things",
         }
 
-    async def async_update(self) -> None:
-        """Update the entity state."""
-        try:
-            state = await self._client.async_get_thing_state(self._thing.id)
-            if state is not None:
-                self._thing.state = state
-        except Exception as err:
-            _LOGGER.error("Error updating thing %s: %s", self._thing.name, err)
+    @property
+    def available(self) -> bool:
+        """Return if the thing is still reported by Donetick."""
+        return (
+            super().available
+            and self.coordinator.data is not None
+            and self._thing.id in self.coordinator.data
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the availability of the initial state."""
+        await super().async_added_to_hass()
+        self._written_available = self.available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Take the thing's state from the latest things fetch."""
+        self._async_show_thing(self.coordinator.data.get(self._thing.id) if self.coordinator.data else None)
+
+    @callback
+    def _async_show_thing(self, thing: DonetickThing | None) -> None:
+        """Write state only when the fetched thing or the availability changed."""
+        available = self.available
+        if (thing is None or thing == self._thing) and available == self._written_available:
+            return
+        if thing is not None:
+            self._thing = thing
+        self._written_available = available
+        self.coordinator.client.metrics.record_state_write()
+        self.async_write_ha_state()
+
+    def _set_local_state(self, state: str) -> None:
+        """Reflect a successful write without mutating the coordinator's shared data."""
+        self._thing = replace(self._thing, state=state)
+        self.async_write_ha_state()
 
 class DonetickThingSensor(DonetickThingBase, SensorEntity):
     """Donetick thing sensor entity."""
@@ -107,8 +394,7 @@ class DonetickThingSwitch(DonetickThingBase, SwitchEntity):
                 self._thing.id, "true"
             )
             if success:
-                self._thing.state = "true"
-                self.async_write_ha_state()
+                self._set_local_state("true")
         except Exception as err:
             _LOGGER.error("Error turning on thing %s: %s", self._thing.name, err)
     
@@ -119,12 +405,40 @@ class DonetickThingSwitch(DonetickThingBase, SwitchEntity):
                 self._thing.id, "false"
             )
             if success:
-                self._thing.state = "false"
-                self.async_write_ha_state()
+                self._set_local_state("false")
         except Exception as err:
             _LOGGER.error("Error turning off thing %s: %s", self._thing.name, err)
 
-class DonetickThingNumber(DonetickThingBase, NumberEntity):
+class DonetickCoalescedThing(DonetickThingBase):
+    """Thing whose writes are coalesced by a DonetickThingWriter and shown optimistically."""
+
+    _writer: DonetickThingWriter
+
+    async def async_added_to_hass(self) -> None:
+        """Create the writer."""
+        self._writer = DonetickThingWriter(self.hass, self._client, self._thing.id, self._set_local_state)
+        await super().async_added_to_hass()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Send pending writes right away."""
+        await self._writer.async_flush()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Keep showing pending writes over fetched states older than them."""
+        thing = self.coordinator.data.get(self._thing.id) if self.coordinator.data else None
+        if thing is not None and (self._writer.busy or self._writer.wrote_after(self.coordinator.fetch_started)):
+            thing = replace(thing, state=self._thing.state)
+        self._async_show_thing(thing)
+
+    async def _async_write(self, state: str, written: asyncio.Future) -> None:
+        """Show the state a write leads to, wait for it to be sent and resynchronise if it failed."""
+        self._set_local_state(state)
+        if not await written:
+            await self.coordinator.async_request_refresh()
+
+class DonetickThingNumber(DonetickCoalescedThing, NumberEntity):
     """Donetick thing number entity."""
     
     @property
@@ -137,17 +451,15 @@ class DonetickThingNumber(DonetickThingBase, NumberEntity):
     
     async def async_set_native_value(self, value: float) -> None:
         """Set the numeric value."""
-        try:
-            success = await self._client.async_set_thing_state(
-                self._thing.id, str(int(value))
-            )
-            if success:
-                self._thing.state = str(value)
-                self.async_write_ha_state()
-        except Exception as err:
-            _LOGGER.error("Error setting number thing %s: %s", self._thing.name, err)
+        state = str(int(value))
+        await self._async_write(state, self._writer.async_set(state))
+
+    async def async_increment(self, amount: int) -> None:
+        """Change the numeric value by amount."""
+        state = _add_to_number(self._thing.state, amount) or self._thing.state
+        await self._async_write(state, self._writer.async_increment(amount))
 
-class DonetickThingText(DonetickThingBase, TextEntity):
+class DonetickThingText(DonetickCoalescedThing, TextEntity):
     """Donetick thing text entity."""
     
     @property
@@ -157,12 +469,11 @@ class DonetickThingText(DonetickThingBase, TextEntity):
     
     async def async_set_value(self, value: str) -> None:
         """Set the text value."""
-        try:
-            success = await self._client.async_set_thing_state(
-                self._thing.id, value
-            )
-            if success:
-                self._thing.state = value
-                self.async_write_ha_state()
-        except Exception as err:
-            _LOGGER.error("Error setting text thing %s: %s", self._thing.name, err)
\ No newline at end of file
+        await self._async_write(value, self._writer.async_set(value))
+
+_THING_ENTITIES: dict[str, type[DonetickThingBase]] = {
+    "switch": DonetickThingSwitch,
+    "number": DonetickThingNumber,
+    "text": DonetickThingText,
+    "sensor": DonetickThingSensor,
+}
@@ -1,6 +1,6 @@
 """Todo for Donetick integration."""
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Any
 
 from homeassistant.components.todo import (
@@ -10,17 +10,13 @@ from homeassistant.components.todo import (
     TodoListEntityFeature, 
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    CoordinatorEntity,
-    DataUpdateCoordinator,
-)
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, CONF_URL, CONF_TOKEN, CONF_SHOW_DUE_IN, CONF_CREATE_UNIFIED_LIST, CONF_CREATE_ASSIGNEE_LISTS, CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL
-from .api import DonetickApiClient
-from .model import DonetickTask, DonetickMember
+from .const import DOMAIN, CONF_URL, CONF_CREATE_UNIFIED_LIST, CONF_CREATE_ASSIGNEE_LISTS, DEFAULT_BATCH_CONCURRENCY
+from .coordinator import DonetickMembersCoordinator, DonetickRuntimeData, DonetickTodoCoordinator
+from .model import DonetickTask, DonetickTaskStore, DonetickMember
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,65 +26,54 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the Donetick todo platform."""
-    session = async_get_clientsession(hass)
-    client = DonetickApiClient(
-        hass.data[DOMAIN][config_entry.entry_id][CONF_URL],
-        hass.data[DOMAIN][config_entry.entry_id][CONF_TOKEN],
-        session,
-    )
-
-    refresh_interval_seconds = config_entry.data.get(CONF_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL)
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="donetick_todo",
-        update_method=client.async_get_tasks,
-        update_interval=timedelta(seconds=refresh_interval_seconds),
-    )
-
-    await coordinator.async_config_entry_first_refresh()
+    runtime: DonetickRuntimeData = hass.data[DOMAIN][config_entry.entry_id]
+    coordinator = runtime.todo_coordinator
 
     entities = []
     
     # Create unified list if enabled (check options first, then data)
     create_unified = config_entry.options.get(CONF_CREATE_UNIFIED_LIST, config_entry.data.get(CONF_CREATE_UNIFIED_LIST, True))
     if create_unified:
-        entity = DonetickAllTasksList(coordinator, config_entry)
-        entity._circle_members = []  # Will be set after we get members
-        entities.append(entity)
+        entities.append(DonetickAllTasksList(coordinator, config_entry, runtime.members_coordinator))
     
-    # Get circle members for all entities (useful for custom cards)
-    circle_members = []
-    try:
-        circle_members = await client.async_get_circle_members()
-        _LOGGER.debug("Found %d circle members", len(circle_members))
-        
-        # Set circle members on unified entity if it exists
-        if entities and hasattr(entities[0], '_circle_members'):
-            entities[0]._circle_members = circle_members
-            
-    except Exception as e:
-        _LOGGER.error("Failed to get circle members: %s", e)
+    # Circle members fetched at entry setup (useful for custom cards); refreshed with the tasks
+    circle_members = runtime.members_coordinator.data or []
+    _LOGGER.debug("Found %d circle members", len(circle_members))
     
     # Create per-assignee lists if enabled (check options first, then data)
     create_assignee_lists = config_entry.options.get(CONF_CREATE_ASSIGNEE_LISTS, config_entry.data.get(CONF_CREATE_ASSIGNEE_LISTS, False))
+    listed_members: set[int] = set()
     if create_assignee_lists:
         _LOGGER.debug("Assignee lists enabled in config")
         for member in circle_members:
             if member.is_active:
                 _LOGGER.debug("Creating entity for member: %s (ID: %d)", member.display_name, member.user_id)
-                entity = DonetickAssigneeTasksList(coordinator, config_entry, member)
-                entity._circle_members = circle_members
-                entities.append(entity)
+                entities.append(DonetickAssigneeTasksList(coordinator, config_entry, runtime.members_coordinator, member))
+                listed_members.add(member.user_id)
     else:
         _LOGGER.debug("Assignee lists not enabled in config")
     
     _LOGGER.debug("Creating %d total entities", len(entities))
     async_add_entities(entities)
 
+    if create_assignee_lists:
+        @callback
+        def _async_add_member_lists() -> None:
+            """Add lists for members who joined the circle or became active."""
+            new_lists = []
+            for member in runtime.members_coordinator.data or []:
+                if member.is_active and member.user_id not in listed_members:
+                    _LOGGER.debug("Creating entity for new member: %s (ID: %d)", member.display_name, member.user_id)
+                    new_lists.append(DonetickAssigneeTasksList(coordinator, config_entry, runtime.members_coordinator, member))
+                    listed_members.add(member.user_id)
+            if new_lists:
+                async_add_entities(new_lists)
+
+        config_entry.async_on_unload(runtime.members_coordinator.async_add_listener(_async_add_member_lists))
+
 # Remove old assignee detection function since we now use circle members
 
-class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
+class DonetickTodoListBase(CoordinatorEntity[DonetickTodoCoordinator], TodoListEntity):
     """Base class for Donetick Todo List entities."""
     
     _attr_supported_features = (
@@ -100,31 +85,90 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
         TodoListEntityFeature.SET_DUE_DATETIME_ON_ITEM
     )
 
-    def __init__(self, coordinator: DataUpdateCoordinator, config_entry: ConfigEntry) -> None:
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry, members_coordinator: DonetickMembersCoordinator) -> None:
         """Initialize the Todo List."""
         super().__init__(coordinator)
         self._config_entry = config_entry
+        self._members_coordinator = members_coordinator
+        # What the last written state was built from, to skip identical writes
+        self._written_fingerprint: int | None = None
+        self._written_available: bool | None = None
+        # todo_items built for the store with this version
+        self._todo_items: list[TodoItem] = []
+        self._todo_items_version: int | None = None
+        # Circle members the written attributes were built from
+        self._written_members: tuple | None = None
 
-    def _filter_tasks(self, tasks):
+    def _filter_tasks(self, store: DonetickTaskStore) -> list[DonetickTask]:
         """Filter tasks based on entity type. Override in subclasses."""
-        return tasks
+        return store.tasks
+
+    def _slice_fingerprint(self) -> int | None:
+        """Return a fingerprint of the tasks this list currently shows."""
+        store = self.coordinator.data
+        if store is None:
+            return None
+        fingerprints = store.fingerprints
+        return hash(tuple(fingerprints[task.id] for task in self._filter_tasks(store)))
+
+    def _members_key(self) -> tuple:
+        """Return the member fields shown in the circle_members attribute."""
+        return tuple(
+            (member.user_id, member.display_name, member.username)
+            for member in self._members_coordinator.data or []
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Remember what the initial state was built from and follow member changes."""
+        await super().async_added_to_hass()
+        self._written_fingerprint = self._slice_fingerprint()
+        self._written_available = self.available
+        self._written_members = self._members_key()
+        # Listening also keeps the members coordinator polling
+        self.async_on_remove(self._members_coordinator.async_add_listener(self._handle_members_update))
+
+    @callback
+    def _handle_members_update(self) -> None:
+        """Write state when the circle members shown in the attributes changed."""
+        members = self._members_key()
+        if members == self._written_members:
+            return
+        self._written_members = members
+        self.coordinator.client.metrics.record_state_write()
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when this list's slice of tasks actually changed."""
+        fingerprint = self._slice_fingerprint()
+        available = self.available
+        if fingerprint == self._written_fingerprint and available == self._written_available:
+            return
+        self._written_fingerprint = fingerprint
+        self._written_available = available
+        self._written_members = self._members_key()
+        self.coordinator.client.metrics.record_state_write()
+        self.async_write_ha_state()
 
     @property
     def todo_items(self) -> list[TodoItem] | None: 
-        """Return a list of todo items."""
-        if self.coordinator.data is None:
+        """Return a list of todo items, rebuilt only when the coordinator publishes new data."""
+        store = self.coordinator.data
+        if store is None:
             return None
-        
-        filtered_tasks = self._filter_tasks(self.coordinator.data)
-        return [
-            TodoItem(
-                summary=task.name,
-                uid="%s--%s" % (task.id, task.next_due_date),
-                status=self.get_status(task.next_due_date, task.is_active),
-                due=task.next_due_date,
-                description=task.description or ""
-            ) for task in filtered_tasks if task.is_active
-        ]
+
+        if self._todo_items_version != store.version:
+            self._todo_items = [
+                TodoItem(
+                    summary=task.name,
+                    uid="%s--%s" % (task.id, task.next_due_date),
+                    status=self.get_status(task.next_due_date, task.is_active),
+                    due=task.next_due_date,
+                    description=task.description or ""
+                ) for task in self._filter_tasks(store) if task.is_active
+            ]
+            self._todo_items_version = store.version
+        return self._todo_items
 
     def get_status(self, due_date: datetime, is_active: bool) -> TodoItemStatus:
         """Return the status of the task."""
@@ -141,26 +185,20 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
         }
         
         # Add circle members data for custom card user selection
-        if hasattr(self, '_circle_members'):
-            attributes["circle_members"] = [
-                {
-                    "user_id": member.user_id,
-                    "display_name": member.display_name,
-                    "username": member.username,
-                }
-                for member in self._circle_members
-            ]
+        attributes["circle_members"] = [
+            {
+                "user_id": member.user_id,
+                "display_name": member.display_name,
+                "username": member.username,
+            }
+            for member in self._members_coordinator.data or []
+        ]
         
         return attributes
 
     async def async_create_todo_item(self, item: TodoItem) -> None:
         """Create a todo item."""
-        session = async_get_clientsession(self.hass)
-        client = DonetickApiClient(
-            self._config_entry.data[CONF_URL],
-            self._config_entry.data[CONF_TOKEN],
-            session,
-        )
+        client = self.coordinator.client
         
         try:
             # Determine the created_by user for assignee lists
@@ -185,7 +223,7 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
             _LOGGER.error("Failed to create task '%s': %s", item.summary, e)
             raise
         
-        await self.coordinator.async_refresh()
+        self.coordinator.async_apply_tasks(upserts=[result])
 
     async def async_update_todo_item(self, item: TodoItem, context = None) -> None:
         """Update a todo item."""
@@ -193,12 +231,7 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
         if not self.coordinator.data:
             return None
         
-        session = async_get_clientsession(self.hass)
-        client = DonetickApiClient(
-            self._config_entry.data[CONF_URL],
-            self._config_entry.data[CONF_TOKEN],
-            session,
-        )
+        client = self.coordinator.client
         
         task_id = int(item.uid.split("--")[0])
         
@@ -209,12 +242,9 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
                 # Determine who should complete this task using smart logic
                 completed_by = await self._get_completion_user_id(client, item, context)
                 
-                res = await client.async_complete_task(task_id, completed_by)
-                if res.frequency_type != "once":
-                    _LOGGER.debug("Task %s is recurring, updating next due date", res.name)
-                    item.status = TodoItemStatus.NEEDS_ACTION
-                    item.due = res.next_due_date
-                    self.async_update_todo_item(item)
+                result = await client.async_complete_task(task_id, completed_by)
+                if result.frequency_type != "once":
+                    _LOGGER.debug("Task %s is recurring, next due date %s", result.name, result.next_due_date)
             else:
                 # Update task properties (summary, description, due date)
                 _LOGGER.debug("Updating task %d properties", task_id)
@@ -224,7 +254,7 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
                 if item.due:
                     due_date = item.due.isoformat()
                 
-                await client.async_update_task(
+                result = await client.async_update_task(
                     task_id=task_id,
                     name=item.summary,
                     description=item.description,
@@ -236,31 +266,31 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
             _LOGGER.error("Error updating task %d: %s", task_id, e)
             raise
         
-        await self.coordinator.async_refresh()
+        # The returned task carries the new state, including a recurring task's next due date
+        self.coordinator.async_apply_tasks(upserts=[result])
 
     async def async_delete_todo_items(self, uids: list[str]) -> None:
         """Delete todo items."""
-        session = async_get_clientsession(self.hass)
-        client = DonetickApiClient(
-            self._config_entry.data[CONF_URL],
-            self._config_entry.data[CONF_TOKEN],
-            session,
-        )
+        client = self.coordinator.client
+        
+        task_ids = [int(uid.split("--")[0]) for uid in uids]
+        results = await client.async_delete_tasks(task_ids, DEFAULT_BATCH_CONCURRENCY)
         
-        for uid in uids:
-            try:
-                task_id = int(uid.split("--")[0])
-                success = await client.async_delete_task(task_id)
-                if success:
-                    _LOGGER.info("Deleted task %d", task_id)
-                else:
-                    _LOGGER.error("Failed to delete task %d", task_id)
-                    
-            except Exception as e:
-                _LOGGER.error("Error deleting task %s: %s", uid, e)
-                raise
+        error = None
+        deleted = []
+        for task_id, result in results.items():
+            if isinstance(result, Exception):
+                _LOGGER.error("Error deleting task %d: %s", task_id, result)
+                error = error or result
+            elif result:
+                _LOGGER.info("Deleted task %d", task_id)
+                deleted.append(task_id)
+            else:
+                _LOGGER.error("Failed to delete task %d", task_id)
         
-        await self.coordinator.async_refresh()
+        self.coordinator.async_apply_tasks(removed_ids=deleted)
+        if error:
+            raise error
     
     async def _get_completion_user_id(self, client, item, context=None) -> int | None:
         """Determine who should complete this task using smart logic."""
@@ -274,10 +304,10 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
         # If completing from "All Tasks", find the task's original assignee
         task_id = int(item.uid.split("--")[0])
         if self.coordinator.data:
-            for task in self.coordinator.data:
-                if task.id == task_id and task.assigned_to:
-                    _LOGGER.debug("Using task's original assignee: %d", task.assigned_to)
-                    return task.assigned_to
+            task = self.coordinator.data.get(task_id)
+            if task and task.assigned_to:
+                _LOGGER.debug("Using task's original assignee: %d", task.assigned_to)
+                return task.assigned_to
         
         # No default user - rely on context-based or task assignee
         
@@ -287,29 +317,29 @@ class DonetickTodoListBase(CoordinatorEntity, TodoListEntity):
 class DonetickAllTasksList(DonetickTodoListBase):
     """Donetick All Tasks List entity."""
 
-    def __init__(self, coordinator: DataUpdateCoordinator, config_entry: ConfigEntry) -> None:
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry, members_coordinator: DonetickMembersCoordinator) -> None:
         """Initialize the All Tasks List."""
-        super().__init__(coordinator, config_entry)
+        super().__init__(coordinator, config_entry, members_coordinator)
         self._attr_unique_id = f"dt_{config_entry.entry_id}_all_tasks"
         self._attr_name = "All Tasks"
 
-    def _filter_tasks(self, tasks):
+    def _filter_tasks(self, store: DonetickTaskStore) -> list[DonetickTask]:
         """Return all active tasks."""
-        return [task for task in tasks if task.is_active]
+        return store.active
 
 class DonetickAssigneeTasksList(DonetickTodoListBase):
     """Donetick Assignee-specific Tasks List entity."""
 
-    def __init__(self, coordinator: DataUpdateCoordinator, config_entry: ConfigEntry, member: DonetickMember) -> None:
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry, members_coordinator: DonetickMembersCoordinator, member: DonetickMember) -> None:
         """Initialize the Assignee Tasks List."""
-        super().__init__(coordinator, config_entry)
+        super().__init__(coordinator, config_entry, members_coordinator)
         self._member = member
         self._attr_unique_id = f"dt_{config_entry.entry_id}_{member.user_id}_tasks"
         self._attr_name = f"{member.display_name}'s Tasks"
 
-    def _filter_tasks(self, tasks):
+    def _filter_tasks(self, store: DonetickTaskStore) -> list[DonetickTask]:
         """Return tasks assigned to this member."""
-        return [task for task in tasks if task.is_active and task.assigned_to == self._member.user_id]
+        return store.active_by_assignee.get(self._member.user_id, [])
 
 # Keep the old class for backward compatibility
 class DonetickTodoListEntity(DonetickAllTasksList):
@@ -317,8 +347,8 @@ class DonetickTodoListEntity(DonetickAllTasksList):
     
     """Legacy Donetick Todo List entity for backward compatibility."""
     
-    def __init__(self, coordinator: DataUpdateCoordinator, config_entry: ConfigEntry) -> None:
+    def __init__(self, coordinator: DonetickTodoCoordinator, config_entry: ConfigEntry, members_coordinator: DonetickMembersCoordinator) -> None:
         """Initialize the Todo List."""
-        super().__init__(coordinator, config_entry)
+        super().__init__(coordinator, config_entry, members_coordinator)
         self._attr_unique_id = f"dt_{config_entry.entry_id}"
 
@@ -0,0 +1,59 @@
+"""Shared helpers for Donetick tests."""
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.donetick.const import DOMAIN
+
+URL = "http://donetick.local"
+
+
+def chore(chore_id: int, assignee: int = 1, active: bool = True, due: str = "2030-01-01T10:00:00Z", **fields: Any) -> dict:
+    """Return a chore in the API's JSON shape."""
+    return {
+        "id": chore_id, "name": f"Chore {chore_id}", "nextDueDate": due, "status": 0, "priority": 1,
+        "labels": None, "isActive": active, "frequencyType": "daily", "frequency": 1,
+        "frequencyMetadata": "{}", "assignedTo": assignee, "description": f"Description {chore_id}",
+        **fields,
+    }
+
+
+def member(user_id: int, name: str) -> dict:
+    """Return a circle member in the API's JSON shape."""
+    return {
+        "id": user_id, "userId": user_id, "circleId": 1, "role": "member", "isActive": True,
+        "username": name.lower(), "displayName": name,
+    }
+
+
+def thing(thing_id: int, thing_type: str = "boolean", state: str = "true") -> dict:
+    """Return a thing in the API's JSON shape."""
+    return {"id": thing_id, "name": f"Thing {thing_id}", "type": thing_type, "state": state, "userID": 1, "circleId": 1}
+
+
+MEMBERS = [member(1, "Alice"), member(2, "Bob")]
+THINGS = [thing(1), thing(2, "number", "5"), thing(3, "text", "hi"), thing(4, "action", "x")]
+
+
+def mock_api(
+    aioclient_mock: AiohttpClientMocker,
+    chores: list[dict] | None = None,
+    members: list[dict] | None = None,
+    things: list[dict] | None = None,
+) -> None:
+    """Answer the list endpoints, replacing earlier answers and recorded calls."""
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(f"{URL}/eapi/v1/chore", json=[chore(1), chore(2, 2)] if chores is None else chores)
+    aioclient_mock.get(f"{URL}/eapi/v1/circle/members", json=MEMBERS if members is None else members)
+    aioclient_mock.get(f"{URL}/eapi/v1/things", json=THINGS if things is None else things)
+
+
+async def async_setup_donetick(hass: HomeAssistant, **data: Any) -> MockConfigEntry:
+    """Set up a Donetick entry against the mocked API."""
+    entry = MockConfigEntry(domain=DOMAIN, title="Donetick", data={"url": URL, "token": "token", **data})
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entry
@@ -0,0 +1,22 @@
+"""Fixtures for Donetick tests."""
+from collections.abc import AsyncIterator
+
+import pytest
+
+from benchmarks.emulator import DonetickEmulator
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:
+    """Let Home Assistant load the integration from custom_components."""
+
+
+@pytest.fixture
+async def emulator(socket_enabled: None) -> AsyncIterator[DonetickEmulator]:
+    """Serve a small generated Donetick dataset."""
+    emulator = DonetickEmulator.generate(50, 2, 3)
+    await emulator.start()
+    yield emulator
+    await emulator.stop()
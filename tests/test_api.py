@@ -0,0 +1,141 @@
+"""Tests for the Donetick API client."""
+import asyncio
+
+import pytest
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from benchmarks.emulator import DonetickEmulator, EndpointProfile, fixed
+from custom_components.donetick.api import DonetickApiClient
+
+
+@pytest.mark.parametrize("validators", [True, False], ids=["validators", "no_validators"])
+async def test_list_reuse(hass: HomeAssistant, emulator: DonetickEmulator, validators: bool) -> None:
+    """A list is only decoded again when the server sends a different body."""
+    emulator.validators = validators
+    client = DonetickApiClient(emulator.url, "token", async_get_clientsession(hass))
+
+    tasks = await client.async_get_tasks()
+    assert len(tasks) == 50
+
+    # Unchanged: a 304 with validators, an identical body without them
+    again = await client.async_get_tasks()
+    assert again is tasks
+    assert emulator.stats.requests["tasks"] == 2
+    assert emulator.stats.not_modified["tasks"] == (1 if validators else 0)
+
+    # Changed: the new body is decoded into new models
+    emulator.tasks[0]["name"] = "Renamed"
+    emulator.dataset_changed([emulator.tasks[0]["id"]])
+    changed = await client.async_get_tasks()
+    assert changed is not tasks
+    assert changed[0] is not tasks[0]
+    assert changed[0].name == "Renamed"
+    assert tasks[0].name != "Renamed"
+    assert emulator.stats.not_modified["tasks"] == (1 if validators else 0)
+
+    # And reused again once it stops changing
+    assert await client.async_get_tasks() is changed
+
+
+@pytest.mark.parametrize("body", ["<html>Sign in to continue</html>", '{"error": "maintenance"}'], ids=["html", "object"])
+async def test_unusable_list_body(hass: HomeAssistant, aiohttp_client, socket_enabled: None, body: str) -> None:
+    """A body that is not a JSON list is an error, not an empty list."""
+    async def things(request: web.Request) -> web.Response:
+        return web.Response(text=body)
+
+    app = web.Application()
+    app.router.add_get("/eapi/v1/things", things)
+    server = await aiohttp_client(app)
+    client = DonetickApiClient(str(server.make_url("")), "token", async_get_clientsession(hass))
+
+    with pytest.raises(ValueError):
+        await client.async_get_things()
+
+
+async def test_unparseable_body_validators_not_kept(hass: HomeAssistant, aiohttp_client, socket_enabled: None) -> None:
+    """The ETag of a body that failed to parse must not turn the next answer into a 304 for the old list."""
+    responses = [
+        web.json_response([{"id": 1, "userId": 1, "circleId": 1, "role": "admin", "isActive": True, "username": "a", "displayName": "A"}], headers={"ETag": '"good"'}),
+        web.Response(text="<html>Bad gateway</html>", headers={"ETag": '"broken"'}),
+    ]
+    sent_validators = []
+
+    async def members(request: web.Request) -> web.Response:
+        sent_validators.append(request.headers.get("If-None-Match"))
+        if responses:
+            return responses.pop(0)
+        if request.headers.get("If-None-Match") == '"broken"':
+            return web.Response(status=304, headers={"ETag": '"broken"'})
+        return web.json_response([], headers={"ETag": '"empty"'})
+
+    app = web.Application()
+    app.router.add_get("/eapi/v1/circle/members", members)
+    server = await aiohttp_client(app)
+    client = DonetickApiClient(str(server.make_url("")), "token", async_get_clientsession(hass))
+
+    first = await client.async_get_circle_members()
+    assert len(first) == 1
+    with pytest.raises(ValueError):
+        await client.async_get_circle_members()
+    # Still validated against the list that was parsed, so the server sends the current one
+    assert await client.async_get_circle_members() == []
+    assert sent_validators == [None, '"good"', '"good"']
+
+
+async def test_concurrent_reads_share_request(hass: HomeAssistant, emulator: DonetickEmulator) -> None:
+    """Identical reads in flight at the same time send one request."""
+    emulator.profiles["tasks"] = EndpointProfile(latency=fixed(50))
+    client = DonetickApiClient(emulator.url, "token", async_get_clientsession(hass))
+
+    results = await asyncio.gather(*(client.async_get_tasks() for _ in range(3)))
+    assert results[0] is results[1] is results[2]
+    assert emulator.stats.requests["tasks"] == 1
+    assert client.coalesced_requests["tasks"] == 2
+
+    # A read after the shared one finished sends its own request
+    await client.async_get_tasks()
+    assert emulator.stats.requests["tasks"] == 2
+
+
+async def test_shared_read_cancelled_without_waiters(hass: HomeAssistant, emulator: DonetickEmulator) -> None:
+    """Cancelling one caller keeps the shared request; cancelling the last one cancels it."""
+    emulator.profiles["tasks"] = EndpointProfile(latency=fixed(100))
+    client = DonetickApiClient(emulator.url, "token", async_get_clientsession(hass))
+
+    first = asyncio.ensure_future(client.async_get_tasks())
+    second = asyncio.ensure_future(client.async_get_tasks())
+    await asyncio.sleep(0.02)
+    first.cancel()
+    assert len(await second) == 50
+    assert emulator.stats.requests["tasks"] == 1
+
+    last = asyncio.ensure_future(client.async_get_tasks())
+    await asyncio.sleep(0.02)
+    (request,) = client._in_flight.values()  # pylint: disable=protected-access
+    last.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await last
+    await asyncio.sleep(0)
+    assert request.cancelled()
+    assert not client._in_flight  # pylint: disable=protected-access
+    # Let the emulator finish answering the abandoned request
+    await asyncio.sleep(0.15)
+
+
+async def test_write_forgets_reads_in_flight(hass: HomeAssistant, emulator: DonetickEmulator) -> None:
+    """A read started after a write does not join a read that was sent before it."""
+    emulator.profiles["tasks"] = EndpointProfile(latency=fixed(100))
+    client = DonetickApiClient(emulator.url, "token", async_get_clientsession(hass))
+
+    before = asyncio.ensure_future(client.async_get_tasks())
+    await asyncio.sleep(0.02)
+    await client.async_update_task(1, name="Renamed")
+    assert not client._in_flight  # pylint: disable=protected-access
+
+    after = await client.async_get_tasks()
+    assert emulator.stats.requests["tasks"] == 2
+    assert client.coalesced_requests["tasks"] == 0
+    assert next(task for task in after if task.id == 1).name == "Renamed"
+    await before
@@ -0,0 +1,121 @@
+"""Tests for the Donetick coordinators."""
+from datetime import timedelta
+
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from benchmarks.emulator import DonetickEmulator
+from custom_components.donetick.api import DonetickApiClient
+from custom_components.donetick.const import DELTA_SYNC_FULL_RESYNC_INTERVAL
+from custom_components.donetick.coordinator import DonetickTodoCoordinator
+from custom_components.donetick.model import DonetickTask, DonetickTaskStore
+
+from .common import chore
+
+
+def _incremental_coordinator(hass: HomeAssistant, emulator: DonetickEmulator) -> DonetickTodoCoordinator:
+    """Return a todo coordinator syncing incrementally from the emulator."""
+    client = DonetickApiClient(emulator.url, "token", async_get_clientsession(hass))
+    return DonetickTodoCoordinator(hass, client, 900, mutation_refresh_delay=0, incremental=True)
+
+
+def test_store_merged() -> None:
+    """Upserts replace tasks in place or are appended, deleted ids are dropped."""
+    store = DonetickTaskStore(DonetickTask.from_json_list([chore(1), chore(2), chore(3)]))
+    merged = store.merged(
+        DonetickTask.from_json_list([chore(2, name="Renamed"), chore(4)]),
+        [3, 4],
+    )
+    assert [task.id for task in merged] == [1, 2]
+    assert merged.get(2).name == "Renamed"
+    assert merged.get(1) is store.get(1)
+    assert merged.version != store.version
+    assert merged.fingerprints[1] == store.fingerprints[1]
+    assert merged.fingerprints[2] != store.fingerprints[2]
+
+    merged = store.merged(DonetickTask.from_json_list([chore(5, active=False)]))
+    assert [task.id for task in merged] == [1, 2, 3, 5]
+    assert [task.id for task in merged.active] == [1, 2, 3]
+
+
+def test_watermark_from_date() -> None:
+    """Watermarks reach back DELTA_SYNC_OVERLAP before the server's Date header."""
+    assert DonetickApiClient._watermark_from_date(  # pylint: disable=protected-access
+        "Wed, 21 Oct 2026 07:28:00 GMT"
+    ) == "2026-10-21T07:27:00+00:00"
+
+
+async def test_incremental_sync_merges_changes(hass: HomeAssistant, emulator: DonetickEmulator) -> None:
+    """After the first full download only changes are fetched and merged."""
+    coordinator = _incremental_coordinator(hass, emulator)
+    await coordinator.async_refresh()
+    assert len(coordinator.data) == 50
+    assert emulator.stats.requests["tasks"] == 1
+
+    emulator.tasks[0]["name"] = "Renamed"
+    emulator.dataset_changed([emulator.tasks[0]["id"]])
+    await coordinator.client.async_delete_task(emulator.tasks[1]["id"])
+    before = coordinator.data
+    await coordinator.async_refresh()
+
+    assert emulator.stats.requests["tasks"] == 1
+    assert emulator.stats.requests["task_changes"] == 1
+    assert len(coordinator.data) == 49
+    assert coordinator.data.tasks[0].name == "Renamed"
+    assert coordinator.data.get(2) is None
+    assert coordinator.data.tasks[1] is before.tasks[2]
+
+    # Nothing changed since: the same store is kept
+    store = coordinator.data
+    await coordinator.async_refresh()
+    assert emulator.stats.requests["task_changes"] == 2
+    assert coordinator.data is store
+
+
+async def test_sync_watermark_from_server_date(hass: HomeAssistant, emulator: DonetickEmulator) -> None:
+    """The first delta asks for changes since the full download's Date minus the overlap."""
+    coordinator = _incremental_coordinator(hass, emulator)
+    await coordinator.async_refresh()
+    date = coordinator.client._server_dates["/eapi/v1/chore"]  # pylint: disable=protected-access
+    assert date is not None
+    assert coordinator.client.task_sync_watermark() == DonetickApiClient._watermark_from_date(date)  # pylint: disable=protected-access
+    assert coordinator._watermark == coordinator.client.task_sync_watermark()  # pylint: disable=protected-access
+
+
+async def test_full_list_answer_disables_incremental_sync(hass: HomeAssistant, emulator: DonetickEmulator) -> None:
+    """A server ignoring the delta query answers with the full list, which replaces the data."""
+    emulator.delta = False
+    coordinator = _incremental_coordinator(hass, emulator)
+    await coordinator.async_refresh()
+
+    emulator.tasks[0]["name"] = "Renamed"
+    emulator.dataset_changed([emulator.tasks[0]["id"]])
+    await coordinator.async_refresh()
+    assert not coordinator.incremental
+    assert coordinator.data.tasks[0].name == "Renamed"
+    assert emulator.stats.requests["tasks"] == 2
+
+    # Later refreshes download the full list without asking for changes
+    await coordinator.async_refresh()
+    assert emulator.stats.requests["tasks"] == 3
+
+
+async def test_periodic_full_resync(hass: HomeAssistant, emulator: DonetickEmulator, freezer: FrozenDateTimeFactory) -> None:
+    """A full download replaces deltas every DELTA_SYNC_FULL_RESYNC_INTERVAL seconds."""
+    coordinator = _incremental_coordinator(hass, emulator)
+    await coordinator.async_refresh()
+
+    freezer.tick(timedelta(seconds=DELTA_SYNC_FULL_RESYNC_INTERVAL - 1))
+    await coordinator.async_refresh()
+    assert emulator.stats.requests["tasks"] == 1
+    assert emulator.stats.requests["task_changes"] == 1
+
+    freezer.tick(timedelta(seconds=2))
+    await coordinator.async_refresh()
+    assert emulator.stats.requests["tasks"] == 2
+    assert emulator.stats.requests["task_changes"] == 1
+
+    # And deltas again after it
+    await coordinator.async_refresh()
+    assert emulator.stats.requests["task_changes"] == 2
@@ -0,0 +1,107 @@
+"""Tests for Donetick push updates."""
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.donetick.const import DOMAIN, PUSH_SAFETY_NET_INTERVAL
+from custom_components.donetick.model import DonetickTask
+
+from .common import URL, async_setup_donetick, chore, mock_api
+
+WEBHOOK_PATH = "/api/webhook/donetick_hook"
+
+
+def _chore_requests(aioclient_mock: AiohttpClientMocker) -> int:
+    """Return how often the chore list was requested."""
+    return sum(1 for _, url, _, _ in aioclient_mock.mock_calls if str(url) == f"{URL}/eapi/v1/chore")
+
+
+async def _async_setup_push(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, chores: list[dict] | None = None):
+    """Set up an entry with push updates and return its runtime data."""
+    mock_api(aioclient_mock, chores)
+    entry = await async_setup_donetick(hass, push_updates=True, webhook_id="donetick_hook")
+    return hass.data[DOMAIN][entry.entry_id]
+
+
+async def test_push_keeps_safety_net_interval(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """Mutations and upcoming due dates do not drop polling to the adaptive floor while push is on."""
+    soon = (dt_util.utcnow() + timedelta(seconds=30)).isoformat()
+    runtime = await _async_setup_push(hass, aioclient_mock, [chore(1, due=soon), chore(2, 2)])
+    coordinator = runtime.todo_coordinator
+    assert coordinator.update_interval == timedelta(seconds=PUSH_SAFETY_NET_INTERVAL)
+
+    coordinator.async_apply_tasks([DonetickTask.from_json(chore(1, name="Renamed", due=soon))])
+    await hass.async_block_till_done()
+    assert coordinator.update_interval == timedelta(seconds=PUSH_SAFETY_NET_INTERVAL)
+    assert runtime.things_coordinator.update_interval == timedelta(seconds=PUSH_SAFETY_NET_INTERVAL)
+
+
+async def test_batch_push(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, hass_client_no_auth) -> None:
+    """A batch payload upserts and deletes chores and things without polling."""
+    runtime = await _async_setup_push(hass, aioclient_mock)
+    requests = len(aioclient_mock.mock_calls)
+    client = await hass_client_no_auth()
+
+    response = await client.post(WEBHOOK_PATH, json={
+        "chores": [chore(1, name="Pushed"), chore(3)],
+        "deletedChoreIds": [2],
+        "things": [{"id": 1, "state": "false"}],
+        "deletedThingIds": [4],
+    })
+    assert response.status == 200
+    await hass.async_block_till_done()
+
+    tasks = runtime.todo_coordinator.data
+    assert [task.id for task in tasks] == [1, 3]
+    assert tasks.get(1).name == "Pushed"
+    things = runtime.things_coordinator.data
+    assert things[1].state == "false"
+    assert things[1].name == "Thing 1"
+    assert 4 not in things
+    assert len(aioclient_mock.mock_calls) == requests
+
+
+async def test_event_push(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, hass_client_no_auth) -> None:
+    """Single events are applied like the equivalent batch; unknown events are ignored."""
+    runtime = await _async_setup_push(hass, aioclient_mock)
+    client = await hass_client_no_auth()
+
+    await client.post(WEBHOOK_PATH, json={"type": "chore.created", "data": chore(3)})
+    await client.post(WEBHOOK_PATH, json={"type": "task.deleted", "data": {"id": 1}})
+    await client.post(WEBHOOK_PATH, json={"type": "thing.updated", "data": {"id": 2, "state": 7}})
+    response = await client.post(WEBHOOK_PATH, json={"type": "circle.updated", "data": {"id": 1}})
+    assert response.status == 200
+    await hass.async_block_till_done()
+
+    assert [task.id for task in runtime.todo_coordinator.data] == [2, 3]
+    assert runtime.things_coordinator.data[2].state == "7"
+
+
+async def test_undecodable_push_refreshes(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, hass_client_no_auth) -> None:
+    """A pushed row that cannot be decoded makes the coordinator refresh instead."""
+    runtime = await _async_setup_push(hass, aioclient_mock)
+    store = runtime.todo_coordinator.data
+    requests = _chore_requests(aioclient_mock)
+    client = await hass_client_no_auth()
+
+    response = await client.post(WEBHOOK_PATH, json={"type": "chore.updated", "data": {"id": 1, "name": "Partial"}})
+    assert response.status == 200
+    await hass.async_block_till_done()
+    assert _chore_requests(aioclient_mock) == requests + 1
+    assert runtime.todo_coordinator.data.get(1).name == store.get(1).name
+
+
+async def test_invalid_push_rejected(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker, hass_client_no_auth) -> None:
+    """Bodies that are not a JSON object are rejected without touching the data."""
+    runtime = await _async_setup_push(hass, aioclient_mock)
+    store = runtime.todo_coordinator.data
+    requests = len(aioclient_mock.mock_calls)
+    client = await hass_client_no_auth()
+
+    assert (await client.post(WEBHOOK_PATH, data=b"not json")).status == 400
+    assert (await client.post(WEBHOOK_PATH, json=[chore(3)])).status == 400
+    await hass.async_block_till_done()
+    assert runtime.todo_coordinator.data is store
+    assert len(aioclient_mock.mock_calls) == requests
@@ -0,0 +1,204 @@
+"""Tests for the Donetick retry and circuit breaker policies."""
+import asyncio
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from aiohttp import web
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from multidict import CIMultiDict
+
+from custom_components.donetick.api import DonetickApiClient
+from custom_components.donetick.resilience import (
+    BREAKER_CLOSED,
+    BREAKER_HALF_OPEN,
+    BREAKER_OPEN,
+    CircuitBreaker,
+    DonetickCircuitOpenError,
+    RetryPolicy,
+    async_call_with_resilience,
+)
+
+# Retries without waiting
+NO_DELAY = RetryPolicy(attempts=3, base_delay=0, max_delay=0)
+
+
+def _response_error(status: int, headers: dict | None = None) -> aiohttp.ClientResponseError:
+    """Return the error raise_for_status raises for a status."""
+    return aiohttp.ClientResponseError(
+        None, (), status=status, headers=CIMultiDict(headers) if headers else None
+    )
+
+
+class _Calls:
+    """Awaitable call that raises or returns the given outcomes in order."""
+
+    def __init__(self, *outcomes) -> None:
+        self.outcomes = list(outcomes)
+        self.count = 0
+
+    async def __call__(self):
+        self.count += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def clock():
+    """Control the monotonic clock the breaker reads."""
+    # Replaces the module's time, not time.monotonic itself, which the event loop uses
+    with patch("custom_components.donetick.resilience.time") as mock_time:
+        mock_time.monotonic.return_value = 1000.0
+        yield mock_time.monotonic
+
+
+def test_breaker_transitions(clock) -> None:
+    """Closed until the threshold, open for the recovery timeout, half open for one probe, then closed."""
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+    changes = []
+    breaker.async_add_listener(lambda: changes.append(breaker.state))
+
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.trips == 1
+    assert breaker.retry_at == 1030.0
+
+    clock.return_value = 1029.0
+    with pytest.raises(DonetickCircuitOpenError):
+        breaker.before_call()
+
+    clock.return_value = 1030.0
+    breaker.before_call()
+    assert breaker.state == BREAKER_HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.consecutive_failures == 0
+    assert changes == [BREAKER_OPEN, BREAKER_HALF_OPEN, BREAKER_CLOSED]
+
+
+def test_failed_probe_reopens(clock) -> None:
+    """A failing half-open probe opens the breaker again for a full recovery timeout."""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    clock.return_value = 1030.0
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == BREAKER_OPEN
+    assert breaker.retry_at == 1060.0
+    assert breaker.trips == 2
+
+
+def test_single_half_open_probe(clock) -> None:
+    """Only one call goes through while half open, and a released probe frees the slot."""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    clock.return_value = 1030.0
+
+    breaker.before_call()
+    with pytest.raises(DonetickCircuitOpenError):
+        breaker.before_call()
+
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == BREAKER_HALF_OPEN
+
+
+async def test_cancelled_probe_releases_slot(clock) -> None:
+    """A probe cancelled mid-call must not keep the half-open breaker blocked."""
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    clock.return_value = 1030.0
+    started = asyncio.Event()
+
+    async def hang() -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    probe = asyncio.ensure_future(async_call_with_resilience(hang, breaker, NO_DELAY, True, "probe"))
+    await started.wait()
+    with pytest.raises(DonetickCircuitOpenError):
+        await async_call_with_resilience(_Calls("second"), breaker, NO_DELAY, True, "second")
+
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert await async_call_with_resilience(_Calls("after"), breaker, NO_DELAY, True, "after") == "after"
+    assert breaker.state == BREAKER_CLOSED
+
+
+async def test_client_error_counts_as_success() -> None:
+    """A 4xx is the request's fault: it resets the failure count and is not retried."""
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    call = _Calls(_response_error(404))
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await async_call_with_resilience(call, breaker, NO_DELAY, True, "read")
+    assert call.count == 1
+    assert breaker.consecutive_failures == 0
+    assert breaker.state == BREAKER_CLOSED
+
+
+async def test_server_errors_retried_and_counted() -> None:
+    """Idempotent calls are retried after 5xx answers, each counting as a breaker failure."""
+    breaker = CircuitBreaker(failure_threshold=5)
+    call = _Calls(_response_error(503), _response_error(502), "ok")
+
+    assert await async_call_with_resilience(call, breaker, NO_DELAY, True, "read") == "ok"
+    assert call.count == 3
+    assert breaker.consecutive_failures == 0
+
+    # Not idempotent: the server saw the request, so it is not sent again
+    call = _Calls(_response_error(503), "ok")
+    with pytest.raises(aiohttp.ClientResponseError):
+        await async_call_with_resilience(call, breaker, NO_DELAY, False, "write")
+    assert call.count == 1
+    assert breaker.consecutive_failures == 1
+
+
+def test_retry_after() -> None:
+    """A numeric Retry-After sets the delay, capped at max_delay; anything else uses backoff."""
+    policy = RetryPolicy(attempts=3, base_delay=1, max_delay=10)
+    assert policy.delay(0, _response_error(429, {"Retry-After": "4"})) == 4
+    assert policy.delay(0, _response_error(503, {"Retry-After": "120"})) == 10
+    assert 0 <= policy.delay(0, _response_error(503, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})) <= 1
+    assert 0 <= policy.delay(2, _response_error(503)) <= 4
+
+
+async def test_retry_after_waited(hass: HomeAssistant) -> None:
+    """The retry loop sleeps for the Retry-After delay before sending again."""
+    policy = RetryPolicy(attempts=2, base_delay=0, max_delay=0.05)
+    call = _Calls(_response_error(429, {"Retry-After": "1"}), "ok")
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    assert await async_call_with_resilience(call, CircuitBreaker(), policy, True, "read") == "ok"
+    assert loop.time() - start >= 0.05
+
+
+async def test_retried_delete_already_gone(hass: HomeAssistant, aiohttp_client, socket_enabled: None) -> None:
+    """A 404 on a retried delete means the lost first attempt deleted the task."""
+    statuses = [503, 404]
+
+    async def delete(request: web.Request) -> web.Response:
+        return web.Response(status=statuses.pop(0))
+
+    app = web.Application()
+    app.router.add_delete("/eapi/v1/chore/{task_id}", delete)
+    server = await aiohttp_client(app)
+    client = DonetickApiClient(str(server.make_url("")), "token", async_get_clientsession(hass), retry_policy=NO_DELAY)
+
+    assert await client.async_delete_task(7) is True
+    assert statuses == []
+
+    # On the first attempt a 404 is still an error
+    statuses.append(404)
+    with pytest.raises(aiohttp.ClientResponseError):
+        await client.async_delete_task(7)
@@ -0,0 +1,116 @@
+"""Tests for the Donetick request scheduler."""
+import asyncio
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.donetick.scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_USER,
+    SCHEDULER_POOL_KEY,
+    RequestScheduler,
+    async_acquire_scheduler,
+)
+
+
+async def _hold(scheduler: RequestScheduler, priority: int, release: asyncio.Event, started: list, name: str) -> None:
+    """Take a slot, note it, and keep it until release is set."""
+    async with scheduler.slot(priority):
+        started.append(name)
+        await release.wait()
+
+
+async def test_max_in_flight() -> None:
+    """No more than max_in_flight requests hold a slot; the rest queue until one ends."""
+    scheduler = RequestScheduler(0, 2)
+    release, started = asyncio.Event(), []
+    tasks = [asyncio.ensure_future(_hold(scheduler, PRIORITY_BACKGROUND, release, started, str(i))) for i in range(5)]
+    await asyncio.sleep(0)
+    assert scheduler.in_flight == 2
+    assert scheduler.queued == 3
+    assert started == ["0", "1"]
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["0", "1", "2", "3", "4"]
+    assert scheduler.in_flight == 0
+    assert scheduler.queued == 0
+
+
+async def test_priority_order() -> None:
+    """Queued mutations go before queued reads, each in arrival order."""
+    scheduler = RequestScheduler(0, 1)
+    release, started = asyncio.Event(), []
+    blocker = asyncio.ensure_future(_hold(scheduler, PRIORITY_BACKGROUND, release, started, "blocker"))
+    await asyncio.sleep(0)
+
+    release_queued = asyncio.Event()
+    release_queued.set()
+    queued = [
+        asyncio.ensure_future(_hold(scheduler, priority, release_queued, started, name))
+        for name, priority in (
+            ("read 1", PRIORITY_BACKGROUND), ("write 1", PRIORITY_USER),
+            ("read 2", PRIORITY_BACKGROUND), ("write 2", PRIORITY_USER),
+        )
+    ]
+    await asyncio.sleep(0)
+    assert scheduler.queued == 4
+
+    release.set()
+    await asyncio.gather(blocker, *queued)
+    assert started == ["blocker", "write 1", "write 2", "read 1", "read 2"]
+
+
+async def test_token_bucket_refill() -> None:
+    """A burst of RATE_LIMIT_BURST seconds goes out at once, then one request per 1/rate seconds."""
+    scheduler = RequestScheduler(10, 100)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(int(scheduler.burst)):
+        async with scheduler.slot(PRIORITY_BACKGROUND):
+            pass
+    assert loop.time() - start < 0.05
+
+    start = loop.time()
+    for _ in range(2):
+        async with scheduler.slot(PRIORITY_BACKGROUND):
+            pass
+    assert loop.time() - start == pytest.approx(0.2, abs=0.05)
+
+
+async def test_cancelled_waiter_removed() -> None:
+    """A request cancelled while queued leaves the queue and never takes a slot."""
+    scheduler = RequestScheduler(0, 1)
+    release, started = asyncio.Event(), []
+    blocker = asyncio.ensure_future(_hold(scheduler, PRIORITY_BACKGROUND, release, started, "blocker"))
+    await asyncio.sleep(0)
+
+    cancelled = asyncio.ensure_future(_hold(scheduler, PRIORITY_USER, release, started, "cancelled"))
+    waiting = asyncio.ensure_future(_hold(scheduler, PRIORITY_BACKGROUND, release, started, "waiting"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert scheduler.queued == 1
+
+    release.set()
+    await asyncio.gather(blocker, waiting)
+    assert started == ["blocker", "waiting"]
+    assert scheduler.in_flight == 0
+    assert not scheduler._waiters  # pylint: disable=protected-access
+
+
+async def test_scheduler_shared_per_server(hass: HomeAssistant) -> None:
+    """Entries using the same server share a scheduler until the last one releases it."""
+    first, release_first = async_acquire_scheduler(hass, "http://donetick.local/", 10, 4)
+    second, release_second = async_acquire_scheduler(hass, "http://donetick.local", 5, 2)
+    other, release_other = async_acquire_scheduler(hass, "http://other.local", 10, 4)
+    assert second is first
+    assert other is not first
+    assert (second.rate, second.max_in_flight) == (10, 4)
+
+    release_first()
+    assert "http://donetick.local" in hass.data[SCHEDULER_POOL_KEY]
+    release_second()
+    release_other()
+    assert not hass.data[SCHEDULER_POOL_KEY]
@@ -0,0 +1,62 @@
+"""Tests for the Donetick data snapshot."""
+from datetime import timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.donetick.const import DOMAIN, SNAPSHOT_SAVE_DELAY, TODO_STORAGE_KEY
+
+from .common import MEMBERS, THINGS, async_setup_donetick, member, mock_api
+
+
+async def _async_save_delay_passes(hass: HomeAssistant) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SNAPSHOT_SAVE_DELAY + 1))
+    await hass.async_block_till_done()
+
+
+async def _async_refresh_all(hass: HomeAssistant, entry_id: str) -> None:
+    runtime = hass.data[DOMAIN][entry_id]
+    for coordinator in (runtime.todo_coordinator, runtime.members_coordinator, runtime.things_coordinator):
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+
+async def test_first_download_saved(hass: HomeAssistant, hass_storage: dict[str, Any], aioclient_mock: AiohttpClientMocker) -> None:
+    """Without a snapshot the first download is saved."""
+    mock_api(aioclient_mock)
+    entry = await async_setup_donetick(hass)
+    await _async_save_delay_passes(hass)
+
+    data = hass_storage[f"{TODO_STORAGE_KEY}.{entry.entry_id}"]["data"]
+    assert [task["id"] for task in data["tasks"]] == [1, 2]
+    assert [member["userId"] for member in data["members"]] == [1, 2]
+    assert len(data["things"]) == len(THINGS)
+
+
+async def test_unchanged_snapshot_not_rewritten(hass: HomeAssistant, hass_storage: dict[str, Any], aioclient_mock: AiohttpClientMocker) -> None:
+    """A loaded snapshot is only saved again once the data differs from it."""
+    mock_api(aioclient_mock)
+    entry = await async_setup_donetick(hass)
+    await _async_save_delay_passes(hass)
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+    key = f"{TODO_STORAGE_KEY}.{entry.entry_id}"
+    # Anything written would drop the marker
+    hass_storage[key]["data"]["marker"] = True
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    await _async_refresh_all(hass, entry.entry_id)
+    await _async_save_delay_passes(hass)
+    assert hass_storage[key]["data"].get("marker") is True
+
+    # A new member alone is saved
+    mock_api(aioclient_mock, members=MEMBERS + [member(3, "Carol")])
+    await _async_refresh_all(hass, entry.entry_id)
+    await _async_save_delay_passes(hass)
+    data = hass_storage[key]["data"]
+    assert "marker" not in data
+    assert [member["userId"] for member in data["members"]] == [1, 2, 3]
+    assert [task["id"] for task in data["tasks"]] == [1, 2]
@@ -0,0 +1,204 @@
+"""Tests for the Donetick thing entities."""
+from dataclasses import replace
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from custom_components.donetick.const import DOMAIN, THING_REMOVAL_REFRESHES, THING_WRITE_SETTLE_DELAY
+from custom_components.donetick.thing import DonetickThingWriter
+
+from .common import URL, THINGS, async_setup_donetick, mock_api, thing
+
+NUMBER_ENTITY = "number.donetick_things_thing_2"
+TEXT_ENTITY = "text.donetick_things_thing_3"
+
+
+def _writer(hass: HomeAssistant) -> tuple[DonetickThingWriter, Mock, list[str]]:
+    """Return a writer for thing 1, its mocked client and the states it reported."""
+    client = Mock()
+    client.async_set_thing_state = AsyncMock(return_value=True)
+    client.async_change_thing_state = AsyncMock(return_value="8")
+    reported: list[str] = []
+    return DonetickThingWriter(hass, client, 1, reported.append), client, reported
+
+
+async def test_writer_last_state_wins(hass: HomeAssistant) -> None:
+    """States set within the settle window are sent as one request for the last of them."""
+    writer, client, _ = _writer(hass)
+    first = writer.async_set("1")
+    second = writer.async_set("2")
+    assert first is second
+    assert writer.busy
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=THING_WRITE_SETTLE_DELAY + 1))
+    assert await first is True
+    client.async_set_thing_state.assert_awaited_once_with(1, "2")
+    client.async_change_thing_state.assert_not_called()
+    assert not writer.busy
+
+
+async def test_writer_folds_increments(hass: HomeAssistant) -> None:
+    """Increments add up, and increments after a numeric state are folded into it."""
+    writer, client, reported = _writer(hass)
+    writer.async_increment(1)
+    writer.async_increment(2)
+    await writer.async_flush()
+    client.async_change_thing_state.assert_awaited_once_with(1, increment=3)
+    client.async_set_thing_state.assert_not_called()
+    assert reported == ["8"]
+
+    client.async_change_thing_state.reset_mock()
+    written = writer.async_set("5")
+    writer.async_increment(2)
+    writer.async_increment(-4)
+    await writer.async_flush()
+    assert written.result() is True
+    client.async_set_thing_state.assert_awaited_once_with(1, "3")
+    client.async_change_thing_state.assert_not_called()
+
+    # A set replaces increments still pending
+    client.async_set_thing_state.reset_mock()
+    writer.async_increment(3)
+    writer.async_set("text")
+    await writer.async_flush()
+    client.async_set_thing_state.assert_awaited_once_with(1, "text")
+    client.async_change_thing_state.assert_not_called()
+
+
+async def test_writer_reports_failure(hass: HomeAssistant) -> None:
+    """A failed request resolves the write's future with False."""
+    writer, client, _ = _writer(hass)
+    client.async_set_thing_state.side_effect = OSError("unreachable")
+    written = writer.async_set("1")
+    await writer.async_flush()
+    assert written.result() is False
+
+
+async def test_fetch_older_than_write_ignored(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """Things fetched before a write finished do not bring back the state it replaced."""
+    mock_api(aioclient_mock)
+    entry = await async_setup_donetick(hass)
+    coordinator = hass.data[DOMAIN][entry.entry_id].things_coordinator
+    aioclient_mock.get(f"{URL}/eapi/v1/things/2/state", text="ok")
+    assert hass.states.get(NUMBER_ENTITY).state == "5.0"
+
+    await hass.services.async_call("number", "set_value", {"entity_id": NUMBER_ENTITY, "value": 9}, blocking=False)
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=THING_WRITE_SETTLE_DELAY + 1))
+    await hass.async_block_till_done()
+    assert hass.states.get(NUMBER_ENTITY).state == "9.0"
+    assert any(str(url).startswith(f"{URL}/eapi/v1/things/2/state") for _, url, _, _ in aioclient_mock.mock_calls)
+
+    # A refresh sent before the write landed answers with the old state
+    stale = dict(coordinator.data)
+    stale[2] = replace(stale[2], state="5")
+    coordinator.async_set_updated_data(stale)
+    await hass.async_block_till_done()
+    assert hass.states.get(NUMBER_ENTITY).state == "9.0"
+
+    # Fetches sent after it are shown again
+    mock_api(aioclient_mock, things=[*THINGS[:1], thing(2, "number", "7"), *THINGS[2:]])
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(NUMBER_ENTITY).state == "7.0"
+
+
+def _thing_entities(hass: HomeAssistant, entry: MockConfigEntry) -> set[tuple[str, str]]:
+    """Return the platform and unique id of every thing entity registered for the entry."""
+    registry = er.async_get(hass)
+    return {
+        (entity.domain, entity.unique_id)
+        for entity in er.async_entries_for_config_entry(registry, entry.entry_id)
+        if entity.unique_id.startswith("donetick_thing_")
+    }
+
+
+async def _async_refresh_things(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Refresh the entry's things and let the entities follow."""
+    await hass.data[DOMAIN][entry.entry_id].things_coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+
+async def test_missing_thing_removed_after_refreshes(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """A missing thing is unavailable until THING_REMOVAL_REFRESHES complete refreshes lacked it."""
+    mock_api(aioclient_mock)
+    entry = await async_setup_donetick(hass)
+    er.async_get(hass).async_update_entity(TEXT_ENTITY, name="My text")
+    without_text = [thing for thing in THINGS if thing["id"] != 3]
+
+    mock_api(aioclient_mock, things=without_text)
+    for _ in range(THING_REMOVAL_REFRESHES - 1):
+        await _async_refresh_things(hass, entry)
+    assert ("text", "donetick_thing_3") in _thing_entities(hass, entry)
+    assert hass.states.get(TEXT_ENTITY).state == "unavailable"
+
+    # Back before the last refresh: the count starts over and the customisation is kept
+    mock_api(aioclient_mock)
+    await _async_refresh_things(hass, entry)
+    assert hass.states.get(TEXT_ENTITY).state == "hi"
+    assert er.async_get(hass).async_get(TEXT_ENTITY).name == "My text"
+
+    mock_api(aioclient_mock, things=without_text)
+    for _ in range(THING_REMOVAL_REFRESHES - 1):
+        await _async_refresh_things(hass, entry)
+    assert ("text", "donetick_thing_3") in _thing_entities(hass, entry)
+    await _async_refresh_things(hass, entry)
+    assert ("text", "donetick_thing_3") not in _thing_entities(hass, entry)
+    assert hass.states.get(TEXT_ENTITY) is None
+
+
+async def test_incomplete_refreshes_never_remove(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """Failed refreshes and responses with malformed rows do not count a thing as missing."""
+    mock_api(aioclient_mock)
+    entry = await async_setup_donetick(hass)
+    entities = _thing_entities(hass, entry)
+    assert len(entities) == 4
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(f"{URL}/eapi/v1/things", text="<html>Sign in</html>")
+    await _async_refresh_things(hass, entry)
+
+    mock_api(aioclient_mock, things=[{"id": 3}] + [thing for thing in THINGS if thing["id"] != 3])
+    for _ in range(THING_REMOVAL_REFRESHES + 1):
+        await _async_refresh_things(hass, entry)
+    assert _thing_entities(hass, entry) == entities
+
+
+async def test_pushed_deletion_removes_immediately(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """A thing the server pushed as deleted loses its entity right away."""
+    mock_api(aioclient_mock)
+    entry = await async_setup_donetick(hass)
+
+    hass.data[DOMAIN][entry.entry_id].things_coordinator.async_apply_things(removed_ids=[4])
+    await hass.async_block_till_done()
+    assert ("sensor", "donetick_thing_4") not in _thing_entities(hass, entry)
+    assert len(_thing_entities(hass, entry)) == 3
+
+
+async def test_type_change_moves_platform(hass: HomeAssistant, aioclient_mock: AiohttpClientMocker) -> None:
+    """A thing that changed type gets an entity on its new platform, also across reloads."""
+    mock_api(aioclient_mock)
+    entry = await async_setup_donetick(hass)
+
+    mock_api(aioclient_mock, things=[thing(1, "number", "3"), *THINGS[1:]])
+    await _async_refresh_things(hass, entry)
+    entities = _thing_entities(hass, entry)
+    assert ("number", "donetick_thing_1") in entities
+    assert ("switch", "donetick_thing_1") not in entities
+    assert hass.states.get("number.donetick_things_thing_1").state == "3.0"
+
+    # Changed while unloaded: the stale registry entry goes with the next complete refresh
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    mock_api(aioclient_mock, things=[thing(1, "text", "three"), *THINGS[1:]])
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    await _async_refresh_things(hass, entry)
+    entities = _thing_entities(hass, entry)
+    assert ("text", "donetick_thing_1") in entities
+    assert ("number", "donetick_thing_1") not in entities
+    assert len(entities) == 4